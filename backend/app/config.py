@@ -11,6 +11,12 @@ class Settings(BaseSettings):
     
     # データベース設定
     DATABASE_URL: str = Field(default="sqlite:///./database/stockscreener.db", env="DATABASE_URL")
+    DB_ECHO: bool = Field(default=False, env="DB_ECHO")
+    DB_POOL_SIZE: int = Field(default=5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    SQLITE_MMAP_SIZE: int = Field(default=268435456, env="SQLITE_MMAP_SIZE")
+    SQLITE_CACHE_SIZE_KB: int = Field(default=65536, env="SQLITE_CACHE_SIZE_KB")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, env="SQLITE_BUSY_TIMEOUT_MS")
     
     # API設定
     API_HOST: str = Field(default="0.0.0.0", env="API_HOST")
@@ -19,6 +25,12 @@ class Settings(BaseSettings):
     
     # Yahoo Finance API設定
     YAHOO_API_RATE_LIMIT: int = Field(default=5, env="YAHOO_API_RATE_LIMIT")
+    YAHOO_API_BURST: int = Field(default=10, env="YAHOO_API_BURST")
+    YAHOO_API_QUEUE_TIMEOUT: float = Field(default=30.0, env="YAHOO_API_QUEUE_TIMEOUT")
+    YAHOO_MAX_WORKERS: int = Field(default=8, env="YAHOO_MAX_WORKERS")
+    TICKER_REGISTRY_TTL_MINUTES: int = Field(default=1440, env="TICKER_REGISTRY_TTL_MINUTES")
+    TICKER_REGISTRY_MAX_ENTRIES: int = Field(default=5000, env="TICKER_REGISTRY_MAX_ENTRIES")
+    TICKER_INVALID_TTL_MINUTES: int = Field(default=10, env="TICKER_INVALID_TTL_MINUTES")
     
     # ログ設定
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
@@ -29,10 +41,49 @@ class Settings(BaseSettings):
     
     # スクリーニング設定
     DEFAULT_SCREENING_TIMEOUT: int = Field(default=30, env="DEFAULT_SCREENING_TIMEOUT")
-    MAX_STOCKS_PER_REQUEST: int = Field(default=10, env="MAX_STOCKS_PER_REQUEST")
+    MAX_STOCKS_PER_REQUEST: int = Field(default=500, env="MAX_STOCKS_PER_REQUEST")
+    SCREENING_CONCURRENCY: int = Field(default=8, env="SCREENING_CONCURRENCY")
     
     # キャッシュ設定
     CACHE_EXPIRY_MINUTES: int = Field(default=60, env="CACHE_EXPIRY_MINUTES")
+    CACHE_MAX_ENTRIES: int = Field(default=2000, env="CACHE_MAX_ENTRIES")
+    CACHE_STALE_GRACE_MINUTES: int = Field(default=30, env="CACHE_STALE_GRACE_MINUTES")
+    PRICE_STORE_REFRESH_MINUTES: int = Field(default=60, env="PRICE_STORE_REFRESH_MINUTES")
+    FINANCIAL_STORE_REFRESH_HOURS: int = Field(default=24, env="FINANCIAL_STORE_REFRESH_HOURS")
+    
+    # 定期更新設定
+    REFRESH_SCHEDULER_ENABLED: bool = Field(default=True, env="REFRESH_SCHEDULER_ENABLED")
+    REFRESH_RATE_SHARE: float = Field(default=0.5, env="REFRESH_RATE_SHARE")
+    REFRESH_LEAD_MINUTES: int = Field(default=10, env="REFRESH_LEAD_MINUTES")
+    REFRESH_PLAN_INTERVAL_SECONDS: float = Field(default=60.0, env="REFRESH_PLAN_INTERVAL_SECONDS")
+    REFRESH_HISTORY_PERIOD: str = Field(default="1y", env="REFRESH_HISTORY_PERIOD")
+    
+    # テクニカル指標設定
+    INDICATOR_HISTORY_PERIOD: str = Field(default="1y", env="INDICATOR_HISTORY_PERIOD")
+    INDICATOR_MAX_WINDOW: int = Field(default=252, env="INDICATOR_MAX_WINDOW")
+    
+    # バックテスト設定
+    BACKTEST_WORKERS: int = Field(default=2, env="BACKTEST_WORKERS")
+    BACKTEST_REPORTING_LAG_DAYS: int = Field(default=90, env="BACKTEST_REPORTING_LAG_DAYS")
+    BACKTEST_MAX_JOBS: int = Field(default=100, env="BACKTEST_MAX_JOBS")
+    
+    # バフェット式事前スコア設定
+    BUFFETT_SCORE_DEBOUNCE_SECONDS: float = Field(default=30.0, env="BUFFETT_SCORE_DEBOUNCE_SECONDS")
+    BUFFETT_MIN_PEERS: int = Field(default=3, env="BUFFETT_MIN_PEERS")
+    
+    # 業種内比較設定
+    PEER_MIN_COUNT: int = Field(default=3, env="PEER_MIN_COUNT")
+    PEER_RETRY_SECONDS: float = Field(default=30.0, env="PEER_RETRY_SECONDS")
+    
+    # 株価配信設定
+    STREAM_HEARTBEAT_SECONDS: float = Field(default=15.0, env="STREAM_HEARTBEAT_SECONDS")
+    STREAM_MAX_SYMBOLS: int = Field(default=50, env="STREAM_MAX_SYMBOLS")
+    
+    # データベース書き込み設定
+    STOCK_WRITE_BEHIND_SECONDS: float = Field(default=1.0, env="STOCK_WRITE_BEHIND_SECONDS")
+    STOCK_WRITE_BATCH_SIZE: int = Field(default=200, env="STOCK_WRITE_BATCH_SIZE")
+    STOCK_WRITE_MAX_PENDING: int = Field(default=5000, env="STOCK_WRITE_MAX_PENDING")
+    STOCK_WRITE_MAX_RETRY_SECONDS: float = Field(default=60.0, env="STOCK_WRITE_MAX_RETRY_SECONDS")
     
     class Config:
         env_file = ".env"
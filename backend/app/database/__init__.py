@@ -1,4 +1,4 @@
 from .connection import engine, Base, get_db, get_async_db
-from .init_db import init_database, drop_all_tables, reset_database
+from .init_db import init_database, upgrade_schema, drop_all_tables, reset_database
 
-__all__ = ["engine", "Base", "get_db", "get_async_db", "init_database", "drop_all_tables", "reset_database"]
\ No newline at end of file
+__all__ = ["engine", "Base", "get_db", "get_async_db", "init_database", "upgrade_schema", "drop_all_tables", "reset_database"]
\ No newline at end of file
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, event, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 
 from app.config import settings
@@ -11,20 +12,45 @@ database_path = settings.DATABASE_URL.replace("sqlite:///", "")
 database_dir = os.path.dirname(database_path)
 os.makedirs(database_dir, exist_ok=True)
 
+is_sqlite = "sqlite" in settings.DATABASE_URL
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    接続ごとにSQLiteの設定を適用
+
+    WALモードでは読み込みが書き込みを待たないため、バックグラウンドの書き込み中も
+    並行するリクエストの読み込みを処理できる。
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
 # 同期データベースエンジンの作成（テーブル作成用）
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.ENVIRONMENT == "development"
+    connect_args={"check_same_thread": False} if is_sqlite else {},
+    echo=settings.DB_ECHO
 )
 
-# 非同期データベースエンジンの作成
+# 非同期データベースエンジンの作成（リポジトリはこちらを使用する）
+# aiosqliteの既定はNullPoolで接続ごとにPRAGMAを再設定することになるため、接続を使い回すプールを指定する
 async_database_url = settings.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://")
 async_engine = create_async_engine(
     async_database_url,
-    echo=settings.ENVIRONMENT == "development"
+    echo=settings.DB_ECHO,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW
 )
 
+if is_sqlite:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
 # セッションの作成
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 AsyncSessionLocal = sessionmaker(
@@ -46,4 +72,4 @@ def get_db():
 # 非同期データベースセッションの取得
 async def get_async_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
@@ -3,7 +3,8 @@
 """
 import os
 import logging
-from sqlalchemy import create_engine
+from typing import List
+from sqlalchemy import create_engine, inspect, text, UniqueConstraint
 from app.database.connection import Base
 from app.models import *  # 全てのモデルをインポート
 from app.config import settings
@@ -26,11 +27,12 @@ def init_database():
         engine = create_engine(
             settings.DATABASE_URL,
             connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-            echo=settings.ENVIRONMENT == "development"
+            echo=settings.DB_ECHO
         )
         
         # 全てのテーブルを作成
         Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine)
         logger.info("Database tables created successfully")
         
         # サンプルデータを挿入（開発環境の場合）
@@ -43,6 +45,56 @@ def init_database():
         logger.error(f"Error initializing database: {str(e)}")
         return False
 
+def upgrade_schema(engine) -> List[str]:
+    """
+    既存のテーブルに、後から追加した列・インデックス・一意制約を追加する
+
+    create_allは既存のテーブルを変更しないため、create_allの後に毎回実行する。
+    追加する列はNULL許容のもののみを想定している（既存の行の値はNULLになる）。
+
+    Returns:
+        追加した列・インデックスの名前のリスト
+    """
+    inspector = inspect(engine)
+    applied = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                applied.append(f"{table.name}.{column.name}")
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            existing_indexes.update(
+                constraint["name"] for constraint in inspector.get_unique_constraints(table.name)
+            )
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection, checkfirst=True)
+                    applied.append(index.name)
+
+            # SQLiteは既存のテーブルに一意制約を追加できないため、同じ名前の一意インデックスで代替する
+            for constraint in table.constraints:
+                if not isinstance(constraint, UniqueConstraint) or not constraint.name:
+                    continue
+                if constraint.name in existing_indexes:
+                    continue
+                columns = ", ".join(column.name for column in constraint.columns)
+                connection.execute(text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {constraint.name} ON {table.name} ({columns})"
+                ))
+                applied.append(constraint.name)
+
+    if applied:
+        logger.info(f"Upgraded database schema: {', '.join(applied)}")
+    return applied
+
 def create_sample_data(engine):
     """
     サンプルデータを作成する（開発環境用）
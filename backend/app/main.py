@@ -1,23 +1,166 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
 from contextlib import asynccontextmanager
+import asyncio
+import time
+import logging
 
 from app.config import settings
-from app.database.connection import engine
+from app.database.connection import engine, async_engine
+from app.database.init_db import upgrade_schema
 from app.models import Base
 from app.routes import api_router
+from app.repositories import stock_repository, stock_write_queue
+from app.services.refresh_scheduler import refresh_scheduler
+from app.services.trend_metrics_service import trend_metrics_service
+from app.services.peer_aggregate_service import peer_aggregate_service
+from app.services.buffett_score_service import buffett_score_service
+from app.services.indicator_service import indicator_service
+from app.services.search_service import symbol_search_index
+from app.services.alert_service import price_alert_engine
+from app.services.stream_service import quote_broadcaster
+from app.services.yahoo_finance_service import yahoo_finance_service
+from app.services.metrics_service import metrics
+from app.services.backtest_service import backtest_service
 
-# データベーステーブルの作成
+logger = logging.getLogger(__name__)
+
+# データベーステーブルの作成（既存のテーブルには追加した列・インデックスを反映する）
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+
+# SQLの実行時間を計測（リポジトリは非同期エンジンを使用する）
+metrics.instrument_engine(engine)
+metrics.instrument_engine(async_engine.sync_engine)
+
+def _executor_queue_depth():
+    loop = asyncio.get_running_loop()
+    default_executor = getattr(loop, "_default_executor", None)
+    return {
+        ("yahoo",): yahoo_finance_service.executor_queue_depth(),
+        ("default",): default_executor._work_queue.qsize() if default_executor is not None else 0
+    }
+
+def _cache_stats():
+    return {
+        "stock_data": yahoo_finance_service.cache.stats(),
+        "tickers": yahoo_finance_service.tickers.stats(),
+        "trend_metrics": trend_metrics_service.cache.stats(),
+        "indicators": indicator_service.cache.stats()
+    }
+
+# 他のサービスが保持している値は/metricsの出力時に読み取る
+metrics.gauge(
+    "executor_queue_depth",
+    "Tasks waiting for a free thread",
+    ("executor",),
+    _executor_queue_depth
+)
+metrics.gauge(
+    "cache_hit_ratio",
+    "Cache hit ratio since startup",
+    ("cache",),
+    lambda: {(name, ): stats["hit_rate"] for name, stats in _cache_stats().items()}
+)
+metrics.gauge(
+    "cache_lookups",
+    "Cache lookups since startup by result",
+    ("cache", "result"),
+    lambda: {
+        (name, result): stats[result]
+        for name, stats in _cache_stats().items()
+        for result in ("hits", "stale_hits", "misses", "coalesced")
+    }
+)
+metrics.gauge(
+    "cache_entries",
+    "Number of cached entries",
+    ("cache",),
+    lambda: {(name, ): stats["entries"] for name, stats in _cache_stats().items()}
+)
+metrics.gauge(
+    "upstream_rate_limit_available_tokens",
+    "Tokens currently available in the Yahoo Finance rate limiter",
+    (),
+    lambda: {(): yahoo_finance_service.rate_limiter.stats()["available_tokens"]}
+)
+metrics.gauge(
+    "stream_subscriptions",
+    "Open quote stream connections",
+    (),
+    lambda: {(): quote_broadcaster.stats()["subscriptions"]}
+)
+metrics.gauge(
+    "stock_write_queue_rows",
+    "Stock rows waiting in the write-behind queue, and rows dropped since startup",
+    ("state",),
+    lambda: {(state, ): stock_write_queue.stats()[state] for state in ("pending", "dropped")}
+)
+metrics.gauge(
+    "backtest_jobs",
+    "Backtest jobs held in memory by status",
+    ("status",),
+    lambda: {(status, ): count for status, count in backtest_service.stats()["jobs"].items()}
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 起動時の処理
+    # スコア未計算の保存済み銘柄（サンプルデータ・列の追加前に保存した銘柄等）のスコアを計算
+    try:
+        await stock_repository.refresh_missing_scores()
+    except Exception as e:
+        logger.error(f"Error refreshing stock scores: {str(e)}")
+    # 前回の起動以降に財務諸表が変わった銘柄の傾向指標を再計算
+    try:
+        await trend_metrics_service.refresh_changed()
+    except Exception as e:
+        logger.error(f"Error refreshing trend metrics: {str(e)}")
+    # セクター・業種ごとの指標の分布を集計し、以降は株式情報の書き込みに合わせて所属グループを再集計する
+    try:
+        await peer_aggregate_service.rebuild()
+    except Exception as e:
+        logger.error(f"Error building peer aggregates: {str(e)}")
+    stock_write_queue.add_listener(peer_aggregate_service.on_stock_write)
+    peer_aggregate_service.add_listener(buffett_score_service.on_peer_update)
+    # 入力が変わった銘柄のバフェット式事前スコアを再計算し、以降は株式情報の書き込みに合わせて再計算する
+    try:
+        await buffett_score_service.refresh()
+    except Exception as e:
+        logger.error(f"Error refreshing Buffett pre-scores: {str(e)}")
+    stock_write_queue.add_listener(buffett_score_service.on_stock_write)
+    # 検索インデックスを作成し、以降は株式情報の書き込みに合わせて差分更新する
+    try:
+        await symbol_search_index.rebuild()
+    except Exception as e:
+        logger.error(f"Error building search index: {str(e)}")
+    stock_write_queue.add_listener(symbol_search_index.upsert_many)
+    # 目標株価・損切り株価のインデックスを作成し、株価の書き込みごとに到達を判定する
+    try:
+        await price_alert_engine.rebuild()
+    except Exception as e:
+        logger.error(f"Error building price alert index: {str(e)}")
+    stock_write_queue.add_listener(price_alert_engine.on_stock_write)
+    # 株式情報の書き込みを配信中の接続へ差分として送る
+    stock_write_queue.add_listener(quote_broadcaster.publish)
+    # 保存済み銘柄の定期更新を開始
+    if settings.REFRESH_SCHEDULER_ENABLED:
+        refresh_scheduler.start()
     yield
     # 終了時の処理
-    pass
+    await refresh_scheduler.stop()
+    # 書き込み待ちの株式情報をデータベースに反映
+    await stock_write_queue.stop()
+    await price_alert_engine.wait_saved()
+    # 予約済みの分布の再集計・事前スコアの再計算は次回起動時に反映する
+    await peer_aggregate_service.stop()
+    await buffett_score_service.stop()
+    # 実行中のバックテストを中止
+    await backtest_service.shutdown()
+    # プールしている接続を閉じる
+    await async_engine.dispose()
 
 # FastAPIアプリケーションの作成
 app = FastAPI(
@@ -36,6 +179,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# リクエストごとの処理時間を記録（ルートはパスのテンプレートで集計する）
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        metrics.http_requests.inc(request.method, route_path, str(status))
+        metrics.http_request_duration.observe(time.perf_counter() - started, request.method, route_path)
+
 # APIルートの追加
 app.include_router(api_router, prefix="/api")
 
@@ -51,6 +209,14 @@ async def health_check():
         }
     )
 
+# メトリクス（Prometheusのテキスト形式）
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 # ルートエンドポイント
 @app.get("/")
 async def root():
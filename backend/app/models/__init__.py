@@ -1,6 +1,8 @@
 from app.database.connection import Base
 from .stock import Stock
-from .financial_data import FinancialData, add_stock_relationship
+from .financial_data import FinancialData, FinancialStatementItem, add_stock_relationship
+from .price_history import PriceHistory, PriceHistoryCoverage
+from .trend_metrics import StockTrendMetrics
 from .screening_result import (
     ScreeningSession, 
     ScreeningResult, 
@@ -8,6 +10,10 @@ from .screening_result import (
     WatchListItem,
     add_stock_relationships
 )
+from .price_alert import PriceAlert
+from .metric_snapshot import MetricSnapshot
+from .buffett_score import BuffettScore
+from .peer_aggregate import PeerAggregate
 
 # リレーションシップを追加
 add_stock_relationship()
@@ -17,8 +23,16 @@ __all__ = [
     "Base", 
     "Stock", 
     "FinancialData", 
+    "FinancialStatementItem", 
+    "PriceHistory", 
+    "PriceHistoryCoverage", 
+    "StockTrendMetrics", 
     "ScreeningSession", 
     "ScreeningResult", 
     "WatchList", 
-    "WatchListItem"
+    "WatchListItem",
+    "PriceAlert",
+    "MetricSnapshot",
+    "BuffettScore",
+    "PeerAggregate"
 ]
\ No newline at end of file
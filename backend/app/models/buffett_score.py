@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.database.connection import Base
+
+class BuffettScore(Base):
+    """バフェット式7観点分析の定量的な事前スコアテーブル（1銘柄1行）"""
+    __tablename__ = "stock_buffett_scores"
+    __table_args__ = (
+        # スコア順の候補一覧用
+        Index("ix_stock_buffett_scores_pre_score", "pre_score"),
+    )
+
+    stock_id = Column(Integer, ForeignKey("stocks.id"), primary_key=True)
+
+    # 観点ごとのスコア（0-10、算出できない場合はNULL。経営陣の質は定性評価のため対象外）
+    moat_score = Column(Float)  # 観点1: 競争優位性（資本効率・利益率の水準による代替指標）
+    valuation_score = Column(Float)  # 観点2: 業種内で比較したバリュエーション
+    financial_health_score = Column(Float)  # 観点4: 財務健全性
+    cash_flow_score = Column(Float)  # 観点5: キャッシュフロー生成能力
+    revenue_growth_score = Column(Float)  # 観点6: 売上成長率
+    industry_growth_score = Column(Float)  # 観点7: 業種の成長性
+
+    # 算出できた観点の重要度で加重平均した総合スコア（0-100）
+    pre_score = Column(Float)
+    coverage = Column(Float)  # 算出できた観点の重要度の合計（0-1）
+
+    # メタデータ
+    source_signature = Column(String(32))  # 計算元の指標・業種内比較値の要約（変更検知用）
+    computed_at = Column(DateTime)
+
+    # リレーションシップ
+    stock = relationship("Stock")
+
+    def __repr__(self):
+        return f"<BuffettScore(stock_id={self.stock_id}, pre_score={self.pre_score})>"
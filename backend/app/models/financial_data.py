@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.connection import Base
@@ -10,10 +10,7 @@ class FinancialData(Base):
     id = Column(Integer, primary_key=True, index=True)
     stock_id = Column(Integer, ForeignKey("stocks.id"), nullable=False)
     
-    # 財務諸表データ（JSON形式で保存）
-    financials = Column(Text)  # 損益計算書データ
-    balance_sheet = Column(Text)  # 貸借対照表データ
-    cashflow = Column(Text)  # キャッシュフロー計算書データ
+    # 財務諸表の明細はFinancialStatementItemに縦持ちで保存する
     
     # 主要な財務指標（高速検索用）
     total_revenue = Column(Float)
@@ -44,7 +41,35 @@ class FinancialData(Base):
     def __repr__(self):
         return f"<FinancialData(stock_id={self.stock_id}, fiscal_year={self.fiscal_year})>"
 
+class FinancialStatementItem(Base):
+    """財務諸表の明細テーブル（1行 = 1銘柄・1諸表・1勘定科目・1決算期）"""
+    __tablename__ = "financial_statement_items"
+    __table_args__ = (
+        # 銘柄ごとの財務諸表の組み立てと、upsertの一意キーを兼ねる
+        UniqueConstraint("stock_id", "statement", "line_item", "period_end", name="uq_financial_statement_items"),
+        # 勘定科目を全銘柄横断で取得するため
+        Index("ix_financial_statement_items_line_item", "statement", "line_item", "period_end"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    stock_id = Column(Integer, ForeignKey("stocks.id"), nullable=False)
+    
+    statement = Column(String(20), nullable=False)  # financials / balance_sheet / cashflow
+    line_item = Column(String(100), nullable=False)  # 勘定科目（例: Free Cash Flow）
+    period_end = Column(Date, nullable=False)  # 決算期末日
+    value = Column(Float)
+    
+    # メタデータ
+    fetched_at = Column(DateTime)  # データソースから取得した日時
+    
+    # リレーションシップ
+    stock = relationship("Stock", back_populates="financial_statement_items")
+    
+    def __repr__(self):
+        return f"<FinancialStatementItem(stock_id={self.stock_id}, line_item='{self.line_item}', period_end={self.period_end})>"
+
 # Stockモデルにリレーションシップを追加するため、後でインポートする際に使用
 def add_stock_relationship():
     from app.models.stock import Stock
-    Stock.financial_data = relationship("FinancialData", back_populates="stock")
\ No newline at end of file
+    Stock.financial_data = relationship("FinancialData", back_populates="stock")
+    Stock.financial_statement_items = relationship("FinancialStatementItem", back_populates="stock")
\ No newline at end of file
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.database.connection import Base
+
+class MetricSnapshot(Base):
+    """バックテスト用の時点ごとの指標スナップショットテーブル（1銘柄1日1行）"""
+    __tablename__ = "metric_snapshots"
+    __table_args__ = (
+        # 期間を指定した全銘柄の読み込み用
+        Index("ix_metric_snapshots_as_of", "as_of"),
+    )
+
+    stock_id = Column(Integer, ForeignKey("stocks.id"), primary_key=True)
+    as_of = Column(Date, primary_key=True)  # この日付以降に利用可能になった値
+
+    # 記録元（live: 株式情報の取得時, statements: 決算期末から開示までの期間を空けた財務諸表）
+    source = Column(String(20), nullable=False)
+
+    # 株価に依存する指標は記録時の株価・EPS・発行済株式数から評価日の値に換算する
+    price = Column(Float)
+    market_cap = Column(Float)
+    shares_outstanding = Column(Float)
+    eps = Column(Float)
+    pe_ratio = Column(Float)
+
+    # 財務指標
+    roe = Column(Float)
+    debt_to_equity = Column(Float)
+    current_ratio = Column(Float)
+    profit_margin = Column(Float)
+
+    # 傾向指標（記録時点のstock_trend_metricsの値）
+    revenue_cagr = Column(Float)
+    eps_cagr = Column(Float)
+    fcf_consistency = Column(Float)
+    operating_margin_volatility = Column(Float)
+
+    # メタデータ
+    recorded_at = Column(DateTime)
+
+    # リレーションシップ
+    stock = relationship("Stock")
+
+    def __repr__(self):
+        return f"<MetricSnapshot(stock_id={self.stock_id}, as_of={self.as_of}, source='{self.source}')>"
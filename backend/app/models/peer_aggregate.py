@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from app.database.connection import Base
+
+class PeerAggregate(Base):
+    """セクター・業種ごとの指標の分布テーブル（1グループ1指標1行）"""
+    __tablename__ = "peer_aggregates"
+
+    group_type = Column(String(20), primary_key=True)  # sector / industry
+    group_name = Column(String(100), primary_key=True)  # Stock.sector / Stock.industryの値
+    metric = Column(String(50), primary_key=True)  # PEER_METRICSのキー
+
+    # 有効な値（欠損・0、倍率指標は0以下を除く）の分布
+    count = Column(Integer, nullable=False)
+    q1 = Column(Float)
+    median = Column(Float)
+    q3 = Column(Float)
+
+    # メタデータ
+    computed_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<PeerAggregate(group_type='{self.group_type}', group_name='{self.group_name}', metric='{self.metric}')>"
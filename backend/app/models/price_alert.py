@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database.connection import Base
+
+class PriceAlert(Base):
+    """ウォッチリストの目標株価・損切り株価への到達を記録するアラートテーブル"""
+    __tablename__ = "price_alerts"
+    __table_args__ = (
+        # 未確認のアラートを新しい順にキーセットでページングするため
+        Index("ix_price_alerts_acknowledged_id", "acknowledged", "id"),
+        Index("ix_price_alerts_watch_list_id_id", "watch_list_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    watch_list_id = Column(Integer, ForeignKey("watch_lists.id"), nullable=False)
+    watch_list_item_id = Column(Integer, ForeignKey("watch_list_items.id"), nullable=False)
+    stock_id = Column(Integer, ForeignKey("stocks.id"), nullable=False)
+
+    # アラートの内容
+    alert_type = Column(String(20), nullable=False)  # target / stop_loss
+    threshold = Column(Float, nullable=False)  # 到達した目標株価・損切り株価
+    price = Column(Float, nullable=False)  # 到達時の株価
+    previous_price = Column(Float)  # 直前に評価した株価
+
+    # 確認状態
+    acknowledged = Column(Boolean, nullable=False, default=False)
+
+    # メタデータ
+    triggered_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # リレーションシップ
+    watch_list_item = relationship("WatchListItem", back_populates="alerts")
+    stock = relationship("Stock")
+
+    def __repr__(self):
+        return f"<PriceAlert(stock_id={self.stock_id}, alert_type='{self.alert_type}', price={self.price})>"
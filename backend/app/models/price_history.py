@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean
+from sqlalchemy.sql import func
+from app.database.connection import Base
+
+class PriceHistory(Base):
+    """日足の株価履歴テーブル（OHLCV）"""
+    __tablename__ = "price_history"
+
+    symbol = Column(String(20), primary_key=True)
+    date = Column(Date, primary_key=True)
+
+    # 四本値と出来高
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Integer)
+
+    def __repr__(self):
+        return f"<PriceHistory(symbol='{self.symbol}', date={self.date}, close={self.close})>"
+
+class PriceHistoryCoverage(Base):
+    """銘柄ごとの株価履歴の保存範囲テーブル"""
+    __tablename__ = "price_history_coverage"
+
+    symbol = Column(String(20), primary_key=True)
+
+    # 保存済みの範囲
+    covered_from = Column(Date)  # この日付以降の履歴を取得済み
+    is_full = Column(Boolean, default=False)  # 上場来（period=max）の履歴を取得済み
+    last_date = Column(Date)  # 保存済みの最新の日付
+
+    # メタデータ
+    last_fetched_at = Column(DateTime)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<PriceHistoryCoverage(symbol='{self.symbol}', last_date={self.last_date})>"
\ No newline at end of file
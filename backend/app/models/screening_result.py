@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.connection import Base
@@ -16,6 +16,7 @@ class ScreeningSession(Base):
     min_roe = Column(Float)
     max_debt_to_equity = Column(Float)
     min_current_ratio = Column(Float)
+    criteria = Column(Text)  # 対象銘柄を含む全条件（JSON形式、傾向指標・業種内比較の条件を含む）
     
     # 実行結果
     total_symbols = Column(Integer)
@@ -34,6 +35,10 @@ class ScreeningSession(Base):
 class ScreeningResult(Base):
     """スクリーニング結果テーブル"""
     __tablename__ = "screening_results"
+    __table_args__ = (
+        # セッション内の結果を順位（ID）順にキーセットでページングするため
+        Index("ix_screening_results_session_id_id", "session_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("screening_sessions.id"), nullable=False)
@@ -76,7 +81,12 @@ class WatchList(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # リレーションシップ
-    items = relationship("WatchListItem", back_populates="watch_list")
+    items = relationship(
+        "WatchListItem",
+        back_populates="watch_list",
+        cascade="all, delete-orphan",
+        order_by="WatchListItem.id"
+    )
     
     def __repr__(self):
         return f"<WatchList(name='{self.name}')>"
@@ -84,6 +94,10 @@ class WatchList(Base):
 class WatchListItem(Base):
     """ウォッチリストアイテムテーブル"""
     __tablename__ = "watch_list_items"
+    __table_args__ = (
+        # 同じ銘柄を1つのウォッチリストに重複して登録しない
+        UniqueConstraint("watch_list_id", "stock_id", name="uq_watch_list_items_stock"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     watch_list_id = Column(Integer, ForeignKey("watch_lists.id"), nullable=False)
@@ -100,6 +114,7 @@ class WatchListItem(Base):
     # リレーションシップ
     watch_list = relationship("WatchList", back_populates="items")
     stock = relationship("Stock", back_populates="watch_list_items")
+    alerts = relationship("PriceAlert", back_populates="watch_list_item", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<WatchListItem(watch_list_id={self.watch_list_id}, stock_id={self.stock_id})>"
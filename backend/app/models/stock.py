@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, Index
 from sqlalchemy.sql import func
 from app.database.connection import Base
 
 class Stock(Base):
     """株式基本情報テーブル"""
     __tablename__ = "stocks"
+    __table_args__ = (
+        # スコア順の走査でフィルタ列を索引内で判定できるようにする
+        Index(
+            "ix_stocks_screening",
+            "overall_score", "market_cap", "pe_ratio", "roe", "debt_to_equity", "current_ratio"
+        ),
+        # 絞り込みの強い範囲条件用
+        Index("ix_stocks_market_cap_score", "market_cap", "overall_score"),
+        Index("ix_stocks_pe_ratio_score", "pe_ratio", "overall_score"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     symbol = Column(String(10), unique=True, index=True, nullable=False)
@@ -35,6 +45,9 @@ class Stock(Base):
     shares_outstanding = Column(Integer)
     float_shares = Column(Integer)
     
+    # 財務健全性スコア（保存時に計算、スクリーニングの並び替え用）
+    overall_score = Column(Float)
+    
     # メタデータ
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
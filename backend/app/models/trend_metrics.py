@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from app.database.connection import Base
+
+class StockTrendMetrics(Base):
+    """財務諸表の履歴から計算した複数年の傾向指標テーブル（1銘柄1行）"""
+    __tablename__ = "stock_trend_metrics"
+
+    stock_id = Column(Integer, ForeignKey("stocks.id"), primary_key=True)
+
+    # 計算に使用した決算期の数
+    periods = Column(Integer)
+
+    # 成長性
+    revenue_cagr = Column(Float)  # 売上高の年平均成長率
+    eps_cagr = Column(Float)  # EPSの年平均成長率
+    revenue_growth_consistency = Column(Float)  # 前期比で増収した期の割合（0-1）
+
+    # 収益性の安定度
+    operating_margin_mean = Column(Float)
+    operating_margin_volatility = Column(Float)  # 営業利益率の標準偏差
+    net_margin_volatility = Column(Float)  # 純利益率の標準偏差
+
+    # キャッシュフロー
+    fcf_consistency = Column(Float)  # フリーキャッシュフローが黒字の期の割合（0-1）
+    fcf_margin_mean = Column(Float)  # フリーキャッシュフロー / 売上高の平均
+
+    # ROE
+    roe_mean = Column(Float)
+    roe_trend = Column(Float)  # ROEの1年あたりの変化（回帰直線の傾き）
+
+    # メタデータ
+    source_signature = Column(String(100))  # 計算元の財務諸表明細の要約（変更検知用）
+    computed_at = Column(DateTime)
+
+    # リレーションシップ
+    stock = relationship("Stock")
+
+    def __repr__(self):
+        return f"<StockTrendMetrics(stock_id={self.stock_id}, revenue_cagr={self.revenue_cagr})>"
@@ -0,0 +1,40 @@
+from .price_repository import PriceRepository, price_repository
+from .stock_repository import (
+    StockRepository,
+    StockWriteBehindQueue,
+    stock_repository,
+    stock_write_queue
+)
+from .screening_repository import ScreeningRepository, screening_repository
+from .financial_repository import FinancialRepository, financial_repository
+from .trend_repository import TrendMetricsRepository, trend_repository
+from .watchlist_repository import WatchListRepository, watchlist_repository
+from .alert_repository import AlertRepository, alert_repository
+from .snapshot_repository import SnapshotRepository, snapshot_repository
+from .buffett_score_repository import BuffettScoreRepository, buffett_score_repository
+from .peer_repository import PeerAggregateRepository, peer_repository
+
+__all__ = [
+    "PriceRepository",
+    "price_repository",
+    "StockRepository",
+    "StockWriteBehindQueue",
+    "stock_repository",
+    "stock_write_queue",
+    "ScreeningRepository",
+    "screening_repository",
+    "FinancialRepository",
+    "financial_repository",
+    "TrendMetricsRepository",
+    "trend_repository",
+    "WatchListRepository",
+    "watchlist_repository",
+    "AlertRepository",
+    "alert_repository",
+    "SnapshotRepository",
+    "snapshot_repository",
+    "BuffettScoreRepository",
+    "buffett_score_repository",
+    "PeerAggregateRepository",
+    "peer_repository"
+]
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+アラートリポジトリ - price_alertsテーブルと、アラート判定に使う株価水準の読み書きを担当
+"""
+from typing import Optional, Dict, Any, List
+import logging
+
+from sqlalchemy import select, insert, update, or_
+
+from app.database.connection import AsyncSessionLocal
+from app.models import Stock, WatchListItem, PriceAlert
+
+logger = logging.getLogger(__name__)
+
+
+class AlertRepository:
+    """価格アラートのリポジトリ"""
+
+    async def get_levels(self, symbols: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        目標株価・損切り株価が設定されたウォッチリストのアイテムを取得
+
+        Args:
+            symbols: 対象の株式ティッカーシンボル（Noneの場合は全銘柄）
+
+        Returns:
+            item_id, watch_list_id, stock_id, symbol, target_price, stop_loss_price,
+            current_price（保存済みの株価）を含む辞書のリスト
+        """
+        query = (
+            select(
+                WatchListItem.id,
+                WatchListItem.watch_list_id,
+                WatchListItem.stock_id,
+                Stock.symbol,
+                WatchListItem.target_price,
+                WatchListItem.stop_loss_price,
+                Stock.current_price
+            )
+            .join(Stock, Stock.id == WatchListItem.stock_id)
+            .where(or_(WatchListItem.target_price.isnot(None), WatchListItem.stop_loss_price.isnot(None)))
+        )
+        if symbols is not None:
+            if not symbols:
+                return []
+            query = query.where(Stock.symbol.in_([symbol.upper() for symbol in symbols]))
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        return [
+            {
+                "item_id": item_id,
+                "watch_list_id": watch_list_id,
+                "stock_id": stock_id,
+                "symbol": symbol,
+                "target_price": target_price,
+                "stop_loss_price": stop_loss_price,
+                "current_price": current_price
+            }
+            for item_id, watch_list_id, stock_id, symbol, target_price, stop_loss_price, current_price in rows
+        ]
+
+    async def save_alerts(self, alerts: List[Dict[str, Any]]) -> int:
+        """
+        アラートを一括で保存
+
+        Args:
+            alerts: watch_list_id, watch_list_item_id, stock_id, alert_type, threshold,
+                price, previous_priceを含む辞書のリスト
+
+        Returns:
+            保存した件数
+        """
+        if not alerts:
+            return 0
+
+        async with AsyncSessionLocal() as session:
+            # 判定後に削除されたアイテムのアラートは保存しない
+            item_ids = set(
+                (await session.execute(
+                    select(WatchListItem.id).where(
+                        WatchListItem.id.in_({alert["watch_list_item_id"] for alert in alerts})
+                    )
+                )).scalars()
+            )
+            rows = [alert for alert in alerts if alert["watch_list_item_id"] in item_ids]
+            if rows:
+                await session.execute(insert(PriceAlert), rows)
+                await session.commit()
+            return len(rows)
+
+    async def list_alerts(
+        self,
+        watch_list_id: Optional[int] = None,
+        unacknowledged_only: bool = False,
+        before_id: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        アラートを新しい順にキーセット方式でページ取得
+
+        Args:
+            watch_list_id: 対象のウォッチリストID（Noneの場合は全ウォッチリスト）
+            unacknowledged_only: 未確認のアラートのみ取得する場合はTrue
+            before_id: このIDより前のアラートを取得（前ページの最後のアラートID）
+            limit: 取得件数
+
+        Returns:
+            アラートの辞書のリスト
+        """
+        query = select(PriceAlert, Stock.symbol, Stock.name).join(Stock, Stock.id == PriceAlert.stock_id)
+        if watch_list_id is not None:
+            query = query.where(PriceAlert.watch_list_id == watch_list_id)
+        if unacknowledged_only:
+            query = query.where(PriceAlert.acknowledged.is_(False))
+        if before_id is not None:
+            query = query.where(PriceAlert.id < before_id)
+        query = query.order_by(PriceAlert.id.desc()).limit(limit)
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        return [self._alert_to_dict(alert, symbol, name) for alert, symbol, name in rows]
+
+    async def acknowledge(self, alert_id: int) -> Optional[Dict[str, Any]]:
+        """
+        アラートを確認済みにする
+
+        Returns:
+            更新後のアラートの辞書、存在しない場合はNone
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(PriceAlert).where(PriceAlert.id == alert_id).values(acknowledged=True)
+            )
+            await session.commit()
+            if result.rowcount == 0:
+                return None
+
+            row = (await session.execute(
+                select(PriceAlert, Stock.symbol, Stock.name)
+                .join(Stock, Stock.id == PriceAlert.stock_id)
+                .where(PriceAlert.id == alert_id)
+            )).one()
+            return self._alert_to_dict(*row)
+
+    @staticmethod
+    def _alert_to_dict(alert: PriceAlert, symbol: str, name: str) -> Dict[str, Any]:
+        return {
+            "id": alert.id,
+            "watch_list_id": alert.watch_list_id,
+            "watch_list_item_id": alert.watch_list_item_id,
+            "symbol": symbol,
+            "name": name,
+            "alert_type": alert.alert_type,
+            "threshold": alert.threshold,
+            "price": alert.price,
+            "previous_price": alert.previous_price,
+            "acknowledged": alert.acknowledged,
+            "triggered_at": alert.triggered_at.isoformat() if alert.triggered_at else None
+        }
+
+
+# リポジトリインスタンス
+alert_repository = AlertRepository()
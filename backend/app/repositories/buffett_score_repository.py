@@ -0,0 +1,182 @@
+"""
+バフェット式事前スコアリポジトリ - stock_buffett_scoresテーブルへの読み書きを担当
+"""
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+from datetime import datetime
+import logging
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database.connection import AsyncSessionLocal
+from app.models import Stock, StockTrendMetrics, BuffettScore
+
+logger = logging.getLogger(__name__)
+
+# スコアの計算に使う株式情報の列
+BUFFETT_STOCK_INPUTS = [
+    "pe_ratio", "pb_ratio", "peg_ratio", "roe", "debt_to_equity", "current_ratio",
+    "quick_ratio", "gross_margin", "operating_margin", "revenue_growth"
+]
+
+# スコアの計算に使う傾向指標の列
+BUFFETT_TREND_INPUTS = [
+    "revenue_cagr", "revenue_growth_consistency", "operating_margin_mean",
+    "net_margin_volatility", "fcf_consistency", "fcf_margin_mean", "roe_mean"
+]
+
+# stock_buffett_scoresテーブルのスコアの列
+BUFFETT_SCORE_FIELDS = [
+    "moat_score", "valuation_score", "financial_health_score", "cash_flow_score",
+    "revenue_growth_score", "industry_growth_score", "pre_score", "coverage"
+]
+
+
+class BuffettScoreRepository:
+    """バフェット式事前スコアのリポジトリ"""
+
+    async def get_inputs(self) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """
+        保存済みの全銘柄のスコア計算用の指標と、前回の計算時の要約を1回のクエリで取得
+
+        Returns:
+            (列名のリスト, 行のリスト)
+        """
+        columns = (
+            [Stock.id, Stock.symbol, Stock.sector, Stock.industry]
+            + [getattr(Stock, field) for field in BUFFETT_STOCK_INPUTS]
+            + [getattr(StockTrendMetrics, field) for field in BUFFETT_TREND_INPUTS]
+            + [BuffettScore.source_signature]
+        )
+        query = (
+            select(*columns)
+            .outerjoin(StockTrendMetrics, StockTrendMetrics.stock_id == Stock.id)
+            .outerjoin(BuffettScore, BuffettScore.stock_id == Stock.id)
+        )
+
+        async with AsyncSessionLocal() as session:
+            rows = [tuple(row) for row in (await session.execute(query)).all()]
+
+        names = (
+            ["stock_id", "symbol", "sector", "industry"]
+            + BUFFETT_STOCK_INPUTS + BUFFETT_TREND_INPUTS + ["stored_signature"]
+        )
+        return names, rows
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        事前スコアをまとめて追加・更新
+
+        Args:
+            rows: stock_id, BUFFETT_SCORE_FIELDS, source_signatureを含む辞書のリスト
+
+        Returns:
+            処理した行数
+        """
+        if not rows:
+            return 0
+
+        computed_at = datetime.now()
+        stmt = sqlite_insert(BuffettScore)
+        update_columns = {field: stmt.excluded[field] for field in BUFFETT_SCORE_FIELDS}
+        update_columns["source_signature"] = stmt.excluded.source_signature
+        update_columns["computed_at"] = stmt.excluded.computed_at
+        stmt = stmt.on_conflict_do_update(index_elements=[BuffettScore.stock_id], set_=update_columns)
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt, [{**row, "computed_at": computed_at} for row in rows])
+            await session.commit()
+
+        return len(rows)
+
+    async def get_many(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数銘柄の事前スコアを1回のクエリで取得
+
+        Args:
+            symbols: 株式ティッカーシンボルのリスト
+
+        Returns:
+            シンボルをキーとした事前スコアの辞書
+        """
+        symbols = list({symbol.upper() for symbol in symbols})
+        if not symbols:
+            return {}
+
+        query = (
+            select(Stock, BuffettScore)
+            .join(Stock, Stock.id == BuffettScore.stock_id)
+            .where(Stock.symbol.in_(symbols))
+        )
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+            return {stock.symbol: self.to_dict(stock, score) for stock, score in rows}
+
+    async def get_ranked(
+        self,
+        min_score: Optional[float] = None,
+        min_coverage: Optional[float] = None,
+        sector: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        事前スコアの降順に銘柄を取得
+
+        Args:
+            min_score: 最小の総合スコア
+            min_coverage: 算出できた観点の重要度の合計の最小値
+            sector: 対象のセクター
+            offset: 取得開始位置
+            limit: 取得件数
+
+        Returns:
+            (スコアの降順に並んだ事前スコアのリスト, 条件に合致した総件数)
+        """
+        conditions = [BuffettScore.pre_score.is_not(None)]
+        if min_score is not None:
+            conditions.append(BuffettScore.pre_score >= min_score)
+        if min_coverage is not None:
+            conditions.append(BuffettScore.coverage >= min_coverage)
+        if sector:
+            conditions.append(Stock.sector == sector)
+
+        query = (
+            select(Stock, BuffettScore)
+            .join(Stock, Stock.id == BuffettScore.stock_id)
+            .where(*conditions)
+            .order_by(BuffettScore.pre_score.desc(), Stock.symbol)
+            .offset(offset)
+            .limit(limit)
+        )
+        count_query = (
+            select(func.count(BuffettScore.stock_id))
+            .join(Stock, Stock.id == BuffettScore.stock_id)
+            .where(*conditions)
+        )
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+            total = (await session.execute(count_query)).scalar_one()
+            return [self.to_dict(stock, score) for stock, score in rows], total
+
+    @staticmethod
+    def to_dict(stock: Stock, score: BuffettScore) -> Dict[str, Any]:
+        """
+        BuffettScoreモデルを辞書に変換
+        """
+        data = {
+            "symbol": stock.symbol,
+            "name": stock.name,
+            "sector": stock.sector,
+            "industry": stock.industry
+        }
+        for field in BUFFETT_SCORE_FIELDS:
+            data[field] = getattr(score, field)
+        data["last_updated"] = (score.computed_at or datetime.now()).isoformat()
+        return data
+
+
+# リポジトリインスタンス
+buffett_score_repository = BuffettScoreRepository()
@@ -0,0 +1,184 @@
+"""
+財務諸表リポジトリ - financial_statement_itemsテーブルへの読み書きを担当
+"""
+from typing import Optional, Dict, Any, List
+from datetime import date, datetime
+import logging
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database.connection import AsyncSessionLocal
+from app.models import Stock, FinancialStatementItem
+from app.repositories.stock_repository import stock_repository
+
+logger = logging.getLogger(__name__)
+
+# 財務諸表の種類（レスポンスのキー）
+STATEMENTS = ["financials", "balance_sheet", "cashflow"]
+
+
+class FinancialRepository:
+    """財務諸表明細のリポジトリ"""
+
+    async def get_statements(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        銘柄の財務諸表を明細から組み立てて取得
+
+        Args:
+            symbol: 株式ティッカーシンボル
+
+        Returns:
+            諸表ごとに{決算期末日: {勘定科目: 値}}を持つ辞書（fetched_atを含む）、未保存の場合はNone
+            （last_updatedは組み立てた時刻。キャッシュの経過時間はこれを基準にする）
+        """
+        query = (
+            select(
+                FinancialStatementItem.statement,
+                FinancialStatementItem.period_end,
+                FinancialStatementItem.line_item,
+                FinancialStatementItem.value,
+                FinancialStatementItem.fetched_at
+            )
+            .join(Stock, Stock.id == FinancialStatementItem.stock_id)
+            .where(Stock.symbol == symbol.upper())
+            .order_by(
+                FinancialStatementItem.statement,
+                FinancialStatementItem.period_end.desc(),
+                FinancialStatementItem.id
+            )
+        )
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        if not rows:
+            return None
+
+        statements: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {name: {} for name in STATEMENTS}
+        fetched_at = None
+        for statement, period_end, line_item, value, row_fetched_at in rows:
+            statements.setdefault(statement, {}).setdefault(period_end.isoformat(), {})[line_item] = value
+            if row_fetched_at is not None and (fetched_at is None or row_fetched_at > fetched_at):
+                fetched_at = row_fetched_at
+
+        return {
+            "symbol": symbol.upper(),
+            **statements,
+            "fetched_at": fetched_at,
+            "last_updated": datetime.now().isoformat()
+        }
+
+    async def upsert_items(self, symbol: str, items: List[Dict[str, Any]]) -> int:
+        """
+        財務諸表の明細を1トランザクションでまとめて追加・更新
+
+        データソースが返さなくなった古い決算期の明細は削除せずに残す。
+
+        Args:
+            symbol: 株式ティッカーシンボル
+            items: statement, line_item, period_end, valueを含む辞書のリスト
+
+        Returns:
+            追加・更新した行数
+        """
+        if not items:
+            return 0
+
+        fetched_at = datetime.now()
+        async with AsyncSessionLocal() as session:
+            stock_id = (await stock_repository.ensure_ids_in_session(session, [symbol]))[symbol.upper()]
+
+            stmt = sqlite_insert(FinancialStatementItem)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[
+                    FinancialStatementItem.stock_id,
+                    FinancialStatementItem.statement,
+                    FinancialStatementItem.line_item,
+                    FinancialStatementItem.period_end
+                ],
+                set_={"value": stmt.excluded.value, "fetched_at": stmt.excluded.fetched_at}
+            )
+            await session.execute(
+                stmt,
+                [{**item, "stock_id": stock_id, "fetched_at": fetched_at} for item in items]
+            )
+            await session.commit()
+
+        return len(items)
+
+    async def get_line_item(
+        self,
+        line_item: str,
+        statement: Optional[str] = None,
+        period_end: Optional[date] = None,
+        latest: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        勘定科目の値を全銘柄横断で取得
+
+        Args:
+            line_item: 勘定科目（例: Free Cash Flow）
+            statement: 財務諸表の種類（Noneの場合は全て）
+            period_end: 決算期末日（指定時はその決算期のみ）
+            latest: Trueの場合は銘柄ごとに最新の決算期のみ（period_end指定時は無視）
+
+        Returns:
+            symbol, statement, period_end, valueを含む辞書のリスト（シンボル順、決算期の新しい順）
+        """
+        conditions = [FinancialStatementItem.line_item == line_item]
+        if statement is not None:
+            conditions.append(FinancialStatementItem.statement == statement)
+        if period_end is not None:
+            conditions.append(FinancialStatementItem.period_end == period_end)
+
+        query = (
+            select(
+                Stock.symbol,
+                FinancialStatementItem.statement,
+                FinancialStatementItem.period_end,
+                FinancialStatementItem.value
+            )
+            .join(Stock, Stock.id == FinancialStatementItem.stock_id)
+            .where(*conditions)
+        )
+
+        if latest and period_end is None:
+            # 銘柄・諸表ごとの最新決算期に絞り込む
+            newest = (
+                select(
+                    FinancialStatementItem.stock_id,
+                    FinancialStatementItem.statement,
+                    func.max(FinancialStatementItem.period_end).label("period_end")
+                )
+                .where(*conditions)
+                .group_by(FinancialStatementItem.stock_id, FinancialStatementItem.statement)
+                .subquery()
+            )
+            query = query.join(
+                newest,
+                and_(
+                    newest.c.stock_id == FinancialStatementItem.stock_id,
+                    newest.c.statement == FinancialStatementItem.statement,
+                    newest.c.period_end == FinancialStatementItem.period_end
+                )
+            )
+
+        query = query.order_by(Stock.symbol, FinancialStatementItem.period_end.desc())
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        return [
+            {
+                "symbol": symbol,
+                "statement": row_statement,
+                "period_end": row_period_end.isoformat(),
+                "value": value
+            }
+            for symbol, row_statement, row_period_end, value in rows
+        ]
+
+
+# リポジトリインスタンス
+financial_repository = FinancialRepository()
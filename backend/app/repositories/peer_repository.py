@@ -0,0 +1,130 @@
+"""
+業種内比較リポジトリ - peer_aggregatesテーブルへの読み書きを担当
+"""
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+from datetime import datetime
+import logging
+
+from sqlalchemy import select, delete, or_, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database.connection import AsyncSessionLocal
+from app.models import Stock, StockTrendMetrics, PeerAggregate
+
+logger = logging.getLogger(__name__)
+
+# 分布を集計する株式情報の指標
+PEER_STOCK_METRICS = [
+    "pe_ratio", "pb_ratio", "peg_ratio", "dividend_yield", "roe", "roa", "debt_to_equity",
+    "current_ratio", "gross_margin", "operating_margin", "profit_margin", "revenue_growth"
+]
+
+# 分布を集計する傾向指標
+PEER_TREND_METRICS = ["revenue_cagr"]
+
+PEER_METRICS = PEER_STOCK_METRICS + PEER_TREND_METRICS
+
+# 比較対象のグループ（Stockの列名）
+PEER_GROUP_TYPES = ["sector", "industry"]
+
+
+class PeerAggregateRepository:
+    """セクター・業種ごとの指標の分布のリポジトリ"""
+
+    async def get_members(
+        self,
+        sectors: Optional[Iterable[str]] = None,
+        industries: Optional[Iterable[str]] = None
+    ) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """
+        指定したセクター・業種に属する銘柄の指標を1回のクエリで取得
+
+        Args:
+            sectors: 対象のセクター（sectors・industriesともにNoneの場合は全銘柄）
+            industries: 対象の業種
+
+        Returns:
+            (列名のリスト, 行のリスト)
+        """
+        query = (
+            select(
+                Stock.symbol,
+                Stock.sector,
+                Stock.industry,
+                *(getattr(Stock, metric) for metric in PEER_STOCK_METRICS),
+                *(getattr(StockTrendMetrics, metric) for metric in PEER_TREND_METRICS)
+            )
+            .outerjoin(StockTrendMetrics, StockTrendMetrics.stock_id == Stock.id)
+            # 株式情報が未取得の行（財務諸表の保存時に追加した行）は分布に含めない
+            .where(Stock.last_api_fetch.is_not(None))
+        )
+        if sectors is not None or industries is not None:
+            query = query.where(or_(
+                Stock.sector.in_(list(sectors or [])),
+                Stock.industry.in_(list(industries or []))
+            ))
+
+        async with AsyncSessionLocal() as session:
+            rows = [tuple(row) for row in (await session.execute(query)).all()]
+
+        return ["symbol"] + PEER_GROUP_TYPES + PEER_METRICS, rows
+
+    async def replace_groups(
+        self,
+        groups: Optional[Iterable[Tuple[str, str]]],
+        rows: List[Dict[str, Any]]
+    ) -> int:
+        """
+        グループの分布を1トランザクションで置き換える（銘柄がいなくなったグループは削除される）
+
+        Args:
+            groups: 置き換える(group_type, group_name)のリスト（Noneの場合は全グループ）
+            rows: group_type, group_name, metric, count, q1, median, q3を含む辞書のリスト
+
+        Returns:
+            保存した行数
+        """
+        stmt = delete(PeerAggregate)
+        if groups is not None:
+            groups = list(groups)
+            if not groups:
+                return 0
+            stmt = stmt.where(tuple_(PeerAggregate.group_type, PeerAggregate.group_name).in_(groups))
+
+        computed_at = datetime.now()
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt)
+            if rows:
+                await session.execute(
+                    sqlite_insert(PeerAggregate),
+                    [{**row, "computed_at": computed_at} for row in rows]
+                )
+            await session.commit()
+
+        return len(rows)
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        """
+        保存済みの全グループの分布を取得
+
+        Returns:
+            group_type, group_name, metric, count, q1, median, q3を含む辞書のリスト
+        """
+        async with AsyncSessionLocal() as session:
+            aggregates = (await session.execute(select(PeerAggregate))).scalars().all()
+            return [
+                {
+                    "group_type": aggregate.group_type,
+                    "group_name": aggregate.group_name,
+                    "metric": aggregate.metric,
+                    "count": aggregate.count,
+                    "q1": aggregate.q1,
+                    "median": aggregate.median,
+                    "q3": aggregate.q3
+                }
+                for aggregate in aggregates
+            ]
+
+
+# リポジトリインスタンス
+peer_repository = PeerAggregateRepository()
@@ -0,0 +1,222 @@
+"""
+株価履歴リポジトリ - price_history / price_history_coverageテーブルへの読み書きを担当
+"""
+from typing import Optional, Dict, Any, List
+from datetime import date, datetime
+import logging
+
+from sqlalchemy import select, delete, func, cast, Integer, String
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database.connection import AsyncSessionLocal
+from app.models import PriceHistory, PriceHistoryCoverage
+
+logger = logging.getLogger(__name__)
+
+# 列形式の履歴データとテーブルのカラムの対応
+BAR_COLUMNS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume"
+}
+
+# リバランス間隔と1年あたりの回数
+REBALANCE_PERIODS = {
+    "weekly": 52,
+    "monthly": 12,
+    "quarterly": 4
+}
+
+
+def period_bucket(column: Any, rebalance: str) -> Any:
+    """
+    日付の列をリバランス期間のキー（文字列の昇順が期間の順序になる）に変換するSQL式
+
+    Args:
+        column: 日付の列
+        rebalance: リバランス間隔（REBALANCE_PERIODSのキー）
+    """
+    if rebalance == "weekly":
+        return func.strftime("%Y-%W", column)
+    if rebalance == "quarterly":
+        quarter = (cast(func.substr(column, 6, 2), Integer) + 2) // 3
+        return func.substr(column, 1, 4).concat("-Q").concat(cast(quarter, String))
+    return func.substr(column, 1, 7)
+
+
+class PriceRepository:
+    """株価履歴のリポジトリ"""
+
+    async def get_coverage(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        銘柄の保存範囲を取得
+
+        Args:
+            symbol: 株式ティッカーシンボル
+
+        Returns:
+            保存範囲の辞書、未保存の場合はNone
+        """
+        async with AsyncSessionLocal() as session:
+            coverage = await session.get(PriceHistoryCoverage, symbol.upper())
+            if coverage is None:
+                return None
+            return {
+                "symbol": coverage.symbol,
+                "covered_from": coverage.covered_from,
+                "is_full": bool(coverage.is_full),
+                "last_date": coverage.last_date,
+                "last_fetched_at": coverage.last_fetched_at
+            }
+
+    async def get_bars(
+        self,
+        symbol: str,
+        start: Optional[date] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, List[Any]]:
+        """
+        保存済みの株価履歴を列形式で取得
+
+        Args:
+            symbol: 株式ティッカーシンボル
+            start: この日付以降のデータを取得（Noneの場合は全期間）
+            limit: 最新から数えた取得件数の上限
+
+        Returns:
+            Date/Open/High/Low/Close/Volumeごとの配列の辞書（日付の昇順）
+        """
+        query = select(
+            PriceHistory.date,
+            PriceHistory.open,
+            PriceHistory.high,
+            PriceHistory.low,
+            PriceHistory.close,
+            PriceHistory.volume
+        ).where(PriceHistory.symbol == symbol.upper())
+        if start is not None:
+            query = query.where(PriceHistory.date >= start)
+
+        if limit is not None:
+            query = query.order_by(PriceHistory.date.desc()).limit(limit)
+        else:
+            query = query.order_by(PriceHistory.date)
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        if limit is not None:
+            rows.reverse()
+
+        names = ["Date"] + list(BAR_COLUMNS.keys())
+        if not rows:
+            return {name: [] for name in names}
+
+        columns = dict(zip(names, (list(values) for values in zip(*rows))))
+        columns["Date"] = [value.isoformat() for value in columns["Date"]]
+        return columns
+
+    async def get_period_closes(
+        self,
+        symbols: Optional[List[str]],
+        start: date,
+        end: date,
+        rebalance: str
+    ) -> Dict[str, List[Any]]:
+        """
+        リバランス期間ごとに各銘柄の最後の終値を列形式で取得
+
+        Args:
+            symbols: 対象の株式ティッカーシンボル（Noneの場合は保存済みの全銘柄）
+            start: 開始日
+            end: 終了日
+            rebalance: リバランス間隔（REBALANCE_PERIODSのキー）
+
+        Returns:
+            symbol, bucket, date, closeごとの配列の辞書
+        """
+        bucket = period_bucket(PriceHistory.date, rebalance)
+        # SQLiteではmax()と同時に選択した列は最大値の行の値になる
+        query = (
+            select(PriceHistory.symbol, bucket, func.max(PriceHistory.date), PriceHistory.close)
+            .where(PriceHistory.date >= start, PriceHistory.date <= end)
+            .group_by(PriceHistory.symbol, bucket)
+        )
+        if symbols is not None:
+            query = query.where(PriceHistory.symbol.in_([symbol.upper() for symbol in symbols]))
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        names = ["symbol", "bucket", "date", "close"]
+        if not rows:
+            return {name: [] for name in names}
+        return dict(zip(names, (list(values) for values in zip(*rows))))
+
+    async def upsert_bars(
+        self,
+        symbol: str,
+        bars: Dict[str, List[Any]],
+        covered_from: Optional[date],
+        is_full: bool = False,
+        replace: bool = False
+    ) -> int:
+        """
+        株価履歴を追加・更新し、保存範囲を1トランザクションで更新
+
+        Args:
+            symbol: 株式ティッカーシンボル
+            bars: 列形式の株価履歴（DateはISO形式の日付文字列）
+            covered_from: 今回の取得で保存済みとなった範囲の開始日
+            is_full: 上場来の履歴を取得した場合はTrue
+            replace: Trueの場合は保存済みの株価履歴を削除してから保存する（調整の基準が変わった場合）
+
+        Returns:
+            追加・更新した行数
+        """
+        symbol = symbol.upper()
+        rows = []
+        for index, value in enumerate(bars.get("Date", [])):
+            row = {"symbol": symbol, "date": date.fromisoformat(value[:10])}
+            for name, column in BAR_COLUMNS.items():
+                row[column] = bars[name][index]
+            rows.append(row)
+
+        async with AsyncSessionLocal() as session:
+            if replace:
+                await session.execute(delete(PriceHistory).where(PriceHistory.symbol == symbol))
+            if rows:
+                stmt = sqlite_insert(PriceHistory)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[PriceHistory.symbol, PriceHistory.date],
+                    set_={column: stmt.excluded[column] for column in BAR_COLUMNS.values()}
+                )
+                await session.execute(stmt, rows)
+
+            coverage = await session.get(PriceHistoryCoverage, symbol)
+            if coverage is None:
+                coverage = PriceHistoryCoverage(symbol=symbol, is_full=False)
+                session.add(coverage)
+
+            coverage.is_full = bool(coverage.is_full) or is_full
+            if covered_from is not None and (
+                coverage.covered_from is None or covered_from < coverage.covered_from
+            ):
+                coverage.covered_from = covered_from
+            if replace:
+                coverage.last_date = None
+            if rows:
+                newest = max(row["date"] for row in rows)
+                if coverage.last_date is None or newest > coverage.last_date:
+                    coverage.last_date = newest
+            coverage.last_fetched_at = datetime.now()
+
+            await session.commit()
+
+        return len(rows)
+
+
+# リポジトリインスタンス
+price_repository = PriceRepository()
@@ -0,0 +1,166 @@
+"""
+スクリーニングリポジトリ - screening_sessions / screening_resultsテーブルへの読み書きを担当
+"""
+from typing import Optional, Dict, Any, List
+import json
+import logging
+
+from sqlalchemy import select, insert
+
+from app.database.connection import AsyncSessionLocal
+from app.models import Stock, ScreeningSession, ScreeningResult
+from app.repositories.stock_repository import stock_repository
+
+logger = logging.getLogger(__name__)
+
+
+class ScreeningRepository:
+    """スクリーニング実行結果のリポジトリ"""
+
+    async def save_run(
+        self,
+        request_id: str,
+        criteria: Any,
+        stock_infos: Dict[str, Dict[str, Any]],
+        results: List[Dict[str, Any]],
+        total_symbols: int,
+        passed_symbols: int,
+        execution_time: float
+    ) -> None:
+        """
+        スクリーニング1回分の条件と結果を1トランザクションで保存
+
+        結果は順位順に一括挿入するため、結果のIDの昇順がそのまま順位となる。
+
+        Args:
+            request_id: スクリーニングのリクエストID（UUID）
+            criteria: スクリーニング条件（ScreeningCriteria）
+            stock_infos: シンボルをキーとした整形済みの株式情報
+            results: 順位順の結果（symbol, overall_score, detailed_scores, meets_criteriaを含む辞書）
+            total_symbols: 対象銘柄数
+            passed_symbols: 条件に合致した銘柄数
+            execution_time: 実行時間（秒）
+        """
+        async with AsyncSessionLocal() as session:
+            # 結果が参照する銘柄をstocksテーブルに反映
+            symbols = [result["symbol"] for result in results]
+            await stock_repository.upsert_in_session(
+                session,
+                [stock_infos[symbol] for symbol in symbols]
+            )
+            stock_ids = dict(
+                (await session.execute(
+                    select(Stock.symbol, Stock.id).where(Stock.symbol.in_(symbols))
+                )).all()
+            ) if symbols else {}
+
+            screening_session = ScreeningSession(
+                session_id=request_id,
+                min_market_cap=criteria.min_market_cap,
+                max_pe_ratio=criteria.max_pe_ratio,
+                min_roe=criteria.min_roe,
+                max_debt_to_equity=criteria.max_debt_to_equity,
+                min_current_ratio=criteria.min_current_ratio,
+                criteria=json.dumps(criteria.model_dump()),
+                total_symbols=total_symbols,
+                passed_symbols=passed_symbols,
+                execution_time=execution_time
+            )
+            session.add(screening_session)
+            await session.flush()
+
+            rows = []
+            for result in results:
+                stock_info = stock_infos[result["symbol"]]
+                rows.append({
+                    "session_id": screening_session.id,
+                    "stock_id": stock_ids[result["symbol"]],
+                    "overall_score": result["overall_score"],
+                    "meets_criteria": result["meets_criteria"],
+                    "detailed_scores": json.dumps(result["detailed_scores"]),
+                    "market_cap_snapshot": stock_info.get("market_cap"),
+                    "pe_ratio_snapshot": stock_info.get("pe_ratio"),
+                    "roe_snapshot": stock_info.get("roe"),
+                    "debt_to_equity_snapshot": stock_info.get("debt_to_equity"),
+                    "current_ratio_snapshot": stock_info.get("current_ratio")
+                })
+            if rows:
+                await session.execute(insert(ScreeningResult), rows)
+
+            await session.commit()
+
+    async def get_session(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """
+        保存済みのスクリーニングセッションを取得
+
+        Args:
+            request_id: スクリーニングのリクエストID
+
+        Returns:
+            セッション情報の辞書、存在しない場合はNone
+        """
+        async with AsyncSessionLocal() as session:
+            screening_session = (await session.execute(
+                select(ScreeningSession).where(ScreeningSession.session_id == request_id)
+            )).scalar_one_or_none()
+            if screening_session is None:
+                return None
+
+            return {
+                "id": screening_session.id,
+                "request_id": screening_session.session_id,
+                "criteria": json.loads(screening_session.criteria) if screening_session.criteria else None,
+                "total_symbols": screening_session.total_symbols,
+                "passed_symbols": screening_session.passed_symbols,
+                "execution_time": screening_session.execution_time,
+                "created_at": screening_session.created_at
+            }
+
+    async def get_results_page(
+        self,
+        session_pk: int,
+        after_id: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        保存済みの結果をキーセット方式でページ取得
+
+        Args:
+            session_pk: screening_sessionsテーブルのID
+            after_id: このIDより後の結果を取得（前ページの最後の結果ID）
+            limit: 取得件数
+
+        Returns:
+            順位順の結果のリスト
+        """
+        query = (
+            select(ScreeningResult, Stock.symbol, Stock.name)
+            .join(Stock, Stock.id == ScreeningResult.stock_id)
+            .where(ScreeningResult.session_id == session_pk)
+        )
+        if after_id is not None:
+            query = query.where(ScreeningResult.id > after_id)
+        query = query.order_by(ScreeningResult.id).limit(limit)
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        return [
+            {
+                "id": result.id,
+                "symbol": symbol,
+                "name": name,
+                "score": result.overall_score,
+                "market_cap": result.market_cap_snapshot,
+                "pe_ratio": result.pe_ratio_snapshot,
+                "roe": result.roe_snapshot,
+                "debt_to_equity": result.debt_to_equity_snapshot,
+                "current_ratio": result.current_ratio_snapshot,
+                "meets_criteria": result.meets_criteria
+            }
+            for result, symbol, name in rows
+        ]
+
+
+# リポジトリインスタンス
+screening_repository = ScreeningRepository()
@@ -0,0 +1,151 @@
+"""
+指標スナップショットリポジトリ - metric_snapshotsテーブルへの読み書きを担当
+"""
+from typing import Optional, Dict, Any, List, Iterable
+from datetime import date, datetime
+import logging
+
+from sqlalchemy import select, literal, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.connection import AsyncSessionLocal
+from app.models import Stock, StockTrendMetrics, MetricSnapshot
+from app.repositories.price_repository import period_bucket
+
+logger = logging.getLogger(__name__)
+
+# スナップショットの指標の列
+SNAPSHOT_FIELDS = [
+    "price", "market_cap", "shares_outstanding", "eps", "pe_ratio",
+    "roe", "debt_to_equity", "current_ratio", "profit_margin",
+    "revenue_cagr", "eps_cagr", "fcf_consistency", "operating_margin_volatility"
+]
+
+
+class SnapshotRepository:
+    """指標スナップショットのリポジトリ"""
+
+    async def record_live_in_session(self, session: AsyncSession, symbols: Iterable[str]) -> None:
+        """
+        保存済みの株式情報・傾向指標を当日のスナップショットとして記録（コミットは呼び出し側で行う）
+
+        同じ日に複数回記録した場合は最後の値で上書きする。
+
+        Args:
+            session: データベースセッション
+            symbols: 株式ティッカーシンボルのリスト
+        """
+        symbols = [symbol.upper() for symbol in symbols]
+        if not symbols:
+            return
+
+        columns = [
+            "stock_id", "as_of", "source", "price", "market_cap", "shares_outstanding", "pe_ratio",
+            "roe", "debt_to_equity", "current_ratio", "profit_margin", "revenue_cagr", "eps_cagr",
+            "fcf_consistency", "operating_margin_volatility", "recorded_at"
+        ]
+        source = (
+            select(
+                Stock.id,
+                literal(date.today()),
+                literal("live"),
+                Stock.current_price,
+                Stock.market_cap,
+                Stock.shares_outstanding,
+                Stock.pe_ratio,
+                Stock.roe,
+                Stock.debt_to_equity,
+                Stock.current_ratio,
+                Stock.profit_margin,
+                StockTrendMetrics.revenue_cagr,
+                StockTrendMetrics.eps_cagr,
+                StockTrendMetrics.fcf_consistency,
+                StockTrendMetrics.operating_margin_volatility,
+                literal(datetime.now())
+            )
+            .outerjoin(StockTrendMetrics, StockTrendMetrics.stock_id == Stock.id)
+            .where(Stock.symbol.in_(symbols))
+        )
+        stmt = sqlite_insert(MetricSnapshot).from_select(columns, source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MetricSnapshot.stock_id, MetricSnapshot.as_of],
+            set_={column: stmt.excluded[column] for column in columns[2:]}
+        )
+        await session.execute(stmt)
+
+    async def upsert_statement_snapshots(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        財務諸表から計算したスナップショットを保存（同じ日の株式情報のスナップショットは上書きしない）
+
+        Args:
+            rows: stock_id, as_ofとSNAPSHOT_FIELDSを含む辞書のリスト
+
+        Returns:
+            処理した行数
+        """
+        if not rows:
+            return 0
+
+        recorded_at = datetime.now()
+        rows = [{**row, "source": "statements", "recorded_at": recorded_at} for row in rows]
+        stmt = sqlite_insert(MetricSnapshot)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MetricSnapshot.stock_id, MetricSnapshot.as_of],
+            set_={column: stmt.excluded[column] for column in SNAPSHOT_FIELDS + ["recorded_at"]},
+            where=MetricSnapshot.source == "statements"
+        )
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt, rows)
+            await session.commit()
+        return len(rows)
+
+    async def get_period_snapshots(
+        self,
+        symbols: Optional[List[str]],
+        end: date,
+        rebalance: str
+    ) -> Dict[str, List[Any]]:
+        """
+        リバランス期間ごとに各銘柄の最後のスナップショットを列形式で取得
+
+        開始日より前の期間も含めて取得し、評価時には直前の値を引き継ぐ。
+
+        Args:
+            symbols: 対象の株式ティッカーシンボル（Noneの場合は全銘柄）
+            end: この日付までのスナップショットを取得
+            rebalance: リバランス間隔（weekly / monthly / quarterly）
+
+        Returns:
+            symbol, bucket, as_ofとSNAPSHOT_FIELDSごとの配列の辞書（as_ofの昇順）
+        """
+        bucket = period_bucket(MetricSnapshot.as_of, rebalance)
+        # SQLiteではmax()と同時に選択した列は最大値の行の値になる
+        query = (
+            select(
+                Stock.symbol,
+                bucket,
+                func.max(MetricSnapshot.as_of),
+                *(getattr(MetricSnapshot, field) for field in SNAPSHOT_FIELDS)
+            )
+            .join(Stock, Stock.id == MetricSnapshot.stock_id)
+            .where(MetricSnapshot.as_of <= end)
+            .group_by(MetricSnapshot.stock_id, bucket)
+        )
+        if symbols is not None:
+            query = query.where(Stock.symbol.in_([symbol.upper() for symbol in symbols]))
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        names = ["symbol", "bucket", "as_of"] + SNAPSHOT_FIELDS
+        if not rows:
+            return {name: [] for name in names}
+
+        rows.sort(key=lambda row: row[2])
+        return dict(zip(names, (list(values) for values in zip(*rows))))
+
+
+# リポジトリインスタンス
+snapshot_repository = SnapshotRepository()
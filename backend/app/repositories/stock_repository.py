@@ -0,0 +1,503 @@
+"""
+株式リポジトリ - stocksテーブルへの読み書きを担当
+"""
+from typing import Optional, Dict, Any, List, Iterable, Tuple, Callable, Set
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.connection import AsyncSessionLocal
+from app.models import Stock, WatchListItem, StockTrendMetrics, PeerAggregate
+from app.repositories.snapshot_repository import snapshot_repository
+
+logger = logging.getLogger(__name__)
+
+# _format_stock_dataの出力とstocksテーブルで共通する項目
+STOCK_FIELDS = [
+    "name", "sector", "industry", "market_cap", "current_price", "pe_ratio",
+    "pb_ratio", "peg_ratio", "dividend_yield", "beta", "roe", "roa",
+    "debt_to_equity", "current_ratio", "quick_ratio", "gross_margin",
+    "operating_margin", "profit_margin", "revenue_growth", "earnings_growth",
+    "fifty_two_week_high", "fifty_two_week_low", "volume", "average_volume",
+    "shares_outstanding", "float_shares"
+]
+
+
+class StockRepository:
+    """stocksテーブルのリポジトリ"""
+
+    async def get_by_symbol(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        シンボルで株式情報を取得
+
+        Args:
+            symbol: 株式ティッカーシンボル
+
+        Returns:
+            _format_stock_dataと同じ形式の辞書（last_api_fetchを含む）、存在しない場合はNone
+        """
+        return (await self.get_many([symbol])).get(symbol.upper())
+
+    async def get_many(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数シンボルの株式情報を1回のクエリで取得
+
+        Args:
+            symbols: 株式ティッカーシンボルのリスト
+
+        Returns:
+            シンボルをキーとした株式情報の辞書
+        """
+        symbols = list({symbol.upper() for symbol in symbols})
+        if not symbols:
+            return {}
+
+        async with AsyncSessionLocal() as session:
+            stocks = (await session.execute(
+                select(Stock).where(Stock.symbol.in_(symbols))
+            )).scalars().all()
+            return {stock.symbol: self.to_dict(stock) for stock in stocks}
+
+    async def bulk_upsert(self, stock_infos: List[Dict[str, Any]]) -> int:
+        """
+        株式情報を1トランザクションでまとめて挿入・更新
+
+        Args:
+            stock_infos: _format_stock_dataで整形済みの株式情報のリスト
+
+        Returns:
+            処理した行数
+        """
+        if not stock_infos:
+            return 0
+
+        async with AsyncSessionLocal() as session:
+            written = await self.upsert_in_session(session, stock_infos)
+            await session.commit()
+
+        return written
+
+    async def upsert_in_session(self, session: AsyncSession, stock_infos: List[Dict[str, Any]]) -> int:
+        """
+        既存のセッション内で株式情報をまとめて挿入・更新（コミットは呼び出し側で行う）
+
+        Args:
+            session: データベースセッション
+            stock_infos: _format_stock_dataで整形済みの株式情報のリスト
+
+        Returns:
+            処理した行数
+        """
+        from app.services.scoring_service import financial_scoring_service
+
+        rows = [self._to_row(info) for info in stock_infos]
+        if not rows:
+            return 0
+
+        # 並び替え用の財務スコアをまとめて計算
+        scores = financial_scoring_service.score_stock_infos(stock_infos)
+        for row in rows:
+            row["overall_score"] = scores[row["symbol"]]["overall_score"]
+
+        stmt = sqlite_insert(Stock)
+        update_columns = {field: stmt.excluded[field] for field in STOCK_FIELDS}
+        update_columns["last_api_fetch"] = stmt.excluded.last_api_fetch
+        update_columns["overall_score"] = stmt.excluded.overall_score
+        update_columns["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=[Stock.symbol], set_=update_columns)
+
+        await session.execute(stmt, rows)
+
+        # バックテスト用に当日の指標を記録
+        await snapshot_repository.record_live_in_session(session, [row["symbol"] for row in rows])
+        return len(rows)
+
+    async def ensure_ids_in_session(self, session: AsyncSession, symbols: Iterable[str]) -> Dict[str, int]:
+        """
+        シンボルに対応するstocksテーブルのIDを取得（未登録の銘柄は名前未設定の行を追加）
+
+        追加した行はlast_api_fetchが未設定のため、次回の取得・定期更新で株式情報が埋められる。
+
+        Args:
+            session: データベースセッション
+            symbols: 株式ティッカーシンボルのリスト
+
+        Returns:
+            シンボルをキーとしたIDの辞書
+        """
+        symbols = list({symbol.upper() for symbol in symbols})
+        if not symbols:
+            return {}
+
+        stmt = sqlite_insert(Stock).on_conflict_do_nothing(index_elements=[Stock.symbol])
+        await session.execute(stmt, [{"symbol": symbol, "name": "N/A"} for symbol in symbols])
+        return dict(
+            (await session.execute(
+                select(Stock.symbol, Stock.id).where(Stock.symbol.in_(symbols))
+            )).all()
+        )
+
+    async def screen(
+        self,
+        criteria: Any,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        スクリーニング条件をSQLに変換して保存済みの全銘柄を絞り込む
+
+        条件の判定はScreeningService.meets_criteriaと同じく、値が欠損（NULL・0）の指標は対象外とする。
+        株式情報が未取得の行（財務諸表・ウォッチリストの保存時に追加した行）は結果に含めない。
+
+        Args:
+            criteria: スクリーニング条件（ScreeningCriteria）
+            offset: 取得開始位置
+            limit: 取得件数
+
+        Returns:
+            (スコアの降順に並んだ株式情報のリスト, 条件に合致した総件数)
+        """
+        conditions = [Stock.last_api_fetch.is_not(None)]
+        lower_bounds = [
+            (Stock.market_cap, criteria.min_market_cap),
+            (Stock.roe, criteria.min_roe),
+            (Stock.current_ratio, criteria.min_current_ratio),
+        ]
+        upper_bounds = [
+            (Stock.pe_ratio, criteria.max_pe_ratio),
+            (Stock.debt_to_equity, criteria.max_debt_to_equity),
+        ]
+        for column, bound in lower_bounds:
+            if bound:
+                conditions.append(or_(column.is_(None), column == 0, column >= bound))
+        for column, bound in upper_bounds:
+            if bound:
+                conditions.append(or_(column.is_(None), column == 0, column <= bound))
+
+        # 傾向指標は0も有効な値のため、未計算（NULL）のみを対象外とする
+        trend_conditions = []
+        trend_lower_bounds = [
+            (StockTrendMetrics.revenue_cagr, getattr(criteria, "min_revenue_cagr", None)),
+            (StockTrendMetrics.eps_cagr, getattr(criteria, "min_eps_cagr", None)),
+            (StockTrendMetrics.fcf_consistency, getattr(criteria, "min_fcf_consistency", None)),
+        ]
+        trend_upper_bounds = [
+            (StockTrendMetrics.operating_margin_volatility, getattr(criteria, "max_operating_margin_volatility", None)),
+        ]
+        for column, bound in trend_lower_bounds:
+            if bound is not None:
+                trend_conditions.append(or_(column.is_(None), column >= bound))
+        for column, bound in trend_upper_bounds:
+            if bound is not None:
+                trend_conditions.append(or_(column.is_(None), column <= bound))
+
+        query = select(Stock)
+        count_query = select(func.count(Stock.id))
+        if trend_conditions:
+            query = query.outerjoin(StockTrendMetrics, StockTrendMetrics.stock_id == Stock.id)
+            count_query = count_query.outerjoin(StockTrendMetrics, StockTrendMetrics.stock_id == Stock.id)
+            conditions.extend(trend_conditions)
+
+        # 業種内比較は保存済みの分布を主キーで結合する（値が欠損・0、中央値が未集計の指標は対象外）
+        peer_group = getattr(criteria, "peer_group", "sector")
+        relative_bounds = [
+            (Stock.pe_ratio, "pe_ratio", getattr(criteria, "max_pe_to_peer_median", None), False),
+            (Stock.pb_ratio, "pb_ratio", getattr(criteria, "max_pb_to_peer_median", None), False),
+            (Stock.roe, "roe", getattr(criteria, "min_roe_to_peer_median", None), True),
+        ]
+        for column, metric, bound, is_lower in relative_bounds:
+            if bound is None:
+                continue
+            peer = aliased(PeerAggregate)
+            on_clause = and_(
+                peer.group_type == peer_group,
+                peer.group_name == getattr(Stock, peer_group),
+                peer.metric == metric,
+                peer.count >= settings.PEER_MIN_COUNT,
+                peer.median > 0
+            )
+            query = query.outerjoin(peer, on_clause)
+            count_query = count_query.outerjoin(peer, on_clause)
+            relative = column / peer.median
+            conditions.append(or_(
+                column.is_(None),
+                column == 0,
+                peer.median.is_(None),
+                relative >= bound if is_lower else relative <= bound
+            ))
+
+        query = (
+            query
+            .where(*conditions)
+            .order_by(Stock.overall_score.desc().nulls_last(), Stock.symbol)
+            .offset(offset)
+            .limit(limit)
+        )
+        count_query = count_query.where(*conditions)
+
+        async with AsyncSessionLocal() as session:
+            stocks = (await session.execute(query)).scalars().all()
+            total = (await session.execute(count_query)).scalar_one()
+            return [self.to_dict(stock) for stock in stocks], total
+
+    async def get_refresh_candidates(self) -> List[Dict[str, Any]]:
+        """
+        定期更新の対象となる保存済み全銘柄を取得
+
+        Returns:
+            symbol, last_api_fetch, watch_count（ウォッチリストへの登録数）を含む辞書のリスト
+        """
+        query = (
+            select(Stock.symbol, Stock.last_api_fetch, func.count(WatchListItem.id))
+            .outerjoin(WatchListItem, WatchListItem.stock_id == Stock.id)
+            .group_by(Stock.id)
+        )
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        return [
+            {"symbol": symbol, "last_api_fetch": last_api_fetch, "watch_count": watch_count}
+            for symbol, last_api_fetch, watch_count in rows
+        ]
+
+    async def get_search_entries(self) -> List[Dict[str, Any]]:
+        """
+        検索インデックス用に株式情報を取得済みの全銘柄のシンボル・名前・セクターを取得
+
+        Returns:
+            symbol, name, sectorを含む辞書のリスト
+        """
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                select(Stock.symbol, Stock.name, Stock.sector).where(Stock.last_api_fetch.is_not(None))
+            )).all()
+
+        return [{"symbol": symbol, "name": name, "sector": sector} for symbol, name, sector in rows]
+
+    async def refresh_missing_scores(self) -> int:
+        """
+        財務スコアが未計算の行のスコアをまとめて計算して保存
+
+        Returns:
+            更新した行数
+        """
+        from app.services.scoring_service import financial_scoring_service
+
+        async with AsyncSessionLocal() as session:
+            stocks = (await session.execute(
+                select(Stock).where(Stock.overall_score.is_(None))
+            )).scalars().all()
+            if not stocks:
+                return 0
+
+            scores = financial_scoring_service.score_stock_infos(
+                [self.to_dict(stock) for stock in stocks]
+            )
+            await session.execute(
+                update(Stock),
+                [
+                    {"id": stock.id, "overall_score": scores[stock.symbol]["overall_score"]}
+                    for stock in stocks
+                ]
+            )
+            await session.commit()
+            return len(stocks)
+
+    @staticmethod
+    def is_fresh(stock_info: Dict[str, Any], max_age_minutes: int = settings.CACHE_EXPIRY_MINUTES) -> bool:
+        """
+        保存済みの株式情報が有効期限内かどうかを判定
+        """
+        last_api_fetch = stock_info.get("last_api_fetch")
+        if last_api_fetch is None:
+            return False
+        return datetime.now() - last_api_fetch <= timedelta(minutes=max_age_minutes)
+
+    @staticmethod
+    def to_dict(stock: Stock) -> Dict[str, Any]:
+        """
+        Stockモデルを_format_stock_dataと同じ形式の辞書に変換
+        """
+        data = {"symbol": stock.symbol}
+        for field in STOCK_FIELDS:
+            data[field] = getattr(stock, field)
+        data["overall_score"] = stock.overall_score
+        data["last_api_fetch"] = stock.last_api_fetch
+        data["last_updated"] = (stock.last_api_fetch or stock.updated_at or stock.created_at or datetime.now()).isoformat()
+        return data
+
+    @staticmethod
+    def _to_row(stock_info: Dict[str, Any]) -> Dict[str, Any]:
+        row = {"symbol": stock_info["symbol"].upper()}
+        for field in STOCK_FIELDS:
+            row[field] = stock_info.get(field)
+        row["name"] = row["name"] or "N/A"
+        row["last_api_fetch"] = datetime.fromisoformat(stock_info["last_updated"])
+        return row
+
+
+class StockWriteBehindQueue:
+    """株式情報の書き込みを一定時間まとめて一括upsertする書き込みキュー"""
+
+    def __init__(
+        self,
+        repository: StockRepository,
+        delay_seconds: float = settings.STOCK_WRITE_BEHIND_SECONDS,
+        max_batch_size: int = settings.STOCK_WRITE_BATCH_SIZE,
+        max_pending: int = settings.STOCK_WRITE_MAX_PENDING,
+        max_retry_seconds: float = settings.STOCK_WRITE_MAX_RETRY_SECONDS
+    ):
+        self.repository = repository
+        self.delay_seconds = delay_seconds
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_pending = max(self.max_batch_size, max_pending)
+        self.max_retry_seconds = max_retry_seconds
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # 件数到達で開始した書き込みのタスク（完了前に破棄されないよう参照を保持する）
+        self._tasks: Set[asyncio.Task] = set()
+        self._flush_lock = asyncio.Lock()
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        # 連続して書き込みに失敗した回数（0より大きい間は再試行のタスクに書き込みを任せる）
+        self._failures = 0
+
+        # 統計情報
+        self.dropped = 0
+
+    def add_listener(self, listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """
+        書き込み完了時に呼び出す関数を登録（書き込んだ株式情報のリストを受け取る）
+        """
+        self._listeners.append(listener)
+
+    def enqueue(self, stock_info: Dict[str, Any]) -> None:
+        """
+        株式情報を書き込みキューに追加（同一シンボルは最新の値で上書き）
+        """
+        self._pending[stock_info["symbol"].upper()] = stock_info
+        self._trim_pending()
+
+        if self._failures:
+            # 書き込みの失敗中は再試行のタスクが溜まった分をまとめて書き込む
+            return
+        if len(self._pending) >= self.max_batch_size:
+            if self._tasks:
+                # 実行中の書き込みが終わった後に、溜まった分をまとめて書き込む
+                return
+            task = asyncio.get_running_loop().create_task(self.flush())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._delayed_flush(self.delay_seconds))
+
+    async def _delayed_flush(self, delay_seconds: float) -> None:
+        await asyncio.sleep(delay_seconds)
+        await self.flush()
+
+    def _trim_pending(self) -> None:
+        # 書き込みの失敗が続いてもメモリを使い続けないよう、古い順に破棄する
+        overflow = len(self._pending) - self.max_pending
+        if overflow <= 0:
+            return
+        for symbol in list(self._pending)[:overflow]:
+            del self._pending[symbol]
+        self.dropped += overflow
+        logger.warning(f"Dropped {overflow} pending stock rows (write queue is full)")
+
+    def _schedule_retry(self) -> None:
+        # 待ち時間は失敗ごとに倍にする（上限はmax_retry_seconds）
+        delay = min(self.delay_seconds * 2 ** self._failures, self.max_retry_seconds)
+        current = self._flush_task
+        if current is not None and not current.done() and current is not asyncio.current_task():
+            current.cancel()
+        self._flush_task = asyncio.get_running_loop().create_task(self._delayed_flush(delay))
+        logger.warning(f"Retrying stock write of {len(self._pending)} rows in {delay:.1f}s")
+
+    async def flush(self) -> int:
+        """
+        キューに溜まった株式情報を一括で書き込む
+
+        Returns:
+            書き込んだ行数
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch = list(self._pending.values())
+            self._pending = {}
+
+            try:
+                written = await self.repository.bulk_upsert(batch)
+                logger.debug(f"Flushed {written} stock rows")
+            except Exception as e:
+                logger.error(f"Error writing stock data: {str(e)}")
+                # 後から追加された新しい値を優先して再キューし、待ち時間を延ばしながら再試行する
+                self._pending = {
+                    **{stock_info["symbol"].upper(): stock_info for stock_info in batch},
+                    **self._pending
+                }
+                self._trim_pending()
+                self._failures += 1
+                self._schedule_retry()
+                return 0
+
+            self._failures = 0
+            if self._pending and (
+                self._flush_task is None
+                or self._flush_task.done()
+                or self._flush_task is asyncio.current_task()
+            ):
+                # 書き込み中・失敗中に追加された分を書き込む
+                self._flush_task = asyncio.get_running_loop().create_task(self._delayed_flush(self.delay_seconds))
+
+            for listener in self._listeners:
+                try:
+                    listener(batch)
+                except Exception as e:
+                    logger.error(f"Error notifying stock write listener: {str(e)}")
+            return written
+
+    async def stop(self) -> int:
+        """
+        予約済みの書き込みを中止し、キューに溜まった株式情報を書き込む
+
+        Returns:
+            書き込んだ行数
+        """
+        tasks = list(self._tasks)
+        if self._flush_task is not None:
+            tasks.append(self._flush_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._flush_task = None
+
+        written = await self.flush()
+        # 終了時は再試行しない
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        書き込みキューの統計情報を取得
+        """
+        return {
+            "pending": len(self._pending),
+            "failures": self._failures,
+            "dropped": self.dropped
+        }
+
+
+# リポジトリインスタンス
+stock_repository = StockRepository()
+stock_write_queue = StockWriteBehindQueue(stock_repository)
@@ -0,0 +1,151 @@
+"""
+傾向指標リポジトリ - stock_trend_metricsテーブルへの読み書きを担当
+"""
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+from datetime import datetime
+import logging
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database.connection import AsyncSessionLocal
+from app.models import Stock, FinancialStatementItem, StockTrendMetrics
+
+logger = logging.getLogger(__name__)
+
+# stock_trend_metricsテーブルの指標の列
+TREND_METRIC_FIELDS = [
+    "periods", "revenue_cagr", "eps_cagr", "revenue_growth_consistency",
+    "operating_margin_mean", "operating_margin_volatility", "net_margin_volatility",
+    "fcf_consistency", "fcf_margin_mean", "roe_mean", "roe_trend"
+]
+
+
+class TrendMetricsRepository:
+    """傾向指標のリポジトリ"""
+
+    async def get_changed(self, symbols: Optional[Iterable[str]] = None) -> Dict[int, Tuple[str, str]]:
+        """
+        前回の計算以降に財務諸表の明細が変わった銘柄を取得
+
+        明細の件数・最新の決算期・値の合計を要約として比較するため、
+        同じ値で取得し直しただけの銘柄は対象にならない。
+
+        Args:
+            symbols: 対象の株式ティッカーシンボル（Noneの場合は全銘柄）
+
+        Returns:
+            stock_idをキーとした(シンボル, 新しい要約)の辞書
+        """
+        query = (
+            select(
+                FinancialStatementItem.stock_id,
+                Stock.symbol,
+                func.count(FinancialStatementItem.id),
+                func.max(FinancialStatementItem.period_end),
+                func.total(FinancialStatementItem.value),
+                StockTrendMetrics.source_signature
+            )
+            .join(Stock, Stock.id == FinancialStatementItem.stock_id)
+            .outerjoin(StockTrendMetrics, StockTrendMetrics.stock_id == FinancialStatementItem.stock_id)
+            .group_by(FinancialStatementItem.stock_id)
+        )
+        if symbols is not None:
+            query = query.where(Stock.symbol.in_([symbol.upper() for symbol in symbols]))
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+
+        changed = {}
+        for stock_id, symbol, count, newest, total, stored_signature in rows:
+            signature = f"{count}:{newest}:{total:.12e}"
+            if signature != stored_signature:
+                changed[stock_id] = (symbol, signature)
+        return changed
+
+    async def get_items(self, stock_ids: Iterable[int]) -> List[Tuple[int, str, str, Any, Optional[float]]]:
+        """
+        複数銘柄の財務諸表の明細を1回のクエリで取得
+
+        Returns:
+            (stock_id, statement, line_item, period_end, value)のリスト
+        """
+        stock_ids = list(stock_ids)
+        if not stock_ids:
+            return []
+
+        query = select(
+            FinancialStatementItem.stock_id,
+            FinancialStatementItem.statement,
+            FinancialStatementItem.line_item,
+            FinancialStatementItem.period_end,
+            FinancialStatementItem.value
+        ).where(FinancialStatementItem.stock_id.in_(stock_ids))
+
+        async with AsyncSessionLocal() as session:
+            return [tuple(row) for row in (await session.execute(query)).all()]
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        傾向指標をまとめて追加・更新
+
+        Args:
+            rows: stock_id, TREND_METRIC_FIELDS, source_signatureを含む辞書のリスト
+
+        Returns:
+            処理した行数
+        """
+        if not rows:
+            return 0
+
+        computed_at = datetime.now()
+        stmt = sqlite_insert(StockTrendMetrics)
+        update_columns = {field: stmt.excluded[field] for field in TREND_METRIC_FIELDS}
+        update_columns["source_signature"] = stmt.excluded.source_signature
+        update_columns["computed_at"] = stmt.excluded.computed_at
+        stmt = stmt.on_conflict_do_update(index_elements=[StockTrendMetrics.stock_id], set_=update_columns)
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt, [{**row, "computed_at": computed_at} for row in rows])
+            await session.commit()
+
+        return len(rows)
+
+    async def get_many(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数銘柄の傾向指標を1回のクエリで取得
+
+        Args:
+            symbols: 株式ティッカーシンボルのリスト
+
+        Returns:
+            シンボルをキーとした傾向指標の辞書
+        """
+        symbols = list({symbol.upper() for symbol in symbols})
+        if not symbols:
+            return {}
+
+        query = (
+            select(Stock.symbol, StockTrendMetrics)
+            .join(Stock, Stock.id == StockTrendMetrics.stock_id)
+            .where(Stock.symbol.in_(symbols))
+        )
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+            return {symbol: self.to_dict(symbol, metrics) for symbol, metrics in rows}
+
+    @staticmethod
+    def to_dict(symbol: str, metrics: StockTrendMetrics) -> Dict[str, Any]:
+        """
+        StockTrendMetricsモデルを辞書に変換
+        """
+        data = {"symbol": symbol}
+        for field in TREND_METRIC_FIELDS:
+            data[field] = getattr(metrics, field)
+        data["last_updated"] = (metrics.computed_at or datetime.now()).isoformat()
+        return data
+
+
+# リポジトリインスタンス
+trend_repository = TrendMetricsRepository()
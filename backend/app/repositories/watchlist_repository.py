@@ -0,0 +1,238 @@
+"""
+ウォッチリストリポジトリ - watch_lists / watch_list_itemsテーブルへの読み書きを担当
+"""
+from typing import Optional, Dict, Any, List
+import logging
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload, joinedload
+
+from app.database.connection import AsyncSessionLocal
+from app.models import WatchList, WatchListItem
+from app.repositories.stock_repository import stock_repository
+
+logger = logging.getLogger(__name__)
+
+# 更新可能なアイテムの項目
+ITEM_FIELDS = ["notes", "target_price", "stop_loss_price"]
+
+
+class WatchListRepository:
+    """ウォッチリストのリポジトリ"""
+
+    async def list_watchlists(self) -> List[Dict[str, Any]]:
+        """
+        全ウォッチリストを登録銘柄数とともに取得
+
+        Returns:
+            ウォッチリストの辞書のリスト（作成順）
+        """
+        query = (
+            select(WatchList, func.count(WatchListItem.id))
+            .outerjoin(WatchListItem, WatchListItem.watch_list_id == WatchList.id)
+            .group_by(WatchList.id)
+            .order_by(WatchList.id)
+        )
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+            return [self._watchlist_to_dict(watch_list, item_count) for watch_list, item_count in rows]
+
+    async def get_watchlist(self, watch_list_id: int) -> Optional[Dict[str, Any]]:
+        """
+        ウォッチリストを登録銘柄とともに取得
+
+        アイテムと銘柄は一括で読み込み、アイテムごとの追加クエリは発行しない。
+
+        Args:
+            watch_list_id: ウォッチリストID
+
+        Returns:
+            itemsを含むウォッチリストの辞書、存在しない場合はNone
+        """
+        query = (
+            select(WatchList)
+            .options(selectinload(WatchList.items).joinedload(WatchListItem.stock))
+            .where(WatchList.id == watch_list_id)
+        )
+
+        async with AsyncSessionLocal() as session:
+            watch_list = (await session.execute(query)).scalar_one_or_none()
+            if watch_list is None:
+                return None
+
+            data = self._watchlist_to_dict(watch_list, len(watch_list.items))
+            data["items"] = [self._item_to_dict(item) for item in watch_list.items]
+            return data
+
+    async def create_watchlist(self, name: str, description: Optional[str] = None) -> Dict[str, Any]:
+        """
+        ウォッチリストを作成
+
+        Returns:
+            作成したウォッチリストの辞書
+        """
+        async with AsyncSessionLocal() as session:
+            watch_list = WatchList(name=name, description=description)
+            session.add(watch_list)
+            await session.commit()
+            await session.refresh(watch_list)
+            return self._watchlist_to_dict(watch_list, 0)
+
+    async def update_watchlist(self, watch_list_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        ウォッチリストの名前・説明を更新
+
+        Args:
+            watch_list_id: ウォッチリストID
+            fields: 更新する項目（name, description）
+
+        Returns:
+            更新後のウォッチリストの辞書、存在しない場合はNone
+        """
+        async with AsyncSessionLocal() as session:
+            watch_list = await session.get(WatchList, watch_list_id)
+            if watch_list is None:
+                return None
+
+            for field in ("name", "description"):
+                if field in fields:
+                    setattr(watch_list, field, fields[field])
+            await session.commit()
+
+        return await self.get_watchlist(watch_list_id)
+
+    async def delete_watchlist(self, watch_list_id: int) -> bool:
+        """
+        ウォッチリストを登録銘柄ごと削除
+
+        Returns:
+            削除した場合はTrue
+        """
+        async with AsyncSessionLocal() as session:
+            # 連鎖削除するアイテム・アラートは非同期セッションでは遅延読み込みできないため先に読み込む
+            watch_list = await session.get(
+                WatchList,
+                watch_list_id,
+                options=[selectinload(WatchList.items).selectinload(WatchListItem.alerts)]
+            )
+            if watch_list is None:
+                return False
+
+            await session.delete(watch_list)
+            await session.commit()
+            return True
+
+    async def add_item(self, watch_list_id: int, symbol: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        ウォッチリストに銘柄を追加（登録済みの場合は設定を更新）
+
+        Args:
+            watch_list_id: ウォッチリストID
+            symbol: 株式ティッカーシンボル
+            fields: アイテムの設定（notes, target_price, stop_loss_price）
+
+        Returns:
+            追加したアイテムの辞書、ウォッチリストが存在しない場合はNone
+        """
+        async with AsyncSessionLocal() as session:
+            if await session.get(WatchList, watch_list_id) is None:
+                return None
+
+            stock_id = (await stock_repository.ensure_ids_in_session(session, [symbol]))[symbol.upper()]
+            item = (await session.execute(
+                select(WatchListItem).where(
+                    WatchListItem.watch_list_id == watch_list_id,
+                    WatchListItem.stock_id == stock_id
+                )
+            )).scalar_one_or_none()
+            if item is None:
+                item = WatchListItem(watch_list_id=watch_list_id, stock_id=stock_id)
+                session.add(item)
+
+            for field in ITEM_FIELDS:
+                if field in fields:
+                    setattr(item, field, fields[field])
+            await session.commit()
+            item_id = item.id
+
+        return await self.get_item(watch_list_id, item_id)
+
+    async def get_item(self, watch_list_id: int, item_id: int) -> Optional[Dict[str, Any]]:
+        """
+        ウォッチリストのアイテムを取得
+
+        Returns:
+            アイテムの辞書、存在しない場合はNone
+        """
+        query = (
+            select(WatchListItem)
+            .options(joinedload(WatchListItem.stock))
+            .where(WatchListItem.id == item_id, WatchListItem.watch_list_id == watch_list_id)
+        )
+
+        async with AsyncSessionLocal() as session:
+            item = (await session.execute(query)).scalar_one_or_none()
+            return self._item_to_dict(item) if item is not None else None
+
+    async def update_item(self, watch_list_id: int, item_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        ウォッチリストのアイテムの設定を更新
+
+        Returns:
+            更新後のアイテムの辞書、存在しない場合はNone
+        """
+        async with AsyncSessionLocal() as session:
+            item = await session.get(WatchListItem, item_id)
+            if item is None or item.watch_list_id != watch_list_id:
+                return None
+
+            for field in ITEM_FIELDS:
+                if field in fields:
+                    setattr(item, field, fields[field])
+            await session.commit()
+
+        return await self.get_item(watch_list_id, item_id)
+
+    async def remove_item(self, watch_list_id: int, item_id: int) -> bool:
+        """
+        ウォッチリストからアイテムを削除
+
+        Returns:
+            削除した場合はTrue
+        """
+        async with AsyncSessionLocal() as session:
+            item = await session.get(WatchListItem, item_id, options=[selectinload(WatchListItem.alerts)])
+            if item is None or item.watch_list_id != watch_list_id:
+                return False
+
+            await session.delete(item)
+            await session.commit()
+            return True
+
+    @staticmethod
+    def _watchlist_to_dict(watch_list: WatchList, item_count: int) -> Dict[str, Any]:
+        return {
+            "id": watch_list.id,
+            "name": watch_list.name,
+            "description": watch_list.description,
+            "item_count": item_count,
+            "created_at": watch_list.created_at.isoformat() if watch_list.created_at else None,
+            "updated_at": watch_list.updated_at.isoformat() if watch_list.updated_at else None
+        }
+
+    @staticmethod
+    def _item_to_dict(item: WatchListItem) -> Dict[str, Any]:
+        return {
+            "id": item.id,
+            "symbol": item.stock.symbol,
+            "name": item.stock.name,
+            "notes": item.notes,
+            "target_price": item.target_price,
+            "stop_loss_price": item.stop_loss_price,
+            "added_at": item.added_at.isoformat() if item.added_at else None
+        }
+
+
+# リポジトリインスタンス
+watchlist_repository = WatchListRepository()
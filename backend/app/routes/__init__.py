@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 from .stocks import router as stocks_router
+from .watchlists import router as watchlists_router
+from .alerts import router as alerts_router
+from .backtests import router as backtests_router
 
 # メインAPIルーター
 api_router = APIRouter()
@@ -17,6 +20,15 @@ async def api_health():
 # 株式関連のルートを追加
 api_router.include_router(stocks_router, prefix="/stocks", tags=["stocks"])
 
+# ウォッチリスト関連のルートを追加
+api_router.include_router(watchlists_router, prefix="/watchlists", tags=["watchlists"])
+
+# 価格アラート関連のルートを追加
+api_router.include_router(alerts_router, prefix="/alerts", tags=["alerts"])
+
+# バックテスト関連のルートを追加
+api_router.include_router(backtests_router, prefix="/backtests", tags=["backtests"])
+
 # 将来的に追加するルートはここでインポートする
 # from .screening import router as screening_router
 # api_router.include_router(screening_router, prefix="/screening", tags=["screening"])
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import logging
+
+from app.schemas.watchlist import PriceAlertResponse, PriceAlertListResponse
+from app.services.alert_service import price_alert_engine
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("", response_model=PriceAlertListResponse)
+async def list_alerts(
+    watch_list_id: Optional[int] = Query(default=None, description="対象のウォッチリストID"),
+    unacknowledged_only: bool = Query(default=False, description="未確認のアラートのみ取得"),
+    cursor: Optional[int] = Query(default=None, description="前ページのnext_cursor"),
+    limit: int = Query(default=50, ge=1, le=500, description="1ページあたりの件数")
+):
+    """
+    目標株価・損切り株価への到達アラートを新しい順に取得
+    
+    Args:
+        watch_list_id: 対象のウォッチリストID
+        unacknowledged_only: 未確認のアラートのみ取得する場合はTrue
+        cursor: 前ページのnext_cursor
+        limit: 1ページあたりの件数
+        
+    Returns:
+        アラートのページ
+    """
+    try:
+        return await price_alert_engine.list_alerts(watch_list_id, unacknowledged_only, cursor, limit)
+    
+    except Exception as e:
+        logger.error(f"Error listing price alerts: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="アラートの取得中にエラーが発生しました"
+        )
+
+@router.post("/{alert_id}/acknowledge", response_model=PriceAlertResponse)
+async def acknowledge_alert(alert_id: int):
+    """
+    アラートを確認済みにする
+    
+    Args:
+        alert_id: アラートID
+        
+    Returns:
+        更新後のアラート
+    """
+    try:
+        alert = await price_alert_engine.acknowledge(alert_id)
+        if not alert:
+            raise HTTPException(
+                status_code=404,
+                detail=f"アラート '{alert_id}' が見つかりません"
+            )
+        
+        return alert
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error acknowledging price alert {alert_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="アラートの更新中にエラーが発生しました"
+        )
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, HTTPException
+import logging
+
+from app.schemas.backtest import BacktestRequest, BacktestJobResponse
+from app.services.backtest_service import backtest_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("", response_model=BacktestJobResponse, status_code=202)
+async def submit_backtest(request: BacktestRequest):
+    """
+    スクリーニング条件のバックテストを実行待ちに追加
+    
+    Args:
+        request: バックテストリクエスト
+        
+    Returns:
+        実行状況（結果はGET /backtests/{job_id}で取得）
+    """
+    try:
+        return backtest_service.submit(request)
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting backtest: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="バックテストの登録中にエラーが発生しました"
+        )
+
+@router.get("/{job_id}", response_model=BacktestJobResponse)
+async def get_backtest(job_id: str):
+    """
+    バックテストの実行状況・結果を取得
+    
+    Args:
+        job_id: バックテストのID
+        
+    Returns:
+        実行状況（完了している場合は結果を含む）
+    """
+    try:
+        job = backtest_service.get_job(job_id)
+        if not job:
+            raise HTTPException(
+                status_code=404,
+                detail=f"バックテスト '{job_id}' が見つかりません"
+            )
+        
+        return job
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting backtest {job_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="バックテストの取得中にエラーが発生しました"
+        )
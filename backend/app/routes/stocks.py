@@ -1,29 +1,100 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Optional
-from datetime import datetime
-import uuid
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Union
+from datetime import datetime, date
 import time
 import logging
 
 from app.schemas.stock import (
     StockInfoResponse,
+    BatchStockInfoResponse,
     FinancialDataResponse,
+    FinancialLineItemResponse,
     HistoricalDataResponse,
+    HistoricalColumnarDataResponse,
     FinancialScoreResponse,
+    TrendMetricsResponse,
+    IndicatorResponse,
+    BatchIndicatorResponse,
+    BuffettScoreResponse,
+    BuffettShortlistResponse,
+    BuffettScoreRefreshResponse,
+    PeerGroupListResponse,
+    RelativeMetricsResponse,
     StockRequest,
     HistoricalDataRequest,
     ScreeningRequest,
     ScreeningResponse,
-    ScreeningResult,
+    StoredScreeningResponse,
+    UniverseScreeningRequest,
+    UniverseScreeningResponse,
+    SearchResponse,
     ErrorResponse
 )
 from app.services.yahoo_finance_service import yahoo_finance_service
+from app.services.screening_service import screening_service
+from app.services.trend_metrics_service import trend_metrics_service
+from app.services.indicator_service import indicator_service
+from app.services.buffett_score_service import buffett_score_service
+from app.services.peer_aggregate_service import peer_aggregate_service
+from app.repositories.peer_repository import PEER_METRICS, PEER_TREND_METRICS
+from app.services.search_service import symbol_search_index
+from app.services.stream_service import quote_broadcaster
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+@router.get("/info", response_model=BatchStockInfoResponse)
+async def get_stock_info_batch(
+    symbols: str = Query(..., min_length=1, description="カンマ区切りの株式ティッカーシンボル (例: AAPL,MSFT,7203.T)")
+):
+    """
+    複数銘柄の基本情報を一括取得
+    
+    Args:
+        symbols: カンマ区切りの株式ティッカーシンボル
+        
+    Returns:
+        シンボルごとの基本情報と、取得できなかったシンボルのエラー
+    """
+    try:
+        symbol_list = [symbol.strip() for symbol in symbols.split(",") if symbol.strip()]
+        if not symbol_list:
+            raise HTTPException(
+                status_code=400,
+                detail="株式ティッカーシンボルを指定してください"
+            )
+        
+        # 最大数制限チェック
+        if len(symbol_list) > settings.MAX_STOCKS_PER_REQUEST:
+            raise HTTPException(
+                status_code=400,
+                detail=f"一度に処理できる株式数は{settings.MAX_STOCKS_PER_REQUEST}件までです"
+            )
+        
+        stock_infos, errors = await yahoo_finance_service.get_stock_info_batch(symbol_list)
+        
+        return BatchStockInfoResponse(
+            results={
+                symbol: StockInfoResponse(**stock_info)
+                for symbol, stock_info in stock_infos.items()
+            },
+            errors=errors,
+            total_symbols=len(stock_infos) + len(errors),
+            last_updated=datetime.now().isoformat()
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting batch stock info: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="株式情報の取得中にエラーが発生しました"
+        )
+
 @router.get("/info/{symbol}", response_model=StockInfoResponse)
 async def get_stock_info(symbol: str):
     """
@@ -84,10 +155,67 @@ async def get_financial_data(symbol: str):
             detail="財務データの取得中にエラーが発生しました"
         )
 
-@router.get("/history/{symbol}", response_model=HistoricalDataResponse)
+@router.get("/financial-items/{line_item}", response_model=FinancialLineItemResponse)
+async def get_financial_line_item(
+    line_item: str,
+    statement: Optional[str] = Query(default=None, description="財務諸表の種類 (financials, balance_sheet, cashflow)"),
+    period_end: Optional[date] = Query(default=None, description="決算期末日 (YYYY-MM-DD)"),
+    latest: bool = Query(default=True, description="銘柄ごとに最新の決算期のみを返す")
+):
+    """
+    保存済みの財務諸表から勘定科目の値を全銘柄横断で取得
+    
+    Args:
+        line_item: 勘定科目（例: Free Cash Flow）
+        statement: 財務諸表の種類
+        period_end: 決算期末日
+        latest: 銘柄ごとに最新の決算期のみを返すかどうか
+        
+    Returns:
+        銘柄ごとの勘定科目の値
+    """
+    try:
+        valid_statements = ["financials", "balance_sheet", "cashflow"]
+        if statement is not None and statement not in valid_statements:
+            raise HTTPException(
+                status_code=400,
+                detail=f"無効な財務諸表の種類です。有効な種類: {', '.join(valid_statements)}"
+            )
+        
+        results = await yahoo_finance_service.get_financial_line_item(
+            line_item,
+            statement,
+            period_end,
+            latest
+        )
+        
+        return FinancialLineItemResponse(
+            line_item=line_item,
+            statement=statement,
+            period_end=period_end.isoformat() if period_end else None,
+            latest=latest and period_end is None,
+            total=len(results),
+            results=results,
+            last_updated=datetime.now().isoformat()
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting financial line item {line_item}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="勘定科目の取得中にエラーが発生しました"
+        )
+
+@router.get(
+    "/history/{symbol}",
+    response_model=Union[HistoricalDataResponse, HistoricalColumnarDataResponse]
+)
 async def get_historical_data(
     symbol: str,
-    period: str = Query(default="1y", description="取得期間 (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)")
+    period: str = Query(default="1y", description="取得期間 (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)"),
+    format: str = Query(default="records", description="レスポンス形式 (records: 1行ずつの配列, columnar: 列ごとの配列)")
 ):
     """
     株式の履歴データを取得
@@ -95,6 +223,7 @@ async def get_historical_data(
     Args:
         symbol: 株式ティッカーシンボル
         period: 取得期間
+        format: レスポンス形式
         
     Returns:
         履歴データ
@@ -108,13 +237,29 @@ async def get_historical_data(
                 detail=f"無効な期間です。有効な期間: {', '.join(valid_periods)}"
             )
         
-        historical_data = await yahoo_finance_service.get_historical_data(symbol, period)
+        valid_formats = ["records", "columnar"]
+        if format not in valid_formats:
+            raise HTTPException(
+                status_code=400,
+                detail=f"無効な形式です。有効な形式: {', '.join(valid_formats)}"
+            )
+        
+        columnar = format == "columnar"
+        historical_data = await yahoo_finance_service.get_historical_data(
+            symbol,
+            period,
+            columnar=columnar
+        )
         if not historical_data:
             raise HTTPException(
                 status_code=404,
                 detail=f"株式 '{symbol}' の履歴データが見つかりません"
             )
         
+        # 列形式は行ごとのモデル検証を行わずにそのままシリアライズする
+        if columnar:
+            return JSONResponse(content=historical_data)
+        
         return HistoricalDataResponse(**historical_data)
     
     except HTTPException:
@@ -156,6 +301,326 @@ async def get_financial_score(symbol: str):
             detail="財務スコアの計算中にエラーが発生しました"
         )
 
+@router.get("/trends/{symbol}", response_model=TrendMetricsResponse)
+async def get_trend_metrics(symbol: str):
+    """
+    保存済みの財務諸表から計算した複数年の傾向指標を取得
+    
+    Args:
+        symbol: 株式ティッカーシンボル
+        
+    Returns:
+        傾向指標
+    """
+    try:
+        trend = await trend_metrics_service.get_trend_metrics(symbol)
+        if not trend:
+            # 財務諸表が未保存の場合は取得してから再度参照する
+            if await yahoo_finance_service.get_financial_data(symbol):
+                trend = await trend_metrics_service.get_trend_metrics(symbol)
+        if not trend:
+            raise HTTPException(
+                status_code=404,
+                detail=f"株式 '{symbol}' の傾向指標が見つかりません"
+            )
+        
+        return TrendMetricsResponse(**trend)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting trend metrics for {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="傾向指標の取得中にエラーが発生しました"
+        )
+
+@router.get("/peer-aggregates", response_model=PeerGroupListResponse)
+async def get_peer_aggregates(
+    group_type: str = Query(default="sector", pattern="^(sector|industry)$", description="グループの種類 (sector, industry)"),
+    group_name: Optional[str] = Query(default=None, description="対象のセクター・業種（省略時は全グループ）")
+):
+    """
+    セクター・業種ごとの指標の分布（件数・四分位数）を取得
+    
+    Args:
+        group_type: グループの種類
+        group_name: 対象のセクター・業種
+        
+    Returns:
+        グループごとの指標の分布
+    """
+    try:
+        if group_name is not None:
+            stats = peer_aggregate_service.get_group(group_type, group_name)
+            groups = {group_name: stats} if stats else {}
+        else:
+            groups = peer_aggregate_service.list_groups(group_type)
+        
+        return PeerGroupListResponse(
+            group_type=group_type,
+            total=len(groups),
+            results=[
+                {"group_type": group_type, "group_name": name, "metrics": metrics}
+                for name, metrics in groups.items()
+            ],
+            last_updated=datetime.now().isoformat()
+        )
+    
+    except Exception as e:
+        logger.error(f"Error getting peer aggregates: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="業種内の分布の取得中にエラーが発生しました"
+        )
+
+@router.get("/peers/{symbol}", response_model=RelativeMetricsResponse)
+async def get_relative_metrics(
+    symbol: str,
+    peer_group: str = Query(default="sector", pattern="^(sector|industry)$", description="比較対象 (sector, industry)")
+):
+    """
+    銘柄の指標を同じセクター・業種の分布と比較
+    
+    Args:
+        symbol: 株式ティッカーシンボル
+        peer_group: 比較対象
+        
+    Returns:
+        指標ごとの値・分布・中央値に対する倍率
+    """
+    try:
+        stock_info = await yahoo_finance_service.get_stock_info(symbol)
+        if not stock_info:
+            raise HTTPException(
+                status_code=404,
+                detail=f"株式 '{symbol}' の情報が見つかりません"
+            )
+        
+        values = {metric: stock_info.get(metric) for metric in PEER_METRICS}
+        trend = await trend_metrics_service.get_trend_metrics(symbol)
+        for metric in PEER_TREND_METRICS:
+            values[metric] = trend.get(metric) if trend else None
+        
+        group_name = stock_info.get(peer_group)
+        stats = (peer_aggregate_service.get_group(peer_group, group_name) if group_name else None) or {}
+        metrics = {
+            metric: {
+                **stats[metric],
+                "value": value,
+                "relative_to_median": peer_aggregate_service.relative(value, stats[metric]["median"])
+            }
+            for metric, value in values.items()
+            if metric in stats
+        }
+        
+        return RelativeMetricsResponse(
+            symbol=symbol.upper(),
+            peer_group=peer_group,
+            group_name=group_name,
+            metrics=metrics,
+            last_updated=datetime.now().isoformat()
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting relative metrics for {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="業種内比較の取得中にエラーが発生しました"
+        )
+
+@router.get("/buffett-scores", response_model=BuffettShortlistResponse)
+async def get_buffett_shortlist(
+    min_score: Optional[float] = Query(default=None, ge=0, le=100, description="最小の総合スコア (0-100)"),
+    min_coverage: Optional[float] = Query(default=None, ge=0, le=1, description="算出できた観点の重要度の合計の最小値 (0-1)"),
+    sector: Optional[str] = Query(default=None, description="対象のセクター"),
+    page: int = Query(default=1, ge=1, description="ページ番号"),
+    page_size: int = Query(default=50, ge=1, le=500, description="1ページあたりの件数")
+):
+    """
+    保存済みの全銘柄をバフェット式7観点の事前スコアの高い順に取得（調査候補の一覧）
+    
+    Args:
+        min_score: 最小の総合スコア
+        min_coverage: 算出できた観点の重要度の合計の最小値
+        sector: 対象のセクター
+        page: ページ番号
+        page_size: 1ページあたりの件数
+        
+    Returns:
+        事前スコア順に並んだ候補一覧のページ
+    """
+    try:
+        shortlist = await buffett_score_service.get_shortlist(min_score, min_coverage, sector, page, page_size)
+        return BuffettShortlistResponse(**shortlist, last_updated=datetime.now().isoformat())
+    
+    except Exception as e:
+        logger.error(f"Error getting Buffett shortlist: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="事前スコアの取得中にエラーが発生しました"
+        )
+
+@router.post("/buffett-scores/refresh", response_model=BuffettScoreRefreshResponse)
+async def refresh_buffett_scores():
+    """
+    保存済みの全銘柄の事前スコアを一括再計算（入力が変わった銘柄のみ更新）
+    
+    Returns:
+        更新した銘柄数
+    """
+    try:
+        start_time = time.time()
+        updated = await buffett_score_service.refresh()
+        return BuffettScoreRefreshResponse(
+            updated=updated,
+            execution_time=time.time() - start_time,
+            last_updated=datetime.now().isoformat()
+        )
+    
+    except Exception as e:
+        logger.error(f"Error refreshing Buffett pre-scores: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="事前スコアの再計算中にエラーが発生しました"
+        )
+
+@router.get("/buffett-scores/{symbol}", response_model=BuffettScoreResponse)
+async def get_buffett_score(symbol: str):
+    """
+    銘柄のバフェット式7観点の事前スコアを取得
+    
+    Args:
+        symbol: 株式ティッカーシンボル
+        
+    Returns:
+        観点ごとのスコア・評価と総合スコア
+    """
+    try:
+        score = await buffett_score_service.get_score(symbol)
+        if not score:
+            raise HTTPException(
+                status_code=404,
+                detail=f"株式 '{symbol}' の事前スコアが見つかりません"
+            )
+        
+        return score
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting Buffett pre-score for {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="事前スコアの取得中にエラーが発生しました"
+        )
+
+@router.get("/indicators", response_model=BatchIndicatorResponse)
+async def get_indicators_batch(
+    symbols: str = Query(..., min_length=1, description="カンマ区切りの株式ティッカーシンボル (例: AAPL,MSFT,7203.T)"),
+    indicators: Optional[str] = Query(
+        default=None,
+        description="カンマ区切りの指標と期間 (例: sma:50,rsi:14)。指定しない場合は既定の指標"
+    )
+):
+    """
+    複数銘柄のテクニカル指標を一括取得
+    
+    Args:
+        symbols: カンマ区切りの株式ティッカーシンボル
+        indicators: カンマ区切りの指標と期間
+        
+    Returns:
+        シンボルごとのテクニカル指標と、取得できなかったシンボルのエラー
+    """
+    try:
+        symbol_list = [symbol.strip() for symbol in symbols.split(",") if symbol.strip()]
+        if not symbol_list:
+            raise HTTPException(
+                status_code=400,
+                detail="株式ティッカーシンボルを指定してください"
+            )
+        
+        # 最大数制限チェック
+        if len(symbol_list) > settings.MAX_STOCKS_PER_REQUEST:
+            raise HTTPException(
+                status_code=400,
+                detail=f"一度に処理できる株式数は{settings.MAX_STOCKS_PER_REQUEST}件までです"
+            )
+        
+        try:
+            specs = indicator_service.parse_indicators(indicators)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        results, errors = await indicator_service.get_indicators_many(symbol_list, specs)
+        
+        return BatchIndicatorResponse(
+            results={
+                symbol: IndicatorResponse(**result)
+                for symbol, result in results.items()
+            },
+            errors=errors,
+            total_symbols=len(results) + len(errors),
+            last_updated=datetime.now().isoformat()
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting batch indicators: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="テクニカル指標の計算中にエラーが発生しました"
+        )
+
+@router.get("/indicators/{symbol}", response_model=IndicatorResponse)
+async def get_indicators(
+    symbol: str,
+    indicators: Optional[str] = Query(
+        default=None,
+        description="カンマ区切りの指標と期間 (例: sma:50,rsi:14)。指定しない場合は既定の指標"
+    )
+):
+    """
+    保存済みの株価履歴から計算したテクニカル指標を取得
+    
+    対応している指標: sma（単純移動平均）, ema（指数移動平均）, rsi, volatility（年率換算の
+    ボラティリティ）, max_drawdown（最大下落率）, range_position（期間の安値・高値に対する位置）
+    
+    Args:
+        symbol: 株式ティッカーシンボル
+        indicators: カンマ区切りの指標と期間
+        
+    Returns:
+        テクニカル指標
+    """
+    try:
+        try:
+            specs = indicator_service.parse_indicators(indicators)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        result = await indicator_service.get_indicators(symbol, specs)
+        if not result:
+            raise HTTPException(
+                status_code=404,
+                detail=f"株式 '{symbol}' の履歴データが見つかりません"
+            )
+        
+        return IndicatorResponse(**result)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting indicators for {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="テクニカル指標の計算中にエラーが発生しました"
+        )
+
 @router.post("/screening", response_model=ScreeningResponse)
 async def screen_stocks(request: ScreeningRequest):
     """
@@ -168,9 +633,6 @@ async def screen_stocks(request: ScreeningRequest):
         スクリーニング結果
     """
     try:
-        start_time = time.time()
-        request_id = str(uuid.uuid4())
-        
         # 最大数制限チェック
         if len(request.symbols) > settings.MAX_STOCKS_PER_REQUEST:
             raise HTTPException(
@@ -178,79 +640,7 @@ async def screen_stocks(request: ScreeningRequest):
                 detail=f"一度に処理できる株式数は{settings.MAX_STOCKS_PER_REQUEST}件までです"
             )
         
-        results = []
-        passed_count = 0
-        
-        for symbol in request.symbols:
-            try:
-                # 株式情報を取得
-                stock_info = await yahoo_finance_service.get_stock_info(symbol)
-                if not stock_info:
-                    continue
-                
-                # 財務スコアを計算
-                score_data = await yahoo_finance_service.calculate_financial_score(symbol)
-                
-                # スクリーニング条件をチェック
-                meets_criteria = True
-                
-                if request.min_market_cap and stock_info.get("market_cap"):
-                    if stock_info["market_cap"] < request.min_market_cap:
-                        meets_criteria = False
-                
-                if request.max_pe_ratio and stock_info.get("pe_ratio"):
-                    if stock_info["pe_ratio"] > request.max_pe_ratio:
-                        meets_criteria = False
-                
-                if request.min_roe and stock_info.get("roe"):
-                    if stock_info["roe"] < request.min_roe:
-                        meets_criteria = False
-                
-                if request.max_debt_to_equity and stock_info.get("debt_to_equity"):
-                    if stock_info["debt_to_equity"] > request.max_debt_to_equity:
-                        meets_criteria = False
-                
-                if request.min_current_ratio and stock_info.get("current_ratio"):
-                    if stock_info["current_ratio"] < request.min_current_ratio:
-                        meets_criteria = False
-                
-                if meets_criteria:
-                    passed_count += 1
-                
-                # 結果を追加
-                result = ScreeningResult(
-                    symbol=symbol,
-                    name=stock_info.get("name", "N/A"),
-                    score=score_data.get("overall_score", 0) if score_data else 0,
-                    market_cap=stock_info.get("market_cap"),
-                    pe_ratio=stock_info.get("pe_ratio"),
-                    roe=stock_info.get("roe"),
-                    debt_to_equity=stock_info.get("debt_to_equity"),
-                    current_ratio=stock_info.get("current_ratio"),
-                    meets_criteria=meets_criteria
-                )
-                
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Error screening stock {symbol}: {str(e)}")
-                continue
-        
-        # 結果をスコア順でソート
-        results.sort(key=lambda x: x.score, reverse=True)
-        
-        execution_time = time.time() - start_time
-        
-        response = ScreeningResponse(
-            request_id=request_id,
-            total_symbols=len(request.symbols),
-            passed_symbols=passed_count,
-            results=results,
-            execution_time=execution_time,
-            last_updated=datetime.now().isoformat()
-        )
-        
-        return response
+        return await screening_service.screen(request)
     
     except HTTPException:
         raise
@@ -261,29 +651,122 @@ async def screen_stocks(request: ScreeningRequest):
             detail="スクリーニング中にエラーが発生しました"
         )
 
-@router.get("/search")
+@router.post("/screening/universe", response_model=UniverseScreeningResponse)
+async def screen_universe(request: UniverseScreeningRequest):
+    """
+    保存済みの全銘柄をスクリーニング（データソースへの問い合わせなし）
+    
+    Args:
+        request: スクリーニング条件とページ指定
+        
+    Returns:
+        スコア順に並んだスクリーニング結果のページ
+    """
+    try:
+        return await screening_service.screen_universe(request)
+    
+    except Exception as e:
+        logger.error(f"Error during universe screening: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="スクリーニング中にエラーが発生しました"
+        )
+
+@router.get("/screening/{request_id}", response_model=StoredScreeningResponse)
+async def get_screening_results(
+    request_id: str,
+    cursor: Optional[int] = Query(default=None, description="前ページのnext_cursor"),
+    limit: int = Query(default=50, ge=1, le=500, description="1ページあたりの件数")
+):
+    """
+    保存済みのスクリーニング結果をページ単位で取得
+    
+    Args:
+        request_id: スクリーニングのリクエストID
+        cursor: 前ページのnext_cursor
+        limit: 1ページあたりの件数
+        
+    Returns:
+        スクリーニング結果のページ
+    """
+    try:
+        stored = await screening_service.get_stored_results(request_id, cursor, limit)
+        if not stored:
+            raise HTTPException(
+                status_code=404,
+                detail=f"スクリーニング結果 '{request_id}' が見つかりません"
+            )
+        
+        return stored
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting screening results {request_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="スクリーニング結果の取得中にエラーが発生しました"
+        )
+
+@router.get("/search", response_model=SearchResponse)
 async def search_stocks(
-    query: str = Query(..., min_length=1, description="検索クエリ"),
+    query: str = Query(..., min_length=1, description="検索クエリ（シンボル・銘柄名）"),
     limit: int = Query(default=10, ge=1, le=50, description="結果数の制限")
 ):
     """
-    株式を検索（将来的な実装用プレースホルダー）
+    保存済みの銘柄をシンボル・銘柄名で検索
     
     Args:
         query: 検索クエリ
         limit: 結果数の制限
         
     Returns:
-        検索結果
-    """
-    # 現在は単純な実装
-    # 実際のプロダクションでは、株式リストデータベースや外部APIを使用
-    return {
-        "query": query,
-        "results": [
-            {"symbol": "AAPL", "name": "Apple Inc.", "relevance": 0.95},
-            {"symbol": "MSFT", "name": "Microsoft Corporation", "relevance": 0.85},
-        ],
-        "total": 2,
-        "limit": limit
-    }
\ No newline at end of file
+        関連度順の検索結果
+    """
+    results = symbol_search_index.search(query, limit)
+    return SearchResponse(
+        query=query,
+        results=results,
+        total=len(results),
+        limit=limit
+    )
+
+@router.get("/stream")
+async def stream_quotes(
+    symbols: str = Query(..., description="カンマ区切りの株式ティッカーシンボル")
+):
+    """
+    株式情報の更新をServer-Sent Eventsで配信
+    
+    最初に各銘柄の現在値（snapshotイベント）を送り、以降は定期更新などで
+    株式情報が書き込まれるたびに変わった項目のみ（quoteイベント）を送る。
+    
+    Args:
+        symbols: カンマ区切りの株式ティッカーシンボル
+        
+    Returns:
+        text/event-streamのレスポンス
+    """
+    symbol_list = list(dict.fromkeys(
+        symbol.strip().upper() for symbol in symbols.split(",") if symbol.strip()
+    ))
+    if not symbol_list:
+        raise HTTPException(
+            status_code=400,
+            detail="株式ティッカーシンボルを指定してください"
+        )
+    
+    if len(symbol_list) > quote_broadcaster.max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"一度に購読できる株式数は{quote_broadcaster.max_symbols}件までです"
+        )
+    
+    return StreamingResponse(
+        quote_broadcaster.stream(symbol_list),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -0,0 +1,267 @@
+from fastapi import APIRouter, HTTPException
+from typing import List
+import logging
+
+from app.schemas.watchlist import (
+    WatchListCreate,
+    WatchListUpdate,
+    WatchListItemCreate,
+    WatchListItemUpdate,
+    WatchListItemResponse,
+    WatchListResponse,
+    WatchListSnapshotResponse
+)
+from app.services.watchlist_service import watchlist_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+def _not_found(watch_list_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail=f"ウォッチリスト '{watch_list_id}' が見つかりません"
+    )
+
+@router.get("", response_model=List[WatchListResponse])
+async def list_watchlists():
+    """
+    全ウォッチリストを取得
+    
+    Returns:
+        ウォッチリストのリスト（登録銘柄数を含む）
+    """
+    try:
+        return await watchlist_service.list_watchlists()
+    
+    except Exception as e:
+        logger.error(f"Error listing watchlists: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="ウォッチリストの取得中にエラーが発生しました"
+        )
+
+@router.post("", response_model=WatchListResponse, status_code=201)
+async def create_watchlist(request: WatchListCreate):
+    """
+    ウォッチリストを作成
+    
+    Args:
+        request: ウォッチリスト作成リクエスト
+        
+    Returns:
+        作成したウォッチリスト
+    """
+    try:
+        return await watchlist_service.create_watchlist(request.name, request.description)
+    
+    except Exception as e:
+        logger.error(f"Error creating watchlist: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="ウォッチリストの作成中にエラーが発生しました"
+        )
+
+@router.get("/{watch_list_id}", response_model=WatchListResponse)
+async def get_watchlist(watch_list_id: int):
+    """
+    ウォッチリストを登録銘柄とともに取得
+    
+    Args:
+        watch_list_id: ウォッチリストID
+        
+    Returns:
+        ウォッチリスト
+    """
+    try:
+        watch_list = await watchlist_service.get_watchlist(watch_list_id)
+        if not watch_list:
+            raise _not_found(watch_list_id)
+        
+        return watch_list
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting watchlist {watch_list_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="ウォッチリストの取得中にエラーが発生しました"
+        )
+
+@router.put("/{watch_list_id}", response_model=WatchListResponse)
+async def update_watchlist(watch_list_id: int, request: WatchListUpdate):
+    """
+    ウォッチリストの名前・説明を更新
+    
+    Args:
+        watch_list_id: ウォッチリストID
+        request: 更新内容（指定した項目のみ更新）
+        
+    Returns:
+        更新後のウォッチリスト
+    """
+    try:
+        watch_list = await watchlist_service.update_watchlist(
+            watch_list_id,
+            request.model_dump(exclude_unset=True)
+        )
+        if not watch_list:
+            raise _not_found(watch_list_id)
+        
+        return watch_list
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating watchlist {watch_list_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="ウォッチリストの更新中にエラーが発生しました"
+        )
+
+@router.delete("/{watch_list_id}", status_code=204)
+async def delete_watchlist(watch_list_id: int):
+    """
+    ウォッチリストを登録銘柄ごと削除
+    
+    Args:
+        watch_list_id: ウォッチリストID
+    """
+    try:
+        if not await watchlist_service.delete_watchlist(watch_list_id):
+            raise _not_found(watch_list_id)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting watchlist {watch_list_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="ウォッチリストの削除中にエラーが発生しました"
+        )
+
+@router.post("/{watch_list_id}/items", response_model=WatchListItemResponse, status_code=201)
+async def add_watchlist_item(watch_list_id: int, request: WatchListItemCreate):
+    """
+    ウォッチリストに銘柄を追加（登録済みの場合は設定を更新）
+    
+    Args:
+        watch_list_id: ウォッチリストID
+        request: 追加する銘柄と設定
+        
+    Returns:
+        追加したアイテム
+    """
+    try:
+        item = await watchlist_service.add_item(
+            watch_list_id,
+            request.symbol,
+            request.model_dump(exclude_unset=True, exclude={"symbol"})
+        )
+        if not item:
+            raise _not_found(watch_list_id)
+        
+        return item
+    
+    except LookupError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"株式 '{request.symbol}' が見つかりません"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error adding {request.symbol} to watchlist {watch_list_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="ウォッチリストへの追加中にエラーが発生しました"
+        )
+
+@router.put("/{watch_list_id}/items/{item_id}", response_model=WatchListItemResponse)
+async def update_watchlist_item(watch_list_id: int, item_id: int, request: WatchListItemUpdate):
+    """
+    ウォッチリストのアイテムの設定を更新
+    
+    Args:
+        watch_list_id: ウォッチリストID
+        item_id: アイテムID
+        request: 更新内容（指定した項目のみ更新）
+        
+    Returns:
+        更新後のアイテム
+    """
+    try:
+        item = await watchlist_service.update_item(
+            watch_list_id,
+            item_id,
+            request.model_dump(exclude_unset=True)
+        )
+        if not item:
+            raise HTTPException(
+                status_code=404,
+                detail=f"ウォッチリスト '{watch_list_id}' のアイテム '{item_id}' が見つかりません"
+            )
+        
+        return item
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating watchlist item {item_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="ウォッチリストのアイテムの更新中にエラーが発生しました"
+        )
+
+@router.delete("/{watch_list_id}/items/{item_id}", status_code=204)
+async def remove_watchlist_item(watch_list_id: int, item_id: int):
+    """
+    ウォッチリストからアイテムを削除
+    
+    Args:
+        watch_list_id: ウォッチリストID
+        item_id: アイテムID
+    """
+    try:
+        if not await watchlist_service.remove_item(watch_list_id, item_id):
+            raise HTTPException(
+                status_code=404,
+                detail=f"ウォッチリスト '{watch_list_id}' のアイテム '{item_id}' が見つかりません"
+            )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error removing watchlist item {item_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="ウォッチリストのアイテムの削除中にエラーが発生しました"
+        )
+
+@router.get("/{watch_list_id}/snapshot", response_model=WatchListSnapshotResponse)
+async def get_watchlist_snapshot(watch_list_id: int):
+    """
+    ウォッチリストの全銘柄の現在値・スコア・目標株価との乖離を一括取得
+    
+    Args:
+        watch_list_id: ウォッチリストID
+        
+    Returns:
+        ウォッチリストのスナップショット
+    """
+    try:
+        snapshot = await watchlist_service.snapshot(watch_list_id)
+        if not snapshot:
+            raise _not_found(watch_list_id)
+        
+        return snapshot
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting watchlist snapshot {watch_list_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="ウォッチリストのスナップショットの取得中にエラーが発生しました"
+        )
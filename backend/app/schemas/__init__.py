@@ -1,25 +1,103 @@
 from .stock import (
     StockInfoResponse,
+    BatchStockInfoResponse,
     FinancialDataResponse,
+    FinancialLineItemValue,
+    FinancialLineItemResponse,
     HistoricalDataResponse,
+    HistoricalColumnarDataResponse,
     FinancialScoreResponse,
+    TrendMetricsResponse,
+    IndicatorResponse,
+    BatchIndicatorResponse,
+    BuffettViewpointScore,
+    BuffettScoreResponse,
+    BuffettShortlistResponse,
+    BuffettScoreRefreshResponse,
+    PeerMetricStats,
+    PeerGroupResponse,
+    PeerGroupListResponse,
+    RelativeMetric,
+    RelativeMetricsResponse,
     StockRequest,
     HistoricalDataRequest,
+    ScreeningCriteria,
     ScreeningRequest,
     ScreeningResult,
     ScreeningResponse,
+    StoredScreeningResponse,
+    UniverseScreeningRequest,
+    UniverseScreeningResponse,
+    SearchResult,
+    SearchResponse,
     ErrorResponse
 )
+from .watchlist import (
+    WatchListCreate,
+    WatchListUpdate,
+    WatchListItemCreate,
+    WatchListItemUpdate,
+    WatchListItemResponse,
+    WatchListResponse,
+    WatchListSnapshotItem,
+    WatchListSnapshotResponse,
+    PriceAlertResponse,
+    PriceAlertListResponse
+)
+from .backtest import (
+    BacktestRequest,
+    BacktestPeriod,
+    BacktestSummary,
+    BacktestResult,
+    BacktestJobResponse
+)
 
 __all__ = [
     "StockInfoResponse",
+    "BatchStockInfoResponse",
     "FinancialDataResponse",
+    "FinancialLineItemValue",
+    "FinancialLineItemResponse",
     "HistoricalDataResponse",
+    "HistoricalColumnarDataResponse",
     "FinancialScoreResponse",
+    "TrendMetricsResponse",
+    "IndicatorResponse",
+    "BatchIndicatorResponse",
+    "BuffettViewpointScore",
+    "BuffettScoreResponse",
+    "BuffettShortlistResponse",
+    "BuffettScoreRefreshResponse",
+    "PeerMetricStats",
+    "PeerGroupResponse",
+    "PeerGroupListResponse",
+    "RelativeMetric",
+    "RelativeMetricsResponse",
     "StockRequest",
     "HistoricalDataRequest",
+    "ScreeningCriteria",
     "ScreeningRequest",
     "ScreeningResult",
     "ScreeningResponse",
-    "ErrorResponse"
+    "StoredScreeningResponse",
+    "UniverseScreeningRequest",
+    "UniverseScreeningResponse",
+    "SearchResult",
+    "SearchResponse",
+    "ErrorResponse",
+    "WatchListCreate",
+    "WatchListUpdate",
+    "WatchListItemCreate",
+    "WatchListItemUpdate",
+    "WatchListItemResponse",
+    "WatchListResponse",
+    "WatchListSnapshotItem",
+    "WatchListSnapshotResponse",
+    "PriceAlertResponse",
+    "PriceAlertListResponse",
+    "BacktestRequest",
+    "BacktestPeriod",
+    "BacktestSummary",
+    "BacktestResult",
+    "BacktestJobResponse"
 ]
\ No newline at end of file
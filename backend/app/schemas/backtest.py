@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date
+
+from app.schemas.stock import ScreeningCriteria
+
+class BacktestRequest(ScreeningCriteria):
+    """スクリーニング条件のバックテストリクエストスキーマ"""
+    symbols: Optional[List[str]] = Field(None, min_items=1, description="対象の株式ティッカーシンボル（省略時は株価履歴を保存済みの全銘柄）")
+    start_date: date = Field(..., description="開始日")
+    end_date: Optional[date] = Field(None, description="終了日（省略時は当日）")
+    rebalance: str = Field(default="monthly", description="リバランス間隔 (weekly, monthly, quarterly)")
+    top_n: Optional[int] = Field(None, ge=1, description="条件に合致した銘柄のうちスコア上位の保有数（省略時は全銘柄）")
+    min_score: Optional[float] = Field(None, ge=0, le=10, description="最小財務スコア")
+
+class BacktestPeriod(BaseModel):
+    """リバランス期間ごとの結果"""
+    rebalance_date: str = Field(..., description="銘柄を選定した日（期間の最終営業日）")
+    portfolio_return: float = Field(..., description="次のリバランスまでの等金額ポートフォリオの収益率")
+    benchmark_return: Optional[float] = Field(None, description="対象の全銘柄の等金額ポートフォリオの収益率")
+    holdings: int = Field(..., description="保有銘柄数")
+    top_holdings: List[str] = Field(default_factory=list, description="スコア上位の保有銘柄")
+
+class BacktestSummary(BaseModel):
+    """バックテストの成績"""
+    periods: int
+    cumulative_return: Optional[float] = None
+    cagr: Optional[float] = Field(None, description="年平均成長率")
+    volatility: Optional[float] = Field(None, description="年率換算の標準偏差")
+    sharpe_ratio: Optional[float] = Field(None, description="シャープレシオ（無リスク金利0）")
+    max_drawdown: Optional[float] = Field(None, description="最大下落率（負の値）")
+    benchmark_cumulative_return: Optional[float] = None
+    benchmark_cagr: Optional[float] = None
+    hit_rate: Optional[float] = Field(None, description="ベンチマークを上回った期間の割合")
+    average_holdings: Optional[float] = None
+    turnover: Optional[float] = Field(None, description="1回のリバランスあたりの平均売買比率")
+
+class BacktestResult(BaseModel):
+    """バックテストの結果"""
+    start_date: str
+    end_date: str
+    rebalance: str
+    symbols_evaluated: int
+    summary: BacktestSummary
+    periods: List[BacktestPeriod]
+    execution_time: float
+
+class BacktestJobResponse(BaseModel):
+    """バックテストの実行状況のレスポンススキーマ"""
+    job_id: str
+    status: str = Field(..., description="queued / running / completed / failed")
+    submitted_at: str
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    error: Optional[str] = None
+    result: Optional[BacktestResult] = None
@@ -32,6 +32,15 @@ class StockInfoResponse(BaseModel):
     shares_outstanding: Optional[int] = None
     float_shares: Optional[int] = None
     last_updated: str
+    data_age_seconds: Optional[float] = Field(None, description="データ取得からの経過秒数")
+    is_stale: bool = Field(False, description="有効期限切れのデータを返している場合はTrue（裏で再取得中）")
+
+class BatchStockInfoResponse(BaseModel):
+    """複数銘柄の基本情報のレスポンススキーマ"""
+    results: Dict[str, StockInfoResponse]
+    errors: Dict[str, str]
+    total_symbols: int
+    last_updated: str
 
 class FinancialDataResponse(BaseModel):
     """財務データのレスポンススキーマ"""
@@ -41,6 +50,23 @@ class FinancialDataResponse(BaseModel):
     cashflow: Dict[str, Any]
     last_updated: str
 
+class FinancialLineItemValue(BaseModel):
+    """勘定科目の値（1銘柄・1決算期）"""
+    symbol: str
+    statement: str
+    period_end: str
+    value: Optional[float] = None
+
+class FinancialLineItemResponse(BaseModel):
+    """勘定科目の全銘柄横断取得のレスポンススキーマ"""
+    line_item: str
+    statement: Optional[str] = None
+    period_end: Optional[str] = None
+    latest: bool
+    total: int
+    results: List[FinancialLineItemValue]
+    last_updated: str
+
 class HistoricalDataResponse(BaseModel):
     """履歴データのレスポンススキーマ"""
     symbol: str
@@ -48,12 +74,122 @@ class HistoricalDataResponse(BaseModel):
     data: List[Dict[str, Any]]
     last_updated: str
 
+class HistoricalColumnarDataResponse(BaseModel):
+    """履歴データ（列形式）のレスポンススキーマ"""
+    symbol: str
+    period: str
+    data: Dict[str, List[Any]] = Field(..., description="Date/Open/High/Low/Close/Volumeごとの配列")
+    last_updated: str
+
 class FinancialScoreResponse(BaseModel):
     """財務スコアのレスポンススキーマ"""
     symbol: str
     overall_score: float = Field(..., ge=0, le=10, description="総合スコア (0-10)")
     detailed_scores: Dict[str, float]
     last_updated: str
+    data_age_seconds: Optional[float] = Field(None, description="スコアの元データ取得からの経過秒数")
+    is_stale: bool = Field(False, description="有効期限切れのデータから計算した場合はTrue（裏で再取得中）")
+
+class TrendMetricsResponse(BaseModel):
+    """複数年の傾向指標のレスポンススキーマ"""
+    symbol: str
+    periods: int = Field(..., description="計算に使用した決算期の数")
+    revenue_cagr: Optional[float] = Field(None, description="売上高の年平均成長率")
+    eps_cagr: Optional[float] = Field(None, description="EPSの年平均成長率")
+    revenue_growth_consistency: Optional[float] = Field(None, description="前期比で増収した期の割合 (0-1)")
+    operating_margin_mean: Optional[float] = Field(None, description="営業利益率の平均")
+    operating_margin_volatility: Optional[float] = Field(None, description="営業利益率の標準偏差")
+    net_margin_volatility: Optional[float] = Field(None, description="純利益率の標準偏差")
+    fcf_consistency: Optional[float] = Field(None, description="フリーキャッシュフローが黒字の期の割合 (0-1)")
+    fcf_margin_mean: Optional[float] = Field(None, description="フリーキャッシュフロー / 売上高の平均")
+    roe_mean: Optional[float] = Field(None, description="ROEの平均")
+    roe_trend: Optional[float] = Field(None, description="ROEの1年あたりの変化")
+    last_updated: str
+
+class IndicatorResponse(BaseModel):
+    """テクニカル指標のレスポンススキーマ"""
+    symbol: str
+    as_of: str = Field(..., description="計算に使用した最新の足の日付")
+    close: Optional[float] = Field(None, description="最新の終値")
+    indicators: Dict[str, Optional[float]] = Field(
+        ...,
+        description="指標名_期間をキーとした値 (例: sma_50, rsi_14, volatility_20, max_drawdown_252, range_position_252)"
+    )
+    last_updated: str
+
+class BatchIndicatorResponse(BaseModel):
+    """複数銘柄のテクニカル指標のレスポンススキーマ"""
+    results: Dict[str, IndicatorResponse]
+    errors: Dict[str, str]
+    total_symbols: int
+    last_updated: str
+
+class BuffettViewpointScore(BaseModel):
+    """バフェット式7観点の観点ごとの事前スコア"""
+    label: str
+    weight: int = Field(..., description="総合評価での重要度（%）")
+    score: Optional[float] = Field(None, ge=0, le=10, description="スコア (0-10)。定性評価の観点・指標が無い場合はnull")
+    grade: Optional[str] = Field(None, description="A (7以上) / B (4以上) / C")
+
+class BuffettScoreResponse(BaseModel):
+    """バフェット式7観点の事前スコアのレスポンススキーマ"""
+    symbol: str
+    name: str
+    sector: Optional[str] = None
+    industry: Optional[str] = None
+    pre_score: Optional[float] = Field(None, ge=0, le=100, description="算出できた観点の重要度で加重平均した総合スコア (0-100)")
+    coverage: float = Field(..., ge=0, le=1, description="算出できた観点の重要度の合計 (0-1)")
+    verdict: Optional[str] = Field(None, description="総合スコアによる投資判定（調査指示書の基準）")
+    viewpoints: Dict[str, BuffettViewpointScore]
+    last_updated: str
+
+class BuffettShortlistResponse(BaseModel):
+    """事前スコアの高い順の調査候補一覧のレスポンススキーマ"""
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
+    results: List[BuffettScoreResponse]
+    last_updated: str
+
+class BuffettScoreRefreshResponse(BaseModel):
+    """事前スコアの一括再計算のレスポンススキーマ"""
+    updated: int = Field(..., description="入力が変わりスコアを更新した銘柄数")
+    execution_time: float
+    last_updated: str
+
+class PeerMetricStats(BaseModel):
+    """セクター・業種内の指標の分布"""
+    count: int = Field(..., description="有効な値の銘柄数")
+    q1: Optional[float] = Field(None, description="第1四分位数")
+    median: Optional[float] = None
+    q3: Optional[float] = Field(None, description="第3四分位数")
+
+class PeerGroupResponse(BaseModel):
+    """セクター・業種ごとの指標の分布のレスポンススキーマ"""
+    group_type: str
+    group_name: str
+    metrics: Dict[str, PeerMetricStats]
+
+class PeerGroupListResponse(BaseModel):
+    """セクター・業種の一覧のレスポンススキーマ"""
+    group_type: str
+    total: int
+    results: List[PeerGroupResponse]
+    last_updated: str
+
+class RelativeMetric(PeerMetricStats):
+    """銘柄の指標と同じセクター・業種の分布との比較"""
+    value: Optional[float] = None
+    relative_to_median: Optional[float] = Field(None, description="中央値に対する倍率")
+
+class RelativeMetricsResponse(BaseModel):
+    """銘柄の同じセクター・業種との比較のレスポンススキーマ"""
+    symbol: str
+    peer_group: str
+    group_name: Optional[str] = None
+    metrics: Dict[str, RelativeMetric]
+    last_updated: str
 
 class StockRequest(BaseModel):
     """株式情報取得リクエストスキーマ"""
@@ -64,14 +200,30 @@ class HistoricalDataRequest(BaseModel):
     symbol: str = Field(..., min_length=1, max_length=10, description="株式ティッカーシンボル")
     period: str = Field(default="1y", description="取得期間 (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)")
 
-class ScreeningRequest(BaseModel):
-    """スクリーニングリクエストスキーマ"""
-    symbols: List[str] = Field(..., min_items=1, max_items=50, description="株式ティッカーシンボルのリスト")
+class ScreeningCriteria(BaseModel):
+    """スクリーニング条件スキーマ"""
     min_market_cap: Optional[float] = Field(None, ge=0, description="最小時価総額")
     max_pe_ratio: Optional[float] = Field(None, ge=0, description="最大PER")
     min_roe: Optional[float] = Field(None, ge=0, description="最小ROE")
     max_debt_to_equity: Optional[float] = Field(None, ge=0, description="最大負債比率")
     min_current_ratio: Optional[float] = Field(None, ge=0, description="最小流動比率")
+    min_revenue_cagr: Optional[float] = Field(None, description="最小売上高年平均成長率")
+    min_eps_cagr: Optional[float] = Field(None, description="最小EPS年平均成長率")
+    min_fcf_consistency: Optional[float] = Field(None, ge=0, le=1, description="フリーキャッシュフローが黒字の期の最小割合")
+    max_operating_margin_volatility: Optional[float] = Field(None, ge=0, description="営業利益率の最大標準偏差")
+    peer_group: str = Field(default="sector", pattern="^(sector|industry)$", description="業種内比較の対象 (sector, industry)")
+    max_pe_to_peer_median: Optional[float] = Field(None, ge=0, description="PERの同じセクター・業種の中央値に対する最大倍率")
+    max_pb_to_peer_median: Optional[float] = Field(None, ge=0, description="PBRの同じセクター・業種の中央値に対する最大倍率")
+    min_roe_to_peer_median: Optional[float] = Field(None, ge=0, description="ROEの同じセクター・業種の中央値に対する最小倍率")
+
+class ScreeningRequest(ScreeningCriteria):
+    """スクリーニングリクエストスキーマ"""
+    symbols: List[str] = Field(..., min_items=1, max_items=500, description="株式ティッカーシンボルのリスト")
+
+class UniverseScreeningRequest(ScreeningCriteria):
+    """保存済み全銘柄を対象としたスクリーニングリクエストスキーマ"""
+    page: int = Field(default=1, ge=1, description="ページ番号")
+    page_size: int = Field(default=50, ge=1, le=500, description="1ページあたりの件数")
 
 class ScreeningResult(BaseModel):
     """スクリーニング結果のアイテム"""
@@ -94,6 +246,43 @@ class ScreeningResponse(BaseModel):
     execution_time: float
     last_updated: str
 
+class StoredScreeningResponse(BaseModel):
+    """保存済みスクリーニング結果のページのレスポンススキーマ"""
+    request_id: str
+    criteria: Optional[Dict[str, Any]] = Field(None, description="実行時のスクリーニング条件（条件の保存前に実行した結果ではnull）")
+    total_symbols: int
+    passed_symbols: int
+    execution_time: float
+    created_at: Optional[str] = None
+    results: List[ScreeningResult]
+    limit: int
+    next_cursor: Optional[int] = Field(None, description="次のページを取得するためのカーソル（最後のページではnull）")
+
+class UniverseScreeningResponse(BaseModel):
+    """保存済み全銘柄を対象としたスクリーニングレスポンススキーマ"""
+    request_id: str
+    total_matches: int
+    page: int
+    page_size: int
+    total_pages: int
+    results: List[ScreeningResult]
+    execution_time: float
+    last_updated: str
+
+class SearchResult(BaseModel):
+    """銘柄検索結果のアイテム"""
+    symbol: str
+    name: str
+    sector: Optional[str] = None
+    relevance: float = Field(..., ge=0, le=1, description="関連度 (0-1)")
+
+class SearchResponse(BaseModel):
+    """銘柄検索のレスポンススキーマ"""
+    query: str
+    results: List[SearchResult]
+    total: int
+    limit: int
+
 class ErrorResponse(BaseModel):
     """エラーレスポンススキーマ"""
     error: str
@@ -0,0 +1,86 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class WatchListCreate(BaseModel):
+    """ウォッチリスト作成リクエストスキーマ"""
+    name: str = Field(..., min_length=1, max_length=100, description="ウォッチリスト名")
+    description: Optional[str] = Field(None, description="説明")
+
+class WatchListUpdate(BaseModel):
+    """ウォッチリスト更新リクエストスキーマ（指定した項目のみ更新）"""
+    name: Optional[str] = Field(None, min_length=1, max_length=100, description="ウォッチリスト名")
+    description: Optional[str] = Field(None, description="説明")
+
+class WatchListItemCreate(BaseModel):
+    """ウォッチリストへの銘柄追加リクエストスキーマ"""
+    symbol: str = Field(..., min_length=1, max_length=10, description="株式ティッカーシンボル")
+    notes: Optional[str] = Field(None, description="メモ")
+    target_price: Optional[float] = Field(None, gt=0, description="目標株価")
+    stop_loss_price: Optional[float] = Field(None, gt=0, description="損切り株価")
+
+class WatchListItemUpdate(BaseModel):
+    """ウォッチリストのアイテム更新リクエストスキーマ（指定した項目のみ更新）"""
+    notes: Optional[str] = Field(None, description="メモ")
+    target_price: Optional[float] = Field(None, gt=0, description="目標株価")
+    stop_loss_price: Optional[float] = Field(None, gt=0, description="損切り株価")
+
+class WatchListItemResponse(BaseModel):
+    """ウォッチリストのアイテムのレスポンススキーマ"""
+    id: int
+    symbol: str
+    name: str
+    notes: Optional[str] = None
+    target_price: Optional[float] = None
+    stop_loss_price: Optional[float] = None
+    added_at: Optional[str] = None
+
+class WatchListResponse(BaseModel):
+    """ウォッチリストのレスポンススキーマ"""
+    id: int
+    name: str
+    description: Optional[str] = None
+    item_count: int
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    items: Optional[List[WatchListItemResponse]] = None
+
+class WatchListSnapshotItem(WatchListItemResponse):
+    """ウォッチリストのスナップショットのアイテム（現在値・スコア・目標との乖離を含む）"""
+    current_price: Optional[float] = None
+    score: Optional[float] = Field(None, ge=0, le=10, description="総合スコア (0-10)")
+    target_distance: Optional[float] = Field(None, description="目標株価 - 現在値")
+    target_distance_percent: Optional[float] = Field(None, description="現在値に対する目標株価までの変化率")
+    stop_loss_distance: Optional[float] = Field(None, description="現在値 - 損切り株価")
+    stop_loss_distance_percent: Optional[float] = Field(None, description="現在値に対する損切り株価までの下落率")
+    is_stale: bool = Field(False, description="有効期限切れのデータを返している場合はTrue")
+    error: Optional[str] = None
+
+class WatchListSnapshotResponse(BaseModel):
+    """ウォッチリストのスナップショットのレスポンススキーマ"""
+    id: int
+    name: str
+    description: Optional[str] = None
+    items: List[WatchListSnapshotItem]
+    total_items: int
+    execution_time: float
+    last_updated: str
+
+class PriceAlertResponse(BaseModel):
+    """価格アラートのレスポンススキーマ"""
+    id: int
+    watch_list_id: int
+    watch_list_item_id: int
+    symbol: str
+    name: str
+    alert_type: str = Field(..., description="target（目標株価に到達）/ stop_loss（損切り株価に到達）")
+    threshold: float = Field(..., description="到達した目標株価・損切り株価")
+    price: float = Field(..., description="到達時の株価")
+    previous_price: Optional[float] = Field(None, description="直前に評価した株価")
+    acknowledged: bool
+    triggered_at: Optional[str] = None
+
+class PriceAlertListResponse(BaseModel):
+    """価格アラートのページのレスポンススキーマ"""
+    alerts: List[PriceAlertResponse]
+    limit: int
+    next_cursor: Optional[int] = Field(None, description="次のページを取得するためのカーソル（最後のページではnull）")
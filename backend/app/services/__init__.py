@@ -1,7 +1,48 @@
 from .yahoo_finance_service import YahooFinanceService, yahoo_finance_service
+from .scoring_service import FinancialScoringService, financial_scoring_service
+from .peer_aggregate_service import PeerAggregateService, peer_aggregate_service
+from .buffett_score_service import BuffettScoreService, buffett_score_service
+from .trend_metrics_service import TrendMetricsService, trend_metrics_service
+from .indicator_service import IndicatorService, indicator_service
+from .screening_service import ScreeningService, screening_service
+from .refresh_scheduler import RefreshScheduler, refresh_scheduler
+from .search_service import SymbolSearchIndex, symbol_search_index
+from .watchlist_service import WatchListService, watchlist_service
+from .alert_service import PriceAlertEngine, price_alert_engine
+from .stream_service import QuoteBroadcaster, quote_broadcaster
+from .metrics_service import MetricsRegistry, metrics
+from .backtest_service import BacktestService, backtest_service
 
 # 将来的に追加するサービスはここでインポートする
-# from .screening_service import ScreeningService
 # from .analysis_service import AnalysisService
 
-__all__ = ["YahooFinanceService", "yahoo_finance_service"]
\ No newline at end of file
+__all__ = [
+    "YahooFinanceService",
+    "yahoo_finance_service",
+    "FinancialScoringService",
+    "financial_scoring_service",
+    "PeerAggregateService",
+    "peer_aggregate_service",
+    "BuffettScoreService",
+    "buffett_score_service",
+    "TrendMetricsService",
+    "trend_metrics_service",
+    "IndicatorService",
+    "indicator_service",
+    "ScreeningService",
+    "screening_service",
+    "RefreshScheduler",
+    "refresh_scheduler",
+    "SymbolSearchIndex",
+    "symbol_search_index",
+    "WatchListService",
+    "watchlist_service",
+    "PriceAlertEngine",
+    "price_alert_engine",
+    "QuoteBroadcaster",
+    "quote_broadcaster",
+    "MetricsRegistry",
+    "metrics",
+    "BacktestService",
+    "backtest_service"
+]
\ No newline at end of file
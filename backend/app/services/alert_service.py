@@ -0,0 +1,248 @@
+"""
+価格アラートサービス - ウォッチリストの目標株価・損切り株価への到達を株価の更新ごとに判定する
+"""
+from typing import Optional, Dict, Any, List, Set, Iterable
+import asyncio
+import math
+import logging
+
+import numpy as np
+
+from app.schemas.watchlist import PriceAlertResponse, PriceAlertListResponse
+from app.repositories.alert_repository import alert_repository
+
+logger = logging.getLogger(__name__)
+
+ALERT_TYPE_TARGET = "target"
+ALERT_TYPE_STOP_LOSS = "stop_loss"
+
+
+class _SymbolLevels:
+    """1銘柄分の目標株価・損切り株価（それぞれ昇順に並べ、対応するアイテムの位置を持つ）"""
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items
+        self.targets, self.target_items = self._sorted(items, "target_price")
+        self.stops, self.stop_items = self._sorted(items, "stop_loss_price")
+
+    @staticmethod
+    def _sorted(items: List[Dict[str, Any]], field: str):
+        positions = np.array([i for i, item in enumerate(items) if item[field] is not None], dtype=np.int64)
+        levels = np.array([items[i][field] for i in positions], dtype=np.float64)
+        order = np.argsort(levels, kind="stable")
+        return levels[order], positions[order]
+
+
+class PriceAlertEngine:
+    """
+    目標株価・損切り株価のインデックスを持ち、株価の更新ごとに到達したアイテムを判定するエンジン
+
+    銘柄ごとに水準を昇順の配列で保持し、前回評価した株価から今回の株価までの間にある
+    水準だけを二分探索で切り出すため、1回の判定で参照するのは水準を跨いだアイテムのみとなる。
+    イベントループ上でのみ更新する。
+    """
+
+    def __init__(self):
+        self._levels: Dict[str, _SymbolLevels] = {}
+        self._last_prices: Dict[str, float] = {}
+        self._save_tasks: Set[asyncio.Task] = set()
+
+        # 統計情報
+        self.evaluated = 0
+        self.triggered = 0
+
+    async def rebuild(self) -> int:
+        """
+        ウォッチリストから全銘柄のインデックスを作り直す
+
+        Returns:
+            インデックスに登録したアイテム数
+        """
+        rows = await alert_repository.get_levels()
+        self._apply(rows, None)
+        return sum(len(levels.items) for levels in self._levels.values())
+
+    async def reload(self, symbols: Iterable[str]) -> None:
+        """
+        指定した銘柄のインデックスだけを作り直す（アイテムの追加・変更・削除後に呼び出す）
+
+        Args:
+            symbols: 株式ティッカーシンボル
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        if not symbols:
+            return
+        rows = await alert_repository.get_levels(symbols)
+        self._apply(rows, symbols)
+
+    def _apply(self, rows: List[Dict[str, Any]], symbols: Optional[List[str]]) -> None:
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            grouped.setdefault(row["symbol"], []).append(row)
+
+        # 水準が無くなった銘柄はインデックスから外す
+        stale = symbols if symbols is not None else set(self._levels) | set(self._last_prices)
+        for symbol in stale:
+            if symbol not in grouped:
+                self._levels.pop(symbol, None)
+                self._last_prices.pop(symbol, None)
+
+        for symbol, items in grouped.items():
+            self._levels[symbol] = _SymbolLevels(items)
+            # 初めて登録する銘柄は保存済みの株価を基準にする（再起動時に到達済みの水準を再通知しない）
+            if symbol not in self._last_prices and items[0]["current_price"]:
+                self._last_prices[symbol] = items[0]["current_price"]
+
+    def evaluate(self, prices: Dict[str, Optional[float]]) -> List[Dict[str, Any]]:
+        """
+        更新された株価で目標株価・損切り株価への到達を判定（同期関数）
+
+        前回の株価から今回の株価までの間に目標株価（上昇時）・損切り株価（下落時）が
+        ある場合に到達とする。基準となる株価が無い場合は、すでに到達している水準を全て返す。
+
+        Args:
+            prices: シンボルをキーとした最新の株価
+
+        Returns:
+            到達したアラートの辞書のリスト
+        """
+        triggered = []
+        for symbol, price in prices.items():
+            symbol = symbol.upper()
+            levels = self._levels.get(symbol)
+            if levels is None or price is None or not math.isfinite(price) or price <= 0:
+                continue
+
+            self.evaluated += 1
+            previous = self._last_prices.get(symbol)
+            self._last_prices[symbol] = price
+            if previous == price:
+                continue
+
+            # 目標株価: previous < 水準 <= price
+            low = 0 if previous is None else np.searchsorted(levels.targets, previous, side="right")
+            high = np.searchsorted(levels.targets, price, side="right")
+            for position, threshold in zip(levels.target_items[low:high], levels.targets[low:high]):
+                triggered.append(
+                    self._alert(levels.items[position], ALERT_TYPE_TARGET, threshold, price, previous)
+                )
+
+            # 損切り株価: price <= 水準 < previous
+            low = np.searchsorted(levels.stops, price, side="left")
+            high = len(levels.stops) if previous is None else np.searchsorted(levels.stops, previous, side="left")
+            for position, threshold in zip(levels.stop_items[low:high], levels.stops[low:high]):
+                triggered.append(
+                    self._alert(levels.items[position], ALERT_TYPE_STOP_LOSS, threshold, price, previous)
+                )
+
+        self.triggered += len(triggered)
+        return triggered
+
+    def on_stock_write(self, stock_infos: List[Dict[str, Any]]) -> None:
+        """
+        株式情報の書き込み完了時に呼び出し、到達したアラートをバックグラウンドで保存する
+
+        Args:
+            stock_infos: 書き込んだ株式情報のリスト
+        """
+        alerts = self.evaluate({
+            stock_info["symbol"]: stock_info.get("current_price")
+            for stock_info in stock_infos
+        })
+        if not alerts:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._save(alerts))
+        self._save_tasks.add(task)
+        task.add_done_callback(self._save_tasks.discard)
+
+    async def _save(self, alerts: List[Dict[str, Any]]) -> None:
+        try:
+            saved = await alert_repository.save_alerts(alerts)
+            logger.info(f"Recorded {saved} price alerts")
+        except Exception as e:
+            logger.error(f"Error saving price alerts: {str(e)}")
+
+    async def wait_saved(self) -> None:
+        """
+        保存中のアラートの書き込み完了を待つ
+        """
+        if self._save_tasks:
+            await asyncio.gather(*list(self._save_tasks), return_exceptions=True)
+
+    async def list_alerts(
+        self,
+        watch_list_id: Optional[int] = None,
+        unacknowledged_only: bool = False,
+        cursor: Optional[int] = None,
+        limit: int = 50
+    ) -> PriceAlertListResponse:
+        """
+        記録済みのアラートを新しい順にページ単位で取得
+
+        Args:
+            watch_list_id: 対象のウォッチリストID（Noneの場合は全ウォッチリスト）
+            unacknowledged_only: 未確認のアラートのみ取得する場合はTrue
+            cursor: 前ページのnext_cursor（Noneの場合は先頭から）
+            limit: 1ページあたりの件数
+
+        Returns:
+            アラートのページ
+        """
+        # 次ページの有無を判定するため1件多く取得する
+        rows = await alert_repository.list_alerts(
+            watch_list_id,
+            unacknowledged_only,
+            cursor,
+            limit + 1
+        )
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+
+        return PriceAlertListResponse(
+            alerts=[PriceAlertResponse(**row) for row in rows],
+            limit=limit,
+            next_cursor=rows[-1]["id"] if has_next else None
+        )
+
+    async def acknowledge(self, alert_id: int) -> Optional[Dict[str, Any]]:
+        """
+        アラートを確認済みにする
+
+        Returns:
+            更新後のアラートの辞書、存在しない場合はNone
+        """
+        return await alert_repository.acknowledge(alert_id)
+
+    @staticmethod
+    def _alert(
+        item: Dict[str, Any],
+        alert_type: str,
+        threshold: float,
+        price: float,
+        previous: Optional[float]
+    ) -> Dict[str, Any]:
+        return {
+            "watch_list_id": item["watch_list_id"],
+            "watch_list_item_id": item["item_id"],
+            "stock_id": item["stock_id"],
+            "alert_type": alert_type,
+            "threshold": float(threshold),
+            "price": price,
+            "previous_price": previous
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        エンジンの統計情報を取得
+        """
+        return {
+            "symbols": len(self._levels),
+            "items": sum(len(levels.items) for levels in self._levels.values()),
+            "evaluated": self.evaluated,
+            "triggered": self.triggered
+        }
+
+
+# エンジンインスタンス
+price_alert_engine = PriceAlertEngine()
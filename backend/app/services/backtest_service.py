@@ -0,0 +1,462 @@
+"""
+バックテストサービス - スクリーニング条件を過去の各時点の指標スナップショットに適用し、保存済みの株価で成績を計算する
+"""
+from typing import Optional, Dict, Any, Set
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+import asyncio
+import multiprocessing
+import time
+import uuid
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.schemas.backtest import BacktestRequest
+from app.services.scoring_service import financial_scoring_service
+from app.repositories.price_repository import price_repository, REBALANCE_PERIODS
+from app.repositories.snapshot_repository import snapshot_repository
+
+logger = logging.getLogger(__name__)
+
+# スクリーニング条件と判定に使う指標（値が欠損・0の指標は判定対象外）
+LOWER_BOUNDS = [("market_cap", "min_market_cap"), ("roe", "min_roe"), ("current_ratio", "min_current_ratio")]
+UPPER_BOUNDS = [("pe_ratio", "max_pe_ratio"), ("debt_to_equity", "max_debt_to_equity")]
+
+# 傾向指標の条件（0も有効な値のため、欠損のみ判定対象外）
+TREND_LOWER_BOUNDS = [
+    ("revenue_cagr", "min_revenue_cagr"),
+    ("eps_cagr", "min_eps_cagr"),
+    ("fcf_consistency", "min_fcf_consistency")
+]
+TREND_UPPER_BOUNDS = [("operating_margin_volatility", "max_operating_margin_volatility")]
+
+# 直近の値を引き継ぐ指標（PER・時価総額は評価日の株価とEPS・発行済株式数から計算する）
+CARRIED_FIELDS = [
+    "eps", "shares_outstanding", "roe", "debt_to_equity", "current_ratio", "profit_margin",
+    "revenue_cagr", "eps_cagr", "fcf_consistency", "operating_margin_volatility"
+]
+
+# 期間ごとに返すスコア上位の保有銘柄の数
+TOP_HOLDINGS = 10
+
+
+class BacktestService:
+    """
+    バックテストの実行を管理するサービス
+
+    データベースからの読み込みはイベントループ上で行い、計算は他に実行中・待機中の
+    バックテストが無ければスレッドで、あればプロセスプールで並列に実行する。
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.BACKTEST_WORKERS,
+        max_jobs: int = settings.BACKTEST_MAX_JOBS
+    ):
+        self.workers = max(1, workers)
+        self.max_jobs = max(1, max_jobs)
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # 統計情報
+        self.completed = 0
+        self.failed = 0
+        self.pooled = 0
+
+    def submit(self, request: BacktestRequest) -> Dict[str, Any]:
+        """
+        バックテストを実行待ちに追加
+
+        Args:
+            request: バックテストリクエスト
+
+        Returns:
+            実行状況の辞書
+
+        Raises:
+            ValueError: リクエストの値が不正な場合
+        """
+        end_date = request.end_date or date.today()
+        if request.rebalance not in REBALANCE_PERIODS:
+            raise ValueError(
+                f"無効なリバランス間隔です。有効な間隔: {', '.join(REBALANCE_PERIODS)}"
+            )
+        if request.start_date >= end_date:
+            raise ValueError("開始日は終了日より前の日付を指定してください")
+        # 業種内比較の中央値は現在の値のみ保存しているため、過去の時点では評価できない
+        if any(
+            value is not None
+            for value in (request.max_pe_to_peer_median, request.max_pb_to_peer_median, request.min_roe_to_peer_median)
+        ):
+            raise ValueError("バックテストでは業種内比較の条件は指定できません")
+
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "status": "queued",
+            "submitted_at": datetime.now().isoformat(),
+            "started_at": None,
+            "completed_at": None,
+            "error": None,
+            "result": None
+        }
+        self._jobs[job["job_id"]] = job
+        self._trim_jobs()
+
+        task = asyncio.get_running_loop().create_task(self._run(job, request, end_date))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        バックテストの実行状況を取得
+
+        Returns:
+            実行状況の辞書、存在しない場合はNone
+        """
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: Dict[str, Any], request: BacktestRequest, end_date: date) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+
+        async with self._semaphore:
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat()
+            start_time = time.time()
+            try:
+                inputs = await self.load_inputs(request, end_date)
+                # 他のバックテストが実行中・待機中の場合はプロセスプールで並列に計算する
+                if self._pending() > 1:
+                    self.pooled += 1
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(self._executor(), run_backtest, inputs)
+                else:
+                    result = await asyncio.to_thread(run_backtest, inputs)
+
+                result.update({
+                    "start_date": request.start_date.isoformat(),
+                    "end_date": end_date.isoformat(),
+                    "rebalance": request.rebalance,
+                    "execution_time": time.time() - start_time
+                })
+                job["result"] = result
+                job["status"] = "completed"
+                self.completed += 1
+
+            except Exception as e:
+                logger.error(f"Error running backtest {job['job_id']}: {str(e)}")
+                if isinstance(e, BrokenProcessPool):
+                    # 異常終了したプロセスプールは次回作り直す
+                    self._pool = None
+                job["status"] = "failed"
+                job["error"] = "バックテストの実行中にエラーが発生しました"
+                self.failed += 1
+
+            finally:
+                job["completed_at"] = datetime.now().isoformat()
+
+    async def load_inputs(self, request: BacktestRequest, end_date: date) -> Dict[str, Any]:
+        """
+        バックテストの計算に必要な株価・指標スナップショットを読み込む
+
+        株価・スナップショットはリバランス期間ごとに各銘柄の最後の値のみを読み込む。
+
+        Args:
+            request: バックテストリクエスト
+            end_date: 終了日
+
+        Returns:
+            run_backtestの入力（プロセス間で受け渡せる値のみ）
+        """
+        symbols = (
+            list(dict.fromkeys(symbol.upper() for symbol in request.symbols))
+            if request.symbols else None
+        )
+        prices = await price_repository.get_period_closes(
+            symbols,
+            request.start_date,
+            end_date,
+            request.rebalance
+        )
+        snapshots = await snapshot_repository.get_period_snapshots(symbols, end_date, request.rebalance)
+
+        return {
+            "prices": {
+                "symbol": prices["symbol"],
+                "bucket": prices["bucket"],
+                "date": np.array(prices["date"], dtype="datetime64[D]"),
+                "close": np.array(prices["close"], dtype=float)
+            },
+            "snapshots": {
+                "symbol": snapshots["symbol"],
+                "bucket": snapshots["bucket"],
+                **{
+                    field: np.array(snapshots[field], dtype=float)
+                    for field in snapshots
+                    if field not in ("symbol", "bucket", "as_of")
+                }
+            },
+            "criteria": request.model_dump(
+                exclude={"symbols", "start_date", "end_date", "rebalance", "top_n", "min_score", "peer_group"}
+            ),
+            "periods_per_year": REBALANCE_PERIODS[request.rebalance],
+            "top_n": request.top_n,
+            "min_score": request.min_score
+        }
+
+    def _pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # 実行中のスレッドを複製しないよう、新しいプロセスで起動する
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _trim_jobs(self) -> None:
+        """
+        保持するバックテストの件数を上限以内にする（完了したものから古い順に削除）
+        """
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in ("completed", "failed")
+        ][:excess]:
+            del self._jobs[job_id]
+
+    async def shutdown(self) -> None:
+        """
+        実行中のバックテストを中止し、プロセスプールを終了
+        """
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        バックテストの実行状況の統計情報を取得
+        """
+        statuses = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+        for job in self._jobs.values():
+            statuses[job["status"]] += 1
+        return {
+            "jobs": statuses,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pooled": self.pooled
+        }
+
+
+def run_backtest(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    リバランス日ごとにスクリーニング条件・スコアを評価し、次のリバランスまでの収益率を計算
+
+    日付を行、銘柄を列とした2次元配列で全期間・全銘柄を一括評価する。
+    プロセスプールで実行するため、入力・出力はプロセス間で受け渡せる値のみとする。
+
+    Args:
+        inputs: BacktestService.load_inputsの出力
+
+    Returns:
+        symbols_evaluated, summary, periodsを含む辞書
+    """
+    prices = inputs["prices"]
+    if not len(prices["close"]):
+        return {"symbols_evaluated": 0, "summary": _performance(np.array([]), np.array([]), 1), "periods": []}
+
+    # 株価を(リバランス期間, 銘柄)の配列に並べる
+    symbol_codes, symbols = pd.factorize(pd.Index(prices["symbol"]))
+    buckets = np.unique(np.asarray(prices["bucket"]))
+    bucket_codes = np.searchsorted(buckets, np.asarray(prices["bucket"]))
+    shape = (len(buckets), len(symbols))
+    close = np.full(shape, np.nan)
+    close[bucket_codes, symbol_codes] = prices["close"]
+    # リバランス日は期間内の最後の取引日
+    day_numbers = np.zeros(len(buckets), dtype=np.int64)
+    np.maximum.at(day_numbers, bucket_codes, prices["date"].astype(np.int64))
+    rebalance_dates = np.datetime_as_string(day_numbers.astype("datetime64[D]"), unit="D")
+
+    metrics = _carry_snapshots(inputs["snapshots"], symbols, buckets, shape)
+    known = metrics.pop("known")
+
+    # 評価日の株価からPER・時価総額を計算
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics["pe_ratio"] = np.where(metrics["eps"] > 0, close / metrics["eps"], np.nan)
+        metrics["market_cap"] = close * metrics["shares_outstanding"]
+
+    eligible = known & np.isfinite(close)
+    passed = eligible & _meets_criteria(inputs["criteria"], metrics)
+
+    # 財務スコアは全期間・全銘柄をまとめて計算
+    scores = financial_scoring_service.score_frame(
+        pd.DataFrame({column: metrics[column].ravel() for column in ("debt_to_equity", "roe", "current_ratio", "pe_ratio", "profit_margin")})
+    )["overall_score"].to_numpy().reshape(shape)
+    if inputs.get("min_score") is not None:
+        passed &= scores >= inputs["min_score"]
+
+    # スコアの降順に並べ、上位top_n銘柄を保有する
+    ranked = np.where(passed, scores, -np.inf)
+    order = np.argsort(-ranked, axis=1, kind="stable")
+    selected = passed
+    if inputs.get("top_n"):
+        selected = np.zeros(shape, dtype=bool)
+        np.put_along_axis(selected, order[:, :inputs["top_n"]], True, axis=1)
+        selected &= passed
+
+    # 次のリバランスまでの収益率（最後の期間は保有しない）
+    with np.errstate(divide="ignore", invalid="ignore"):
+        forward = close[1:] / close[:-1] - 1.0
+    valid = np.isfinite(forward)
+    holdings = selected[:-1] & valid
+    universe = eligible[:-1] & valid
+    portfolio_returns = _equal_weight(forward, holdings)
+    benchmark_returns = _equal_weight(forward, universe)
+
+    counts = holdings.sum(axis=1)
+    weights = np.divide(holdings, counts[:, None], out=np.zeros(holdings.shape), where=counts[:, None] > 0)
+    turnover = 0.5 * np.abs(np.diff(weights, axis=0)).sum(axis=1) if len(weights) > 1 else np.array([])
+
+    periods = []
+    for row in range(len(portfolio_returns)):
+        top = [symbols[column] for column in order[row, :TOP_HOLDINGS] if holdings[row, column]]
+        periods.append({
+            "rebalance_date": str(rebalance_dates[row]),
+            "portfolio_return": float(portfolio_returns[row]),
+            "benchmark_return": float(benchmark_returns[row]) if universe[row].any() else None,
+            "holdings": int(counts[row]),
+            "top_holdings": top
+        })
+
+    summary = _performance(portfolio_returns, benchmark_returns, inputs["periods_per_year"])
+    summary["average_holdings"] = float(counts.mean()) if len(counts) else None
+    summary["turnover"] = float(turnover.mean()) if len(turnover) else None
+    return {"symbols_evaluated": len(symbols), "summary": summary, "periods": periods}
+
+
+def _carry_snapshots(
+    snapshots: Dict[str, Any],
+    symbols: pd.Index,
+    buckets: np.ndarray,
+    shape: tuple
+) -> Dict[str, np.ndarray]:
+    """
+    スナップショットを(リバランス期間, 銘柄)の配列に並べ、各時点で利用可能な直近の値を引き継ぐ
+
+    スナップショットはas_ofの昇順のため、行番号の累積最大値が各時点の直近の行になる。
+    指標ごとに値のある行だけを引き継ぐため、株式情報と財務諸表のスナップショットが
+    交互に記録されていても、それぞれの直近の値を使う。
+    """
+    columns = symbols.get_indexer(pd.Index(snapshots["symbol"]))
+    positions = np.searchsorted(buckets, np.asarray(snapshots["bucket"]))
+    usable = (columns >= 0) & (positions < len(buckets))
+    rows = np.arange(len(columns))
+
+    # 株価に依存しない形（EPS・発行済株式数）に揃える
+    price = snapshots["price"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied_eps = np.where(
+            np.isfinite(snapshots["pe_ratio"]) & (snapshots["pe_ratio"] > 0), price / snapshots["pe_ratio"], np.nan
+        )
+        implied_shares = snapshots["market_cap"] / price
+    values = {
+        **{field: snapshots[field] for field in CARRIED_FIELDS},
+        "eps": np.where(np.isfinite(implied_eps), implied_eps, snapshots["eps"]),
+        "shares_outstanding": np.where(
+            np.isfinite(snapshots["shares_outstanding"]), snapshots["shares_outstanding"], implied_shares
+        )
+    }
+
+    def carry(mask: np.ndarray) -> np.ndarray:
+        latest = np.full(shape, -1)
+        np.maximum.at(latest, (positions[mask], columns[mask]), rows[mask])
+        return np.maximum.accumulate(latest, axis=0)
+
+    carried = {"known": carry(usable) >= 0}
+    for field, field_values in values.items():
+        latest = carry(usable & np.isfinite(field_values))
+        carried[field] = np.where(latest >= 0, field_values[latest], np.nan) if len(field_values) else np.full(shape, np.nan)
+    return carried
+
+
+def _meets_criteria(criteria: Dict[str, Any], metrics: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    スクリーニング条件をScreeningService.meets_criteriaと同じ規則で一括判定
+    """
+    passed = np.ones(next(iter(metrics.values())).shape, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        for field, key in LOWER_BOUNDS + UPPER_BOUNDS:
+            bound = criteria.get(key)
+            if not bound:
+                continue
+            value = metrics[field]
+            present = np.isfinite(value) & (value != 0)
+            failed = value < bound if (field, key) in LOWER_BOUNDS else value > bound
+            passed &= ~(present & failed)
+
+        for field, key in TREND_LOWER_BOUNDS + TREND_UPPER_BOUNDS:
+            bound = criteria.get(key)
+            if bound is None:
+                continue
+            value = metrics[field]
+            failed = value < bound if (field, key) in TREND_LOWER_BOUNDS else value > bound
+            passed &= ~(np.isfinite(value) & failed)
+    return passed
+
+
+def _equal_weight(returns: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    期間ごとの等金額ポートフォリオの収益率（保有銘柄が無い期間は現金で0）
+    """
+    counts = mask.sum(axis=1)
+    totals = np.where(mask, returns, 0.0).sum(axis=1)
+    return np.divide(totals, counts, out=np.zeros(len(counts)), where=counts > 0)
+
+
+def _performance(returns: np.ndarray, benchmark: np.ndarray, periods_per_year: int) -> Dict[str, Any]:
+    """
+    期間ごとの収益率から累積収益率・年率リターン・シャープレシオ・最大下落率を計算
+    """
+    summary: Dict[str, Any] = {"periods": int(len(returns))}
+    if not len(returns):
+        return summary
+
+    years = len(returns) / periods_per_year
+    equity = np.cumprod(1.0 + returns)
+    benchmark_equity = np.cumprod(1.0 + benchmark)
+    summary["cumulative_return"] = float(equity[-1] - 1.0)
+    summary["cagr"] = float(equity[-1] ** (1.0 / years) - 1.0) if equity[-1] > 0 else -1.0
+    summary["benchmark_cumulative_return"] = float(benchmark_equity[-1] - 1.0)
+    summary["benchmark_cagr"] = (
+        float(benchmark_equity[-1] ** (1.0 / years) - 1.0) if benchmark_equity[-1] > 0 else -1.0
+    )
+    summary["max_drawdown"] = float(np.min(equity / np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:] - 1.0))
+    summary["hit_rate"] = float(np.mean(returns > benchmark))
+
+    if len(returns) > 1:
+        deviation = returns.std(ddof=1)
+        summary["volatility"] = float(deviation * np.sqrt(periods_per_year))
+        summary["sharpe_ratio"] = (
+            float(returns.mean() / deviation * np.sqrt(periods_per_year)) if deviation > 0 else None
+        )
+    return summary
+
+
+# サービスインスタンス
+backtest_service = BacktestService()
@@ -0,0 +1,390 @@
+"""
+バフェット式事前スコアサービス - 株式調査指示書（バフェット式7観点分析）の定量的に判定できる観点を
+保存済みの全銘柄についてまとめて採点し、アナリストが調査する候補の順位付けに使う
+"""
+from typing import Optional, Dict, Any, List, Set, Tuple
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.repositories.buffett_score_repository import buffett_score_repository, BUFFETT_SCORE_FIELDS
+from app.services.peer_aggregate_service import peer_aggregate_service
+
+logger = logging.getLogger(__name__)
+
+# 採点基準の版（基準を変えた場合は上げると全銘柄を再計算する）
+SCORE_VERSION = 2
+
+# 観点（キー, 列, 重要度, 名称）。重要度は調査指示書の総合評価の配分
+VIEWPOINTS = [
+    ("competitive_advantage", "moat_score", 25, "競争優位性・参入障壁"),
+    ("valuation", "valuation_score", 20, "適正なバリュエーション"),
+    ("management", None, 20, "経営陣の質と安定性"),
+    ("financial_health", "financial_health_score", 15, "財務健全性"),
+    ("cash_flow", "cash_flow_score", 10, "キャッシュフロー生成能力"),
+    ("revenue_growth", "revenue_growth_score", 5, "安定した売上成長率"),
+    ("industry_growth", "industry_growth_score", 5, "業界の成長性・将来性"),
+]
+
+# 指標から0-10の点数への変換（折れ線の頂点。範囲外は端の点数）
+# A評価（7点以上）・B評価（4点以上）の境界が調査指示書の判断基準に合うように置く
+SCORE_CURVES = {
+    # 観点1: 高い資本効率・利益率が続いていることを競争優位性の代替指標とする
+    "roe": ([0.0, 0.08, 0.15, 0.20], [0, 3, 7, 10]),
+    "operating_margin": ([0.0, 0.05, 0.15, 0.25], [0, 3, 7, 10]),
+    "gross_margin": ([0.1, 0.3, 0.5, 0.6], [0, 4, 7, 10]),
+    # 観点2: 業種の中央値に対する倍率（1倍で5点）とPEGレシオ
+    "relative_multiple": ([0.5, 0.7, 1.0, 1.5], [10, 8, 5, 0]),
+    "peg_ratio": ([1.0, 2.0, 3.0], [10, 5, 0]),
+    # 観点4: 負債比率30%以下でA評価、50%以下でB評価
+    "debt_to_equity": ([0, 30, 50, 100], [10, 7, 4, 0]),
+    "current_ratio": ([0.8, 1.2, 2.0], [0, 4, 10]),
+    "quick_ratio": ([0.5, 1.0, 1.5], [0, 7, 10]),
+    # 観点5: フリーキャッシュフローの黒字の継続・水準と、利益率の変動の小ささ
+    "fcf_consistency": ([0.25, 0.75, 1.0], [0, 6, 10]),
+    "fcf_margin": ([0.0, 0.05, 0.10, 0.15], [0, 4, 7, 10]),
+    "net_margin_volatility": ([0.01, 0.03, 0.08], [10, 7, 0]),
+    # 観点6: 年平均5-15%の成長でA評価、3%以上でB評価（高すぎる成長は持続性を割り引く）
+    "revenue_cagr": ([-0.05, 0.0, 0.03, 0.05, 0.15, 0.30], [0, 2, 4, 8, 10, 5]),
+    "revenue_growth_consistency": ([0.25, 0.5, 1.0], [0, 4, 10]),
+    # 観点7: 業種の売上高年平均成長率の中央値
+    "industry_growth": ([-0.02, 0.0, 0.03, 0.08, 0.15], [0, 2, 4, 7, 10]),
+}
+
+# 業種内比較に使う中央値の指標（peer_aggregatesに保存済みのもの）
+PEER_MEDIAN_METRICS = ["pe_ratio", "pb_ratio", "revenue_cagr", "revenue_growth"]
+
+# 総合スコアの投資判定（調査指示書の基準）
+VERDICTS = [(85, "強く推奨"), (70, "推奨"), (55, "条件付き推奨"), (0, "推奨しない")]
+
+
+class BuffettScoreService:
+    """バフェット式7観点の事前スコアを計算・保存するサービス"""
+
+    def __init__(
+        self,
+        debounce_seconds: float = settings.BUFFETT_SCORE_DEBOUNCE_SECONDS,
+        min_peers: int = settings.BUFFETT_MIN_PEERS
+    ):
+        self.debounce_seconds = debounce_seconds
+        self.min_peers = max(1, min_peers)
+        self._lock = asyncio.Lock()
+        self._dirty = False
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # 統計情報
+        self.refreshes = 0
+        self.updated = 0
+
+    async def refresh(self) -> int:
+        """
+        全銘柄の事前スコアを一括計算し、入力が変わった銘柄だけを保存
+
+        バリュエーション・業種の成長性は保存済みのセクター・業種の中央値（peer_aggregates）と比較する。
+        全銘柄をまとめて計算し、銘柄の指標と比較に使った中央値の要約が前回の計算から変わった行だけを書き込む。
+
+        Returns:
+            更新した銘柄数
+        """
+        async with self._lock:
+            names, rows = await buffett_score_repository.get_inputs()
+            if not rows:
+                return 0
+
+            inputs = pd.DataFrame.from_records(rows, columns=names)
+            scores = await asyncio.to_thread(self.compute_frame, inputs, self.peer_medians())
+            changed = scores[scores["source_signature"].to_numpy() != inputs["stored_signature"].to_numpy()]
+
+            records = []
+            for values in changed.to_dict("records"):
+                row = {"stock_id": int(values["stock_id"]), "source_signature": values["source_signature"]}
+                for field in BUFFETT_SCORE_FIELDS:
+                    value = values[field]
+                    row[field] = None if value is None or not np.isfinite(value) else float(value)
+                records.append(row)
+
+            await buffett_score_repository.upsert_many(records)
+            self.refreshes += 1
+            self.updated += len(records)
+            logger.debug(f"Recomputed Buffett pre-scores for {len(records)} of {len(inputs)} stocks")
+            return len(records)
+
+    def schedule_refresh(self) -> None:
+        """
+        一定時間後に事前スコアを再計算する（待ち時間中の変更はまとめて1回で反映する）
+        """
+        self._dirty = True
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._delayed_refresh())
+
+    def on_peer_update(self, groups: Set[Tuple[str, str]]) -> None:
+        """
+        セクター・業種の分布の再集計後に呼び出され、事前スコアの再計算を予約する
+        """
+        if groups:
+            self.schedule_refresh()
+
+    def on_stock_write(self, stock_infos: List[Dict[str, Any]]) -> None:
+        """
+        株式情報の書き込み後に呼び出され、事前スコアの再計算を予約する
+        """
+        if stock_infos:
+            self.schedule_refresh()
+
+    async def _delayed_refresh(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(self.debounce_seconds)
+            self._dirty = False
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing Buffett pre-scores: {str(e)}")
+
+    async def stop(self) -> None:
+        """
+        予約済みの再計算を中止（次回起動時のrefreshで反映される）
+        """
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = None
+
+    def peer_medians(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """
+        業種内比較に使う保存済みのグループごとの中央値（同業種の銘柄数がmin_peers以上のもののみ）
+
+        Returns:
+            (group_type, 指標)をキーとした、グループ名ごとの中央値の辞書
+        """
+        return {
+            (group_type, metric): peer_aggregate_service.median_map(group_type, metric, self.min_peers)
+            for group_type in ("industry", "sector")
+            for metric in PEER_MEDIAN_METRICS
+        }
+
+    def compute_frame(
+        self,
+        inputs: pd.DataFrame,
+        peer_medians: Optional[Dict[Tuple[str, str], Dict[str, float]]] = None
+    ) -> pd.DataFrame:
+        """
+        スコア計算用の指標のテーブルから観点ごとのスコアと総合スコアを一括計算
+
+        Args:
+            inputs: BuffettScoreRepository.get_inputsの列を持つDataFrame（行は銘柄）
+            peer_medians: peer_mediansの出力（Noneの場合は現在の値を使う）
+
+        Returns:
+            stock_id, symbol, BUFFETT_SCORE_FIELDS, source_signatureを列に持つDataFrame（インデックスは入力と同じ）
+        """
+        values = {
+            column: pd.to_numeric(inputs[column], errors="coerce").astype(float)
+            for column in inputs.columns
+            if column not in ("stock_id", "symbol", "sector", "industry", "stored_signature")
+        }
+        scores = pd.DataFrame({"stock_id": inputs["stock_id"], "symbol": inputs["symbol"]}, index=inputs.index)
+
+        # 業種内比較に使う中央値（業種の銘柄数が不足する場合はセクター）
+        peer_medians = self.peer_medians() if peer_medians is None else peer_medians
+        pe_peer = self._peer_median(inputs, peer_medians, "pe_ratio")
+        pb_peer = self._peer_median(inputs, peer_medians, "pb_ratio")
+        revenue_cagr = values["revenue_cagr"].fillna(values["revenue_growth"])
+        industry_growth = self._peer_median(inputs, peer_medians, "revenue_cagr").fillna(
+            self._peer_median(inputs, peer_medians, "revenue_growth")
+        )
+
+        # 観点1: 競争優位性（複数年の平均を優先し、無い場合は直近の値）
+        scores["moat_score"] = self._mean([
+            self._curve("roe", values["roe_mean"].fillna(values["roe"])),
+            self._curve("operating_margin", values["operating_margin_mean"].fillna(values["operating_margin"])),
+            self._curve("gross_margin", values["gross_margin"]),
+        ])
+
+        # 観点2: バリュエーション（赤字・債務超過でPER・PBRが負の場合は0点）
+        scores["valuation_score"] = self._mean([
+            self._relative(values["pe_ratio"], pe_peer),
+            self._relative(values["pb_ratio"], pb_peer),
+            self._curve("peg_ratio", values["peg_ratio"].where(values["peg_ratio"] > 0)),
+        ])
+
+        # 観点4: 財務健全性（負債比率が負の場合は債務超過のため0点）
+        debt_to_equity = values["debt_to_equity"]
+        scores["financial_health_score"] = self._mean([
+            self._curve("debt_to_equity", debt_to_equity).where(~(debt_to_equity < 0), 0.0),
+            self._curve("current_ratio", values["current_ratio"]),
+            self._curve("quick_ratio", values["quick_ratio"]),
+        ])
+
+        # 観点5: キャッシュフロー生成能力
+        scores["cash_flow_score"] = self._mean([
+            self._curve("fcf_consistency", values["fcf_consistency"]),
+            self._curve("fcf_margin", values["fcf_margin_mean"]),
+            self._curve("net_margin_volatility", values["net_margin_volatility"]),
+        ])
+
+        # 観点6: 売上成長率
+        scores["revenue_growth_score"] = self._mean([
+            self._curve("revenue_cagr", revenue_cagr),
+            self._curve("revenue_growth_consistency", values["revenue_growth_consistency"]),
+        ])
+
+        # 観点7: 業種の成長性
+        scores["industry_growth_score"] = self._curve("industry_growth", industry_growth)
+
+        # 総合スコア（算出できた観点の重要度で加重平均し、0-100に換算）
+        columns = [column for _, column, _, _ in VIEWPOINTS if column]
+        weights = np.array([weight for _, column, weight, _ in VIEWPOINTS if column], dtype=float)
+        detailed = scores[columns].to_numpy()
+        available = ~np.isnan(detailed)
+        covered = available @ weights
+        totals = np.nan_to_num(detailed) @ weights
+        scores["pre_score"] = np.round(
+            np.divide(totals * 10, covered, out=np.full(len(scores), np.nan), where=covered > 0), 2
+        )
+        scores["coverage"] = covered / sum(weight for _, _, weight, _ in VIEWPOINTS)
+
+        # 入力の指標・業種内比較の中央値の要約（変更検知用）
+        signature_frame = pd.DataFrame(values, index=inputs.index).assign(
+            pe_peer=pe_peer, pb_peer=pb_peer, industry_growth=industry_growth
+        )
+        hashes = pd.util.hash_pandas_object(signature_frame, index=False).to_numpy()
+        scores["source_signature"] = [f"v{SCORE_VERSION}:{value:016x}" for value in hashes]
+        return scores
+
+    @staticmethod
+    def _peer_median(
+        inputs: pd.DataFrame,
+        peer_medians: Dict[Tuple[str, str], Dict[str, float]],
+        metric: str
+    ) -> pd.Series:
+        """
+        各銘柄の業種の中央値（業種の銘柄数が不足する場合はセクターの中央値）
+        """
+        result = pd.Series(np.nan, index=inputs.index)
+        for group_type in ("industry", "sector"):
+            medians = inputs[group_type].map(peer_medians.get((group_type, metric), {}))
+            result = result.fillna(pd.to_numeric(medians, errors="coerce"))
+        return result
+
+    @staticmethod
+    def _curve(name: str, values: pd.Series) -> pd.Series:
+        """
+        指標をSCORE_CURVESの折れ線で0-10の点数に変換（欠損はNaNのまま）
+        """
+        points, scores = SCORE_CURVES[name]
+        return pd.Series(np.interp(values.to_numpy(dtype=float), points, scores), index=values.index)
+
+    def _relative(self, values: pd.Series, peer: pd.Series) -> pd.Series:
+        """
+        業種の中央値に対する倍率を点数に変換（値が0以下の場合は0点）
+        """
+        relative = self._curve("relative_multiple", values.where(values > 0) / peer)
+        return relative.where(~(values <= 0), 0.0)
+
+    @staticmethod
+    def _mean(parts: List[pd.Series]) -> pd.Series:
+        """
+        欠損を除いた平均（全て欠損の場合はNaN）
+        """
+        return pd.concat(parts, axis=1).mean(axis=1, skipna=True)
+
+    async def get_score(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        銘柄の事前スコアを取得
+
+        Args:
+            symbol: 株式ティッカーシンボル
+
+        Returns:
+            事前スコアの辞書、未計算の場合はNone
+        """
+        stored = await buffett_score_repository.get_many([symbol])
+        data = stored.get(symbol.upper())
+        return self.format_score(data) if data else None
+
+    async def get_shortlist(
+        self,
+        min_score: Optional[float] = None,
+        min_coverage: Optional[float] = None,
+        sector: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        事前スコアの高い順に調査候補の一覧を取得
+
+        Args:
+            min_score: 最小の総合スコア（0-100）
+            min_coverage: 算出できた観点の重要度の合計の最小値（0-1）
+            sector: 対象のセクター
+            page: ページ番号
+            page_size: 1ページあたりの件数
+
+        Returns:
+            候補一覧のページ
+        """
+        results, total = await buffett_score_repository.get_ranked(
+            min_score,
+            min_coverage,
+            sector,
+            offset=(page - 1) * page_size,
+            limit=page_size
+        )
+        return {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size,
+            "results": [self.format_score(data) for data in results]
+        }
+
+    @staticmethod
+    def format_score(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        保存済みの事前スコアに観点ごとの評価（A/B/C）と投資判定を付ける
+        """
+        viewpoints = {}
+        for key, column, weight, label in VIEWPOINTS:
+            score = data.get(column) if column else None
+            viewpoints[key] = {
+                "label": label,
+                "weight": weight,
+                "score": round(score, 2) if score is not None else None,
+                "grade": None if score is None else "A" if score >= 7 else "B" if score >= 4 else "C"
+            }
+
+        pre_score = data.get("pre_score")
+        return {
+            "symbol": data["symbol"],
+            "name": data["name"],
+            "sector": data.get("sector"),
+            "industry": data.get("industry"),
+            "pre_score": pre_score,
+            "coverage": data.get("coverage") or 0.0,
+            "verdict": (
+                next(verdict for threshold, verdict in VERDICTS if pre_score >= threshold)
+                if pre_score is not None else None
+            ),
+            "viewpoints": viewpoints,
+            "last_updated": data["last_updated"]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        再計算の統計情報を取得
+        """
+        return {
+            "refreshes": self.refreshes,
+            "updated": self.updated,
+            "pending": self._dirty
+        }
+
+
+# サービスインスタンス
+buffett_score_service = BuffettScoreService()
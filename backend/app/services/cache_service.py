@@ -0,0 +1,273 @@
+"""
+キャッシュサービス - TTLとLRU退避を備えたプロセス内キャッシュ
+"""
+from typing import Optional, Dict, Any, Hashable, Callable, Awaitable, Set, Tuple
+from collections import OrderedDict
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """TTL付きLRUキャッシュ（同一キーの同時取得は1回にまとめる）"""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        stale_ttl_seconds: float = 0,
+        age_of: Optional[Callable[[Any], float]] = None
+    ):
+        """
+        Args:
+            ttl_seconds: エントリの有効期限（秒）
+            max_entries: 最大エントリ数
+            stale_ttl_seconds: 有効期限切れ後も期限切れの値として返せる猶予期間（秒）
+            age_of: 値の経過時間（秒）を返す関数（保存時点で既に古い値の期限計算に使用）
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.stale_ttl_seconds = max(0, stale_ttl_seconds)
+        self.age_of = age_of
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+
+        # 統計カウンタ
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        キャッシュから値を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            有効期限内の値、存在しない・期限切れの場合はNone
+        """
+        entry = self._lookup(key)
+        if entry is None or entry[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry[0]
+
+    def get_revalidating(
+        self,
+        key: Hashable,
+        refresher: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """
+        有効期限切れでも猶予期間内の値であれば返し、バックグラウンドで再取得を開始
+
+        Args:
+            key: キャッシュキー
+            refresher: 値を再取得するコルーチン関数
+
+        Returns:
+            有効期限内または猶予期間内の値、存在しない場合はNone
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, age = entry
+        if age > self.ttl_seconds:
+            self.stale_hits += 1
+            self.revalidate(key, refresher)
+        else:
+            self.hits += 1
+        return value
+
+    async def get_or_revalidate(
+        self,
+        key: Hashable,
+        fetcher: Callable[[], Awaitable[Optional[Any]]],
+        refresher: Optional[Callable[[], Awaitable[Optional[Any]]]] = None
+    ) -> Optional[Any]:
+        """
+        stale-while-revalidateでキャッシュから値を取得
+
+        猶予期間内の期限切れの値は即座に返して再取得をバックグラウンドで1回だけ行い、
+        猶予期間も過ぎている場合はget_or_fetchと同じく取得完了を待つ。
+
+        Args:
+            key: キャッシュキー
+            fetcher: 値が無い場合に取得するコルーチン関数
+            refresher: バックグラウンドで再取得するコルーチン関数（Noneの場合はfetcher）
+
+        Returns:
+            取得した値、取得失敗時はNone
+        """
+        refresher = refresher or fetcher
+        value = self.get_revalidating(key, refresher)
+        if value is not None:
+            return value
+
+        value = await self._join_or_fetch(key, fetcher)
+
+        # fetcherが期限切れの値を返した場合（保存済みの古いデータ等）も再取得しておく
+        entry = self._lookup(key)
+        if entry is not None and entry[1] > self.ttl_seconds:
+            self.revalidate(key, refresher)
+        return value
+
+    def revalidate(
+        self,
+        key: Hashable,
+        refresher: Callable[[], Awaitable[Optional[Any]]]
+    ) -> None:
+        """
+        バックグラウンドで値を再取得（同じキーの取得が進行中の場合は何もしない）
+        """
+        if key in self._inflight:
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.revalidations += 1
+
+        async def run() -> None:
+            try:
+                await self._fetch_into(key, refresher, future)
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.warning(f"Background revalidation failed for {key}: {str(e)}")
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        キャッシュに値を保存（上限を超えた場合は最も古く使われたエントリを退避）
+        """
+        age = max(0.0, self.age_of(value)) if self.age_of else 0.0
+        self._entries[key] = (value, time.monotonic() - age)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """指定キーのエントリを削除"""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        self._entries.clear()
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetcher: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """
+        キャッシュから値を取得し、存在しなければfetcherで取得して保存
+
+        同じキーの取得が進行中の場合は、その結果を待って共有する。
+        fetcherがNoneを返した場合はキャッシュしない。
+
+        Args:
+            key: キャッシュキー
+            fetcher: 値を取得するコルーチン関数
+
+        Returns:
+            取得した値、取得失敗時はNone
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        return await self._join_or_fetch(key, fetcher)
+
+    async def _join_or_fetch(
+        self,
+        key: Hashable,
+        fetcher: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """
+        進行中の取得があれば結果を待って共有し、無ければfetcherで取得する
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return await self._fetch_into(key, fetcher, future)
+
+    async def _fetch_into(
+        self,
+        key: Hashable,
+        fetcher: Callable[[], Awaitable[Optional[Any]]],
+        future: asyncio.Future
+    ) -> Optional[Any]:
+        """
+        fetcherで値を取得して保存し、進行中の取得を待つ呼び出しに結果を共有する
+        """
+        try:
+            value = await fetcher()
+            if value is not None:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 待機者がいない場合に「未取得の例外」警告を出さないようにする
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """
+        猶予期間内のエントリを(値, 経過秒数)で取得（猶予期間を過ぎたエントリは削除）
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, stored_at = entry
+        age = time.monotonic() - stored_at
+        if age > self.ttl_seconds + self.stale_ttl_seconds:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value, age
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得
+        """
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_ttl_seconds": self.stale_ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "stale_hits": self.stale_hits,
+            "revalidations": self.revalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
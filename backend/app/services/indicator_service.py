@@ -0,0 +1,579 @@
+"""
+テクニカル指標サービス - 保存済みの株価履歴から移動平均・RSI・ボラティリティなどを計算する
+"""
+from typing import Optional, Dict, Any, List, Tuple
+from bisect import bisect_left
+from datetime import datetime
+import asyncio
+import itertools
+import logging
+
+import numpy as np
+
+from app.config import settings
+from app.services.cache_service import TTLCache
+from app.services.yahoo_finance_service import yahoo_finance_service
+
+logger = logging.getLogger(__name__)
+
+# 指標ごとの既定の期間（営業日数）
+INDICATOR_WINDOWS = {
+    "sma": 20,
+    "ema": 20,
+    "rsi": 14,
+    "volatility": 20,
+    "max_drawdown": 252,
+    "range_position": 252
+}
+
+# 指標の指定が無い場合に計算する指標
+DEFAULT_INDICATORS = [
+    ("sma", 20), ("sma", 50), ("sma", 200), ("ema", 20), ("rsi", 14),
+    ("volatility", 20), ("max_drawdown", 252), ("range_position", 252)
+]
+
+# 直前の値から漸化式で更新する指標（それ以外は直近の期間だけで計算できる）
+RECURSIVE_INDICATORS = {"ema", "rsi"}
+
+# ボラティリティの年率換算に使う年間の営業日数
+TRADING_DAYS_PER_YEAR = 252
+
+IndicatorSpec = Tuple[str, int]
+
+
+class _PriceTail:
+    """
+    銘柄ごとの直近の株価（期間の指標の計算に必要な本数だけ保持する）
+
+    versionは内容が変わるたびに全銘柄で一意な値に更新し、計算済みの指標が
+    最新の株価に対するものかの判定に使う。baseは足を追記した場合は引き継ぎ、
+    作り直した場合（分割・配当で過去の株価が調整し直された場合を含む）に更新する。
+    """
+
+    def __init__(
+        self,
+        dates: List[str],
+        close: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        version: int,
+        base: Optional[int] = None
+    ):
+        self.dates = dates
+        self.close = close
+        self.high = high
+        self.low = low
+        self.version = version
+        self.base = version if base is None else base
+
+
+class _IndicatorState:
+    """
+    銘柄・指標・期間ごとの計算結果
+
+    漸化式で更新する指標は、最後から2本目の足までを反映した状態（settled）を保持する。
+    最新の足は値が確定するまで上書きされることがあるため、更新時は確定済みの状態から
+    それ以降の足を反映し直す。
+    """
+
+    def __init__(
+        self,
+        value: Optional[float],
+        version: int,
+        settled_date: Optional[str] = None,
+        settled: Optional[np.ndarray] = None,
+        base: Optional[int] = None
+    ):
+        self.value = value
+        self.version = version
+        self.settled_date = settled_date
+        self.settled = settled
+        self.base = base
+
+
+class IndicatorService:
+    """保存済みの株価履歴からテクニカル指標を計算するサービス"""
+
+    def __init__(
+        self,
+        history_period: str = settings.INDICATOR_HISTORY_PERIOD,
+        max_window: int = settings.INDICATOR_MAX_WINDOW
+    ):
+        self.history_period = history_period
+        self.max_window = max(2, max_window)
+        # 銘柄ごとの直近の株価
+        self.tails = TTLCache(
+            ttl_seconds=settings.CACHE_EXPIRY_MINUTES * 60,
+            max_entries=settings.CACHE_MAX_ENTRIES
+        )
+        # (銘柄, 指標, 期間)ごとの計算結果
+        self.cache = TTLCache(
+            ttl_seconds=settings.CACHE_EXPIRY_MINUTES * 60,
+            max_entries=settings.CACHE_MAX_ENTRIES * len(DEFAULT_INDICATORS)
+        )
+        self._versions = itertools.count(1)
+
+        # 統計情報
+        self.computed = 0
+        self.incremental = 0
+
+    def parse_indicators(self, indicators: Optional[str]) -> List[IndicatorSpec]:
+        """
+        カンマ区切りの指標の指定（例: sma:50,rsi:14,volatility）を解析
+
+        Args:
+            indicators: 指標の指定（Noneまたは空の場合は既定の指標）
+
+        Returns:
+            (指標名, 期間)のリスト
+
+        Raises:
+            ValueError: 未対応の指標または範囲外の期間が指定された場合
+        """
+        if not indicators or not indicators.strip():
+            return list(DEFAULT_INDICATORS)
+
+        specs = []
+        for token in indicators.split(","):
+            token = token.strip().lower()
+            if not token:
+                continue
+            name, _, window = token.partition(":")
+            if name not in INDICATOR_WINDOWS:
+                raise ValueError(
+                    f"未対応の指標です: {name}。対応している指標: {', '.join(INDICATOR_WINDOWS)}"
+                )
+            try:
+                window = int(window) if window else INDICATOR_WINDOWS[name]
+            except ValueError:
+                raise ValueError(f"期間は整数で指定してください: {token}")
+            if not 2 <= window <= self.max_window:
+                raise ValueError(f"期間は2から{self.max_window}の範囲で指定してください: {token}")
+            specs.append((name, window))
+        return list(dict.fromkeys(specs))
+
+    async def get_indicators(
+        self,
+        symbol: str,
+        specs: Optional[List[IndicatorSpec]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        銘柄のテクニカル指標を取得
+
+        Args:
+            symbol: 株式ティッカーシンボル
+            specs: (指標名, 期間)のリスト（Noneの場合は既定の指標）
+
+        Returns:
+            最新の終値と指標の辞書、株価履歴が無い場合はNone
+        """
+        results, _ = await self.get_indicators_many([symbol], specs)
+        return results.get(symbol.upper())
+
+    async def get_indicators_many(
+        self,
+        symbols: List[str],
+        specs: Optional[List[IndicatorSpec]] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """
+        複数銘柄のテクニカル指標をまとめて取得
+
+        株価履歴はyahoo_finance_serviceのキャッシュ・株価ストアを経由して取得し、
+        前回から増えた（または上書きされた）足だけを反映する。未計算・更新が必要な
+        指標は銘柄を行とした2次元配列で一括計算する。
+
+        Args:
+            symbols: 株式ティッカーシンボルのリスト
+            specs: (指標名, 期間)のリスト（Noneの場合は既定の指標）
+
+        Returns:
+            (シンボルをキーとした指標の辞書, 取得できなかったシンボルとエラーメッセージ)
+        """
+        specs = specs or list(DEFAULT_INDICATORS)
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+
+        histories = await asyncio.gather(
+            *(
+                yahoo_finance_service.get_historical_data(symbol, self.history_period, columnar=True)
+                for symbol in symbols
+            ),
+            return_exceptions=True
+        )
+
+        columns: Dict[str, Dict[str, List[Any]]] = {}
+        tails: Dict[str, _PriceTail] = {}
+        errors: Dict[str, str] = {}
+        for symbol, history in zip(symbols, histories):
+            if isinstance(history, Exception):
+                logger.error(f"Error fetching history for indicators of {symbol}: {str(history)}")
+                history = None
+            if not history or not history["data"]["Date"]:
+                errors[symbol] = f"株式 '{symbol}' の履歴データが見つかりません"
+                continue
+            columns[symbol] = history["data"]
+            tails[symbol] = self._sync_tail(symbol, history["data"])
+
+        values: Dict[str, Dict[str, Optional[float]]] = {symbol: {} for symbol in tails}
+        for spec in specs:
+            stale = []
+            for symbol, tail in tails.items():
+                state = self.cache.get((symbol,) + spec)
+                if state is not None and state.version == tail.version:
+                    values[symbol][self._key(spec)] = state.value
+                elif state is not None and spec[0] in RECURSIVE_INDICATORS and self._advance(state, spec, tail):
+                    values[symbol][self._key(spec)] = state.value
+                else:
+                    stale.append(symbol)
+
+            if stale:
+                self._compute(spec, stale, tails, columns, values)
+
+        results = {}
+        for symbol, tail in tails.items():
+            results[symbol] = {
+                "symbol": symbol,
+                "as_of": tail.dates[-1],
+                "close": _float(tail.close[-1]),
+                "indicators": values[symbol],
+                "last_updated": datetime.now().isoformat()
+            }
+        return results, errors
+
+    def _sync_tail(self, symbol: str, data: Dict[str, List[Any]]) -> _PriceTail:
+        """
+        取得した株価履歴のうち、保持している直近の株価より新しい足だけを反映
+        """
+        dates = data["Date"]
+        tail = self.tails.get(symbol)
+        if tail is not None and dates[-1] == tail.dates[-1] and _same(data["Close"][-1], tail.close[-1]):
+            return tail
+
+        size = self.max_window + 1
+        if tail is None or dates[-1] < tail.dates[-1] or self._rebased(tail, data):
+            start = max(0, len(dates) - size)
+            tail = _PriceTail(
+                list(dates[start:]),
+                _array(data["Close"][start:]),
+                _array(data["High"][start:]),
+                _array(data["Low"][start:]),
+                next(self._versions)
+            )
+        else:
+            # 保持している最後の足（上書きされている可能性がある）以降を置き換える
+            keep = bisect_left(tail.dates, tail.dates[-1])
+            start = bisect_left(dates, tail.dates[-1])
+            tail = _PriceTail(
+                (tail.dates[:keep] + list(dates[start:]))[-size:],
+                np.concatenate([tail.close[:keep], _array(data["Close"][start:])])[-size:],
+                np.concatenate([tail.high[:keep], _array(data["High"][start:])])[-size:],
+                np.concatenate([tail.low[:keep], _array(data["Low"][start:])])[-size:],
+                next(self._versions),
+                tail.base
+            )
+
+        self.tails.set(symbol, tail)
+        return tail
+
+    @staticmethod
+    def _rebased(tail: _PriceTail, data: Dict[str, List[Any]]) -> bool:
+        """
+        保持している確定済みの足の終値が取得した株価履歴と異なるか（分割・配当で調整し直された場合）
+        """
+        if len(tail.dates) < 2:
+            return False
+        index = bisect_left(data["Date"], tail.dates[-2])
+        if index >= len(data["Date"]) or data["Date"][index] != tail.dates[-2]:
+            return False
+        return not _same(data["Close"][index], tail.close[-2])
+
+    def _advance(self, state: _IndicatorState, spec: IndicatorSpec, tail: _PriceTail) -> bool:
+        """
+        漸化式で更新する指標に確定済みの状態以降の足を反映（反映できない場合はFalse）
+        """
+        if state.base != tail.base or state.settled is None or not np.all(np.isfinite(state.settled)):
+            return False
+        index = bisect_left(tail.dates, state.settled_date)
+        if index >= len(tail.dates) - 1 or tail.dates[index] != state.settled_date:
+            return False
+
+        name, window = spec
+        close = tail.close[index:]
+        if name == "ema":
+            settled = _ema_step(state.settled, close[1:-1], 2.0 / (window + 1))
+            value = _ema_step(settled, close[-1:], 2.0 / (window + 1))
+            result = value[0]
+        else:
+            # 状態は[平均上昇幅, 平均下落幅, 最後の終値]
+            settled = _rsi_step(state.settled, close[1:-1], window)
+            value = _rsi_step(settled, close[-1:], window)
+            result = _rsi_value(value[0], value[1])
+
+        state.value = _float(result)
+        state.version = tail.version
+        state.settled_date = tail.dates[-2]
+        state.settled = settled
+        self.incremental += 1
+        return True
+
+    def _compute(
+        self,
+        spec: IndicatorSpec,
+        symbols: List[str],
+        tails: Dict[str, _PriceTail],
+        columns: Dict[str, Dict[str, List[Any]]],
+        values: Dict[str, Dict[str, Optional[float]]]
+    ) -> None:
+        """
+        複数銘柄の指標を2次元配列（行: 銘柄, 列: 日付）で一括計算してキャッシュに保存
+        """
+        name, window = spec
+        key = self._key(spec)
+
+        if name in RECURSIVE_INDICATORS:
+            # 漸化式で更新する指標は取得した全期間から計算する
+            close = _stack([_array(columns[symbol]["Close"]) for symbol in symbols])
+            if name == "ema":
+                settled = _ema_matrix(close[:, :-1], window)
+                latest = _ema_step_matrix(settled, close[:, -1], 2.0 / (window + 1))
+                results = latest
+            else:
+                settled = _rsi_matrix(close[:, :-1], window)
+                latest = _rsi_step_matrix(settled, close[:, -1], window)
+                results = _rsi_value(latest[:, 0], latest[:, 1])
+
+            for row, symbol in enumerate(symbols):
+                tail = tails[symbol]
+                value = _float(results[row])
+                settled_date = tail.dates[-2] if len(tail.dates) > 1 else None
+                state = _IndicatorState(
+                    value, tail.version, settled_date, np.atleast_1d(settled[row]).copy(), tail.base
+                )
+                self.cache.set((symbol,) + spec, state)
+                values[symbol][key] = value
+        else:
+            close = _stack([tails[symbol].close for symbol in symbols])
+            if name == "sma":
+                results = _sma(close, window)
+            elif name == "volatility":
+                results = _volatility(close, window)
+            elif name == "max_drawdown":
+                results = _max_drawdown(close, window)
+            else:
+                high = _stack([tails[symbol].high for symbol in symbols])
+                low = _stack([tails[symbol].low for symbol in symbols])
+                results = _range_position(close, high, low, window)
+
+            for row, symbol in enumerate(symbols):
+                value = _float(results[row])
+                self.cache.set((symbol,) + spec, _IndicatorState(value, tails[symbol].version))
+                values[symbol][key] = value
+
+        self.computed += len(symbols)
+
+    @staticmethod
+    def _key(spec: IndicatorSpec) -> str:
+        return f"{spec[0]}_{spec[1]}"
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        指標の計算回数とキャッシュの統計情報を取得
+        """
+        return {
+            "computed": self.computed,
+            "incremental": self.incremental,
+            "tails": self.tails.stats()["entries"],
+            "cache": self.cache.stats()
+        }
+
+
+def _array(values: List[Any]) -> np.ndarray:
+    return np.array(values, dtype=float)
+
+
+def _stack(arrays: List[np.ndarray]) -> np.ndarray:
+    """
+    長さの異なる配列を右詰め（先頭をNaNで埋めて）で2次元配列にする
+    """
+    width = max(len(array) for array in arrays)
+    matrix = np.full((len(arrays), width), np.nan)
+    for row, array in enumerate(arrays):
+        if len(array):
+            matrix[row, width - len(array):] = array
+    return matrix
+
+
+def _first_valid(matrix: np.ndarray) -> np.ndarray:
+    """
+    行ごとの最初の有効な値の列番号（有効な値が無い行は列数）
+    """
+    valid = np.isfinite(matrix)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), matrix.shape[1])
+
+
+def _sma(close: np.ndarray, window: int) -> np.ndarray:
+    recent = close[:, -window:]
+    if recent.shape[1] < window:
+        return np.full(len(close), np.nan)
+    return recent.mean(axis=1)
+
+
+def _volatility(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    直近window日の対数収益率の標準偏差（年率換算）
+    """
+    recent = close[:, -(window + 1):]
+    if recent.shape[1] < window + 1:
+        return np.full(len(close), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(recent), axis=1)
+    return returns.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+def _max_drawdown(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    直近window日の最大下落率（高値からの下落幅の最大値。負の値）
+    """
+    recent = close[:, -window:]
+    peaks = np.fmax.accumulate(recent, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdowns = recent / peaks - 1.0
+    enough = np.isfinite(recent).sum(axis=1) >= 2
+    drawdowns[~np.isfinite(drawdowns)] = np.inf
+    return np.where(enough, drawdowns.min(axis=1), np.nan)
+
+
+def _range_position(close: np.ndarray, high: np.ndarray, low: np.ndarray, window: int) -> np.ndarray:
+    """
+    直近window日の安値を0、高値を1としたときの最新の終値の位置
+    """
+    highest = np.nanmax(high[:, -window:], axis=1)
+    lowest = np.nanmin(low[:, -window:], axis=1)
+    span = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        position = (close[:, -1] - lowest) / span
+    return np.where(span > 0, np.clip(position, 0.0, 1.0), np.nan)
+
+
+def _ema_matrix(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    行ごとの指数移動平均（最初の有効な終値を初期値とする）を重みの内積で一括計算
+
+    e_t = a * x_t + (1 - a) * e_(t-1) を展開すると、最後の値は各終値に
+    a * (1 - a)^(T-1-t)（初期値は(1 - a)^(T-1-s)）を掛けた和になる。
+    """
+    rows, width = close.shape
+    if width == 0:
+        return np.full(rows, np.nan)
+    alpha = 2.0 / (window + 1)
+    start = _first_valid(close)
+    columns = np.arange(width)
+    decay = (1.0 - alpha) ** (width - 1 - columns)
+    weights = np.where(columns > start[:, None], alpha * decay, 0.0)
+    seed = columns == start[:, None]
+    weights = np.where(seed, decay, weights)
+    result = (np.nan_to_num(close) * weights).sum(axis=1)
+    return np.where(start < width, result, np.nan)
+
+
+def _ema_step(state: np.ndarray, close: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    指数移動平均に新しい終値を反映（stateは[値]）
+    """
+    value = state[0]
+    if len(close):
+        decay = (1.0 - alpha) ** np.arange(len(close) - 1, -1, -1)
+        value = (1.0 - alpha) ** len(close) * value + (alpha * decay * close).sum()
+    return np.array([value])
+
+
+def _ema_step_matrix(settled: np.ndarray, close: np.ndarray, alpha: float) -> np.ndarray:
+    return np.where(np.isfinite(settled), alpha * close + (1.0 - alpha) * settled, close)
+
+
+def _rsi_matrix(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    行ごとのWilder方式の平均上昇幅・平均下落幅を重みの内積で一括計算
+
+    最初のwindow本の変化幅の単純平均を初期値とし、以降は1/windowで平滑化する。
+
+    Returns:
+        行ごとの[平均上昇幅, 平均下落幅, 最後の終値]（変化幅が足りない行はNaN）
+    """
+    rows, width = close.shape
+    result = np.full((rows, 3), np.nan)
+    if width < 2:
+        return result
+
+    alpha = 1.0 / window
+    changes = np.diff(close, axis=1)
+    gains = np.nan_to_num(np.clip(changes, 0.0, None))
+    losses = np.nan_to_num(np.clip(-changes, 0.0, None))
+
+    # 変化幅の列番号kは終値k+1との差。行ごとに最初の変化幅の列番号をsとする
+    start = _first_valid(close)
+    count = changes.shape[1]
+    columns = np.arange(count)
+    offset = columns - start[:, None]
+    seeded = (offset >= 0) & (offset < window)
+    smoothed = offset >= window
+    # 初期値以降の平滑化の回数
+    steps = np.maximum(count - start - window, 0)[:, None]
+    weights = np.where(seeded, (1.0 - alpha) ** steps / window, 0.0)
+    weights = np.where(smoothed, alpha * (1.0 - alpha) ** (count - 1 - columns), weights)
+
+    enough = count - start >= window
+    result[:, 0] = np.where(enough, (gains * weights).sum(axis=1), np.nan)
+    result[:, 1] = np.where(enough, (losses * weights).sum(axis=1), np.nan)
+    result[:, 2] = close[:, -1]
+    return result
+
+
+def _rsi_step(state: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    """
+    平均上昇幅・平均下落幅に新しい終値を反映（stateは[平均上昇幅, 平均下落幅, 最後の終値]）
+    """
+    if not len(close):
+        return state
+    alpha = 1.0 / window
+    changes = np.diff(np.concatenate([[state[2]], close]))
+    decay = alpha * (1.0 - alpha) ** np.arange(len(changes) - 1, -1, -1)
+    carry = (1.0 - alpha) ** len(changes)
+    gain = carry * state[0] + (decay * np.clip(changes, 0.0, None)).sum()
+    loss = carry * state[1] + (decay * np.clip(-changes, 0.0, None)).sum()
+    return np.array([gain, loss, close[-1]])
+
+
+def _rsi_step_matrix(settled: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    alpha = 1.0 / window
+    changes = close - settled[:, 2]
+    latest = np.empty_like(settled)
+    latest[:, 0] = (1.0 - alpha) * settled[:, 0] + alpha * np.clip(changes, 0.0, None)
+    latest[:, 1] = (1.0 - alpha) * settled[:, 1] + alpha * np.clip(-changes, 0.0, None)
+    latest[:, 2] = close
+    return latest
+
+
+def _rsi_value(gain, loss):
+    """
+    平均上昇幅・平均下落幅からRSI（0-100）を計算
+    """
+    gain = np.asarray(gain, dtype=float)
+    loss = np.asarray(loss, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+    return np.where(loss == 0, np.where(gain > 0, 100.0, 50.0), rsi)
+
+
+def _same(value: Any, current: float) -> bool:
+    if value is None:
+        return not np.isfinite(current)
+    return float(value) == current
+
+
+def _float(value: Any) -> Optional[float]:
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+# サービスインスタンス
+indicator_service = IndicatorService()
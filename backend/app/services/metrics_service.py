@@ -0,0 +1,236 @@
+"""
+メトリクスサービス - リクエスト・データソース呼び出し・データベースの処理時間を集計し、Prometheusのテキスト形式で出力する
+"""
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterable
+import bisect
+import math
+import threading
+import time
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# 処理時間のヒストグラムの境界（秒）
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class Counter:
+    """ラベルごとに値を加算するカウンタ"""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """ラベルごとに観測値の分布（累積バケット・合計・件数）を集計するヒストグラム"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # ラベルごとの [バケットごとの件数..., +Infの件数], 合計, 件数
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0, 0])
+                self._series[label_values] = series
+            series[0][index] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, (list(counts), list(totals))) for key, (counts, totals) in self._series.items())
+        for label_values, (counts, (total, count)) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labels + ('le',), label_values + (le,))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    メトリクスの登録と出力
+
+    カウンタ・ヒストグラムは処理のたびに更新し、キャッシュのヒット率など
+    他のサービスが保持している値は出力時に登録済みの関数から読み取る（ゲージ）。
+    """
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._gauges: List[Tuple[str, str, Tuple[str, ...], Callable[[], Dict[LabelValues, float]]]] = []
+
+        self.http_requests = self.counter(
+            "http_requests_total", "Number of HTTP requests", ("method", "route", "status")
+        )
+        self.http_request_duration = self.histogram(
+            "http_request_duration_seconds", "HTTP request latency until the response starts", ("method", "route")
+        )
+        self.upstream_calls = self.counter(
+            "upstream_calls_total", "Number of Yahoo Finance calls", ("method", "outcome")
+        )
+        self.upstream_duration = self.histogram(
+            "upstream_call_duration_seconds", "Yahoo Finance call duration in the executor", ("method",)
+        )
+        self.upstream_rate_limit_wait = self.histogram(
+            "upstream_rate_limit_wait_seconds", "Time spent waiting for a rate limit token", ("method",)
+        )
+        self.executor_queue_wait = self.histogram(
+            "executor_queue_wait_seconds", "Time a Yahoo Finance call waited for a free executor thread", ("method",)
+        )
+        self.db_queries = self.counter(
+            "db_queries_total", "Number of SQL statements executed", ("operation",)
+        )
+        self.db_query_duration = self.histogram(
+            "db_query_duration_seconds", "SQL statement execution time", ("operation",)
+        )
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Histogram:
+        metric = Histogram(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str],
+        collect: Callable[[], Dict[LabelValues, float]]
+    ) -> None:
+        """
+        出力時に値を読み取るゲージを登録
+
+        Args:
+            name: メトリクス名
+            documentation: 説明
+            labels: ラベル名
+            collect: ラベル値をキー、現在値を値とした辞書を返す関数
+        """
+        self._gauges.append((name, documentation, tuple(labels), collect))
+
+    def render(self) -> str:
+        """
+        全メトリクスをPrometheusのテキスト形式で出力
+        """
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        for name, documentation, labels, collect in self._gauges:
+            try:
+                values = collect()
+            except Exception as e:
+                logger.error(f"Error collecting metric {name}: {str(e)}")
+                continue
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            for label_values, value in sorted(values.items()):
+                if value is None:
+                    continue
+                lines.append(f"{name}{_labels(labels, label_values)} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def instrument_engine(self, engine: Engine) -> None:
+        """
+        データベースエンジンにSQLの実行時間の計測を登録
+
+        Args:
+            engine: SQLAlchemyのエンジン
+        """
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["metrics_query_start"].pop()
+            operation = _operation(statement)
+            self.db_queries.inc(operation)
+            self.db_query_duration.observe(time.perf_counter() - started, operation)
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(context):
+            starts = context.connection.info.get("metrics_query_start") if context.connection else None
+            if starts:
+                starts.pop()
+
+
+def _operation(statement: str) -> str:
+    """
+    SQL文の種類（SELECT / INSERT / UPDATE / DELETE など）
+    """
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def _labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: Optional[float]) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# メトリクスインスタンス
+metrics = MetricsRegistry()
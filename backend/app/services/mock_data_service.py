@@ -3,8 +3,8 @@
 開発・テスト目的で使用
 """
 from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
-import random
+from datetime import datetime, timedelta, date
+import numpy as np
 
 
 class MockDataService:
@@ -237,32 +237,38 @@ class MockDataService:
             return {
                 "symbol": symbol.upper(),
                 "financials": {
-                    "2023": {"Revenue": 383285000000, "NetIncome": 96995000000},
-                    "2022": {"Revenue": 394328000000, "NetIncome": 99803000000},
-                    "2021": {"Revenue": 365817000000, "NetIncome": 94680000000}
+                    "2023-09-30": {"Revenue": 383285000000, "NetIncome": 96995000000},
+                    "2022-09-30": {"Revenue": 394328000000, "NetIncome": 99803000000},
+                    "2021-09-30": {"Revenue": 365817000000, "NetIncome": 94680000000}
                 },
                 "balance_sheet": {
-                    "2023": {"TotalAssets": 352755000000, "TotalDebt": 123930000000},
-                    "2022": {"TotalAssets": 352583000000, "TotalDebt": 120069000000}
+                    "2023-09-30": {"TotalAssets": 352755000000, "TotalDebt": 123930000000},
+                    "2022-09-30": {"TotalAssets": 352583000000, "TotalDebt": 120069000000}
                 },
                 "cashflow": {
-                    "2023": {"OperatingCashFlow": 110543000000, "FreeCashFlow": 84726000000},
-                    "2022": {"OperatingCashFlow": 122151000000, "FreeCashFlow": 111443000000}
+                    "2023-09-30": {"OperatingCashFlow": 110543000000, "FreeCashFlow": 84726000000},
+                    "2022-09-30": {"OperatingCashFlow": 122151000000, "FreeCashFlow": 111443000000}
                 },
                 "last_updated": datetime.now().isoformat()
             }
         return None
     
-    def get_historical_data(self, symbol: str, period: str = "1y") -> Optional[Dict[str, Any]]:
+    def get_historical_data(
+        self,
+        symbol: str,
+        period: str = "1y",
+        start: Optional[date] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         モック履歴データを取得
         
         Args:
             symbol: 株式ティッカーシンボル
             period: 取得期間
+            start: この日付から今日までを生成（指定時はperiodより優先）
             
         Returns:
-            履歴データの辞書、存在しない場合はNone
+            列形式（Date/Open/High/Low/Close/Volumeの配列）の履歴データの辞書、存在しない場合はNone
         """
         if symbol.upper() not in self.mock_stocks:
             return None
@@ -273,29 +279,26 @@ class MockDataService:
         # 期間に応じた日数を決定
         period_days = {
             "1d": 1, "5d": 5, "1mo": 30, "3mo": 90,
-            "6mo": 180, "1y": 365, "2y": 730, "5y": 1825
+            "6mo": 180, "1y": 365, "2y": 730, "5y": 1825,
+            "10y": 3650, "max": 3650,
+            "ytd": (date.today() - date(date.today().year, 1, 1)).days + 1
         }.get(period, 365)
+        if start is not None:
+            period_days = max(1, (date.today() - start).days + 1)
         
-        # モック履歴データを生成
-        data = []
-        current_date = datetime.now() - timedelta(days=period_days)
-        current_price = base_price * 0.9  # 開始価格
+        # モック履歴データを列ごとに生成（ランダムな価格変動の累積積）
+        start_date = date.today() - timedelta(days=period_days - 1)
+        changes = np.random.uniform(-0.05, 0.05, period_days)
+        close = base_price * 0.9 * np.cumprod(1 + changes)  # 開始価格から変動
         
-        for i in range(period_days):
-            # ランダムな価格変動を生成
-            change = random.uniform(-0.05, 0.05)
-            current_price = current_price * (1 + change)
-            
-            data.append({
-                "Date": current_date.isoformat(),
-                "Open": round(current_price * 0.998, 2),
-                "High": round(current_price * 1.002, 2),
-                "Low": round(current_price * 0.996, 2),
-                "Close": round(current_price, 2),
-                "Volume": random.randint(20000000, 80000000)
-            })
-            
-            current_date += timedelta(days=1)
+        data = {
+            "Date": [(start_date + timedelta(days=i)).isoformat() for i in range(period_days)],
+            "Open": np.round(close * 0.998, 2).tolist(),
+            "High": np.round(close * 1.002, 2).tolist(),
+            "Low": np.round(close * 0.996, 2).tolist(),
+            "Close": np.round(close, 2).tolist(),
+            "Volume": np.random.randint(20000000, 80000001, period_days).tolist()
+        }
         
         return {
             "symbol": symbol.upper(),
@@ -0,0 +1,313 @@
+"""
+業種内比較サービス - セクター・業種ごとの指標の分布（件数・四分位数）を保存し、
+銘柄の書き込みに合わせて所属するグループだけを再集計する
+"""
+from typing import Optional, Dict, Any, List, Iterable, Set, Tuple, Callable
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.repositories.peer_repository import peer_repository, PEER_METRICS, PEER_TREND_METRICS, PEER_GROUP_TYPES
+
+logger = logging.getLogger(__name__)
+
+# 正の値のみを有効とする倍率指標（赤字・債務超過の銘柄は分布から除く）
+POSITIVE_METRICS = {"pe_ratio", "pb_ratio", "peg_ratio"}
+
+# 集計する分布の列
+STAT_FIELDS = ["count", "q1", "median", "q3"]
+
+# グループとして扱わない名前（株式情報の整形時の既定値を含む）
+MISSING_GROUP_NAMES = {"", "N/A"}
+
+Group = Tuple[str, str]
+
+
+class PeerAggregateService:
+    """セクター・業種ごとの指標の分布を管理するサービス"""
+
+    def __init__(
+        self,
+        min_count: int = settings.PEER_MIN_COUNT,
+        retry_seconds: float = settings.PEER_RETRY_SECONDS
+    ):
+        self.min_count = max(1, min_count)
+        self.retry_seconds = retry_seconds
+        # (group_type, group_name) -> 指標 -> 分布
+        self._stats: Dict[Group, Dict[str, Dict[str, Any]]] = {}
+        # シンボル -> (セクター, 業種)（所属グループが変わった銘柄の旧グループを再集計するため）
+        self._membership: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._dirty: Set[Group] = set()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[Set[Group]], None]] = []
+
+        # 統計情報
+        self.refreshes = 0
+        self.groups_refreshed = 0
+        self.failures = 0
+
+    def add_listener(self, listener: Callable[[Set[Group]], None]) -> None:
+        """
+        再集計の完了時に呼び出す関数を登録（再集計したグループの集合を受け取る）
+        """
+        self._listeners.append(listener)
+
+    async def rebuild(self) -> int:
+        """
+        全銘柄から全グループの分布を集計し直して保存
+
+        Returns:
+            集計したグループ数
+        """
+        names, rows = await peer_repository.get_members()
+        members = pd.DataFrame.from_records(rows, columns=names)
+        aggregates = await asyncio.to_thread(self.compute_frame, members)
+        records = aggregates.to_dict("records")
+        await peer_repository.replace_groups(None, records)
+
+        self._membership = {
+            symbol: (sector, industry)
+            for symbol, sector, industry in zip(members["symbol"], members["sector"], members["industry"])
+        }
+        self._stats = {}
+        self._apply(records)
+        return len(self._stats)
+
+    async def refresh_groups(self, groups: Iterable[Group]) -> Set[Group]:
+        """
+        指定したグループの分布だけを所属銘柄から集計し直して保存
+
+        Args:
+            groups: 再集計する(group_type, group_name)のリスト
+
+        Returns:
+            再集計したグループの集合
+        """
+        groups = {(group_type, name) for group_type, name in groups if name and name not in MISSING_GROUP_NAMES}
+        if not groups:
+            return set()
+
+        names, rows = await peer_repository.get_members(
+            sectors=[name for group_type, name in groups if group_type == "sector"],
+            industries=[name for group_type, name in groups if group_type == "industry"]
+        )
+        members = pd.DataFrame.from_records(rows, columns=names)
+        aggregates = await asyncio.to_thread(self.compute_frame, members, groups)
+        records = aggregates.to_dict("records")
+        await peer_repository.replace_groups(groups, records)
+
+        for symbol, sector, industry in zip(members["symbol"], members["sector"], members["industry"]):
+            self._membership[symbol] = (sector, industry)
+        for group in groups:
+            self._stats.pop(group, None)
+        self._apply(records)
+
+        self.refreshes += 1
+        self.groups_refreshed += len(groups)
+        logger.debug(f"Recomputed peer aggregates for {len(groups)} groups")
+        return groups
+
+    def on_stock_write(self, stock_infos: List[Dict[str, Any]]) -> None:
+        """
+        株式情報の書き込み後に呼び出され、書き込んだ銘柄の新旧のグループの再集計を予約する
+        """
+        groups = set()
+        for stock_info in stock_infos:
+            symbol = stock_info["symbol"].upper()
+            groups.update(self._groups_of(*self._membership.get(symbol, (None, None))))
+            groups.update(self._groups_of(stock_info.get("sector"), stock_info.get("industry")))
+        self._schedule(groups)
+
+    def mark_symbols(self, symbols: Iterable[str]) -> None:
+        """
+        傾向指標が変わった銘柄の所属グループの再集計を予約する
+        """
+        groups = set()
+        for symbol in symbols:
+            groups.update(self._groups_of(*self._membership.get(symbol.upper(), (None, None))))
+        self._schedule(groups)
+
+    def _schedule(self, groups: Set[Group]) -> None:
+        if not groups:
+            return
+        self._dirty.update(groups)
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self) -> None:
+        # 再集計中に予約されたグループは次の周回でまとめて再集計する
+        while self._dirty:
+            groups, self._dirty = self._dirty, set()
+            try:
+                refreshed = await self.refresh_groups(groups)
+            except Exception as e:
+                # 失敗したグループは予約に戻し、待ってから再試行する
+                logger.error(f"Error refreshing peer aggregates: {str(e)}")
+                self.failures += 1
+                self._dirty.update(groups)
+                await asyncio.sleep(self.retry_seconds)
+                continue
+
+            for listener in self._listeners:
+                try:
+                    listener(refreshed)
+                except Exception as e:
+                    logger.error(f"Error notifying peer aggregate listener: {str(e)}")
+
+    async def stop(self) -> None:
+        """
+        予約済みの再集計を中止（次回起動時のrebuildで反映される）
+        """
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = None
+
+    def compute_frame(self, members: pd.DataFrame, groups: Optional[Set[Group]] = None) -> pd.DataFrame:
+        """
+        銘柄の指標のテーブルからグループ・指標ごとの件数と四分位数を一括計算
+
+        Args:
+            members: symbol, sector, industryとPEER_METRICSを列に持つDataFrame（行は銘柄）
+            groups: 集計する(group_type, group_name)の集合（Noneの場合は全グループ）
+
+        Returns:
+            group_type, group_name, metricとSTAT_FIELDSを列に持つDataFrame
+        """
+        columns = ["group_type", "group_name", "metric"] + STAT_FIELDS
+        if members.empty:
+            return pd.DataFrame(columns=columns)
+
+        values = members[PEER_METRICS].apply(pd.to_numeric, errors="coerce").astype(float)
+        # 株式情報の指標は欠損（0）を、倍率指標は0以下を除く（傾向指標は0も有効な値）
+        for metric in PEER_METRICS:
+            if metric in POSITIVE_METRICS:
+                values[metric] = values[metric].where(values[metric] > 0)
+            elif metric not in PEER_TREND_METRICS:
+                values[metric] = values[metric].where(values[metric] != 0)
+
+        parts = []
+        for group_type in PEER_GROUP_TYPES:
+            part = values.assign(group_type=group_type, group_name=members[group_type])
+            part = part[part["group_name"].notna() & ~part["group_name"].isin(MISSING_GROUP_NAMES)]
+            parts.append(part.melt(id_vars=["group_type", "group_name"], var_name="metric").dropna(subset=["value"]))
+        long = pd.concat(parts, ignore_index=True)
+        if groups is not None:
+            keys = pd.MultiIndex.from_frame(long[["group_type", "group_name"]])
+            long = long[keys.isin(list(groups))]
+        if long.empty:
+            return pd.DataFrame(columns=columns)
+
+        grouped = long.groupby(["group_type", "group_name", "metric"])["value"]
+        aggregates = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+        aggregates.columns = ["q1", "median", "q3"]
+        aggregates["count"] = grouped.count()
+        return aggregates.reset_index()[columns]
+
+    def _apply(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            group = (record["group_type"], record["group_name"])
+            self._stats.setdefault(group, {})[record["metric"]] = {
+                field: int(record[field]) if field == "count" else float(record[field])
+                for field in STAT_FIELDS
+            }
+
+    @staticmethod
+    def _groups_of(sector: Optional[str], industry: Optional[str]) -> List[Group]:
+        return [
+            (group_type, name)
+            for group_type, name in zip(PEER_GROUP_TYPES, (sector, industry))
+            if name and name not in MISSING_GROUP_NAMES
+        ]
+
+    def get_group(self, group_type: str, group_name: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        グループの指標ごとの分布を取得
+
+        Returns:
+            指標をキーとした分布の辞書、グループが存在しない場合はNone
+        """
+        return self._stats.get((group_type, group_name))
+
+    def list_groups(self, group_type: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        指定した種類の全グループの分布を取得
+
+        Returns:
+            グループ名をキーとした、指標ごとの分布の辞書
+        """
+        return {
+            name: stats
+            for (stored_type, name), stats in sorted(self._stats.items())
+            if stored_type == group_type
+        }
+
+    def peer_medians(
+        self,
+        stock_info: Dict[str, Any],
+        group_type: str = "sector",
+        min_count: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        銘柄が属するグループの指標ごとの中央値（件数が不足する・中央値が0以下の指標は除く）
+
+        Args:
+            stock_info: sector, industryを含む株式情報
+            group_type: 比較対象のグループ（sector / industry）
+            min_count: 必要な件数（Noneの場合はPEER_MIN_COUNT）
+
+        Returns:
+            指標をキーとした中央値の辞書
+        """
+        min_count = self.min_count if min_count is None else min_count
+        stats = self._stats.get((group_type, stock_info.get(group_type)), {})
+        return {
+            metric: values["median"]
+            for metric, values in stats.items()
+            if values["count"] >= min_count and values["median"] > 0
+        }
+
+    def median_map(self, group_type: str, metric: str, min_count: Optional[int] = None) -> Dict[str, float]:
+        """
+        グループ名をキーとした指標の中央値（件数が不足するグループは除く）
+
+        複数銘柄の中央値をSeries.mapでまとめて引くために使う。
+        """
+        min_count = self.min_count if min_count is None else min_count
+        return {
+            name: stats[metric]["median"]
+            for (stored_type, name), stats in self._stats.items()
+            if stored_type == group_type and metric in stats and stats[metric]["count"] >= min_count
+        }
+
+    @staticmethod
+    def relative(value: Optional[float], median: Optional[float]) -> Optional[float]:
+        """
+        中央値に対する倍率（値が欠損・0、または中央値が0以下の場合はNone）
+        """
+        if not value or median is None or median <= 0 or not np.isfinite(value):
+            return None
+        return value / median
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        再集計の統計情報を取得
+        """
+        return {
+            "groups": len(self._stats),
+            "members": len(self._membership),
+            "refreshes": self.refreshes,
+            "groups_refreshed": self.groups_refreshed,
+            "failures": self.failures,
+            "pending": len(self._dirty)
+        }
+
+
+# サービスインスタンス
+peer_aggregate_service = PeerAggregateService()
@@ -0,0 +1,106 @@
+"""
+レート制限 - Yahoo Finance APIへのリクエスト数を制御するトークンバケット
+"""
+from typing import Optional, Dict, Any
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitTimeoutError(Exception):
+    """待機時間が期限を超えるためトークンを取得できなかった場合の例外"""
+    pass
+
+
+class AsyncTokenBucket:
+    """非同期トークンバケット（バーストを許容し、超過分は到着順に待機させる）"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: 1秒あたりに補充されるトークン数（0以下の場合は制限なし）
+            capacity: バケットの容量（一度に許容するバースト数）
+        """
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+        # 統計情報
+        self.acquired = 0
+        self.waited = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> float:
+        """
+        トークンを取得する（不足している場合は補充されるまで待機）
+
+        トークンは呼び出し時点で予約されるため、待機中の呼び出しは到着順に処理される。
+
+        Args:
+            tokens: 取得するトークン数
+            timeout: 最大待機秒数（Noneの場合は無制限）
+
+        Returns:
+            実際に待機した秒数
+
+        Raises:
+            RateLimitTimeoutError: 必要な待機時間がtimeoutを超える場合
+        """
+        if self.rate <= 0:
+            self.acquired += 1
+            return 0.0
+
+        self._refill()
+        self._tokens -= tokens
+        wait_seconds = max(0.0, -self._tokens / self.rate)
+
+        if timeout is not None and wait_seconds > timeout:
+            # 予約を取り消して即座に失敗させる
+            self._tokens += tokens
+            self.timeouts += 1
+            raise RateLimitTimeoutError(
+                f"Rate limit wait {wait_seconds:.2f}s exceeds deadline {timeout:.2f}s"
+            )
+
+        if wait_seconds > 0:
+            try:
+                await asyncio.sleep(wait_seconds)
+            except asyncio.CancelledError:
+                self._tokens += tokens
+                raise
+            self.waited += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            logger.debug(f"Rate limiter delayed request by {wait_seconds:.3f}s")
+
+        self.acquired += 1
+        return wait_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        レート制限の統計情報を取得
+        """
+        self._refill()
+        return {
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "available_tokens": round(self._tokens, 3),
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "timeouts": self.timeouts,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "average_wait_seconds": (
+                round(self.total_wait_seconds / self.acquired, 4) if self.acquired else 0.0
+            )
+        }
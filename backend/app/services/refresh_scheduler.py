@@ -0,0 +1,186 @@
+"""
+定期更新スケジューラ - 保存済みの銘柄をバックグラウンドで更新し、キャッシュを温めておく
+"""
+from typing import Optional, Dict, Any, List
+from collections import Counter
+from datetime import datetime, timedelta
+import asyncio
+import time
+import logging
+
+from app.config import settings
+from app.repositories.stock_repository import stock_repository
+from app.services.yahoo_finance_service import yahoo_finance_service
+from app.services.stream_service import quote_broadcaster
+
+logger = logging.getLogger(__name__)
+
+# 1銘柄の更新で消費するトークン数（株式情報1・財務諸表3・履歴1）
+REFRESH_TOKENS_PER_SYMBOL = 5
+
+
+class RefreshScheduler:
+    """保存済み銘柄の株式情報・財務データ・履歴データを定期的に更新するスケジューラ"""
+
+    def __init__(
+        self,
+        rate_share: float = settings.REFRESH_RATE_SHARE,
+        lead_minutes: int = settings.REFRESH_LEAD_MINUTES,
+        plan_interval_seconds: float = settings.REFRESH_PLAN_INTERVAL_SECONDS,
+        history_period: str = settings.REFRESH_HISTORY_PERIOD
+    ):
+        """
+        Args:
+            rate_share: 定期更新に割り当てるAPIレート制限の割合
+            lead_minutes: 有効期限切れのこの時間前から更新対象にする
+            plan_interval_seconds: 更新対象を選び直す間隔（秒）
+            history_period: 更新する履歴データの期間
+        """
+        self.rate_share = rate_share
+        self.lead_minutes = lead_minutes
+        self.plan_interval_seconds = max(1.0, plan_interval_seconds)
+        self.history_period = history_period
+        self._task: Optional[asyncio.Task] = None
+
+        # 統計情報
+        self.refreshed = 0
+        self.failed = 0
+
+    @property
+    def refresh_interval(self) -> float:
+        """
+        1銘柄の更新ごとの間隔（秒）
+
+        レート制限のうちrate_shareの割合だけを使うよう、更新を均等に分散させる。
+        """
+        budget = yahoo_finance_service.rate_limit * self.rate_share
+        if budget <= 0:
+            return self.plan_interval_seconds
+        return REFRESH_TOKENS_PER_SYMBOL / budget
+
+    def start(self) -> None:
+        """
+        スケジューラをバックグラウンドタスクとして開始
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        スケジューラを停止
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self) -> None:
+        """
+        更新対象の選定と更新を繰り返す
+        """
+        while True:
+            try:
+                plan = await self.plan()
+            except Exception as e:
+                logger.error(f"Error planning stock refresh: {str(e)}")
+                plan = []
+
+            # 一定時間ごとに選び直し、新たに要求された銘柄を反映する
+            deadline = time.monotonic() + self.plan_interval_seconds
+            for symbol in plan:
+                started = time.monotonic()
+                await self._refresh(symbol)
+                await asyncio.sleep(max(0.0, self.refresh_interval - (time.monotonic() - started)))
+                if time.monotonic() >= deadline:
+                    break
+            else:
+                await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+
+    async def plan(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        更新対象の銘柄を優先度順に選定
+
+        有効期限切れ（またはlead_minutes以内に期限切れ）の銘柄を対象とし、
+        期限までの残り時間を要求回数（ウォッチリスト登録・配信の購読を含む）で重み付けして、
+        要求の多い銘柄・期限の近い銘柄ほど先に更新する。要求回数は選定のたびに半減させ、
+        直近の要求ほど重く評価する。
+
+        Args:
+            now: 基準時刻（Noneの場合は現在時刻）
+
+        Returns:
+            更新する銘柄のシンボルのリスト
+        """
+        candidates = await stock_repository.get_refresh_candidates()
+        demand = yahoo_finance_service.demand + Counter(quote_broadcaster.subscriber_counts)
+        yahoo_finance_service.decay_demand(candidate["symbol"] for candidate in candidates)
+        return self.prioritize(candidates, dict(demand), now)
+
+    def prioritize(
+        self,
+        candidates: List[Dict[str, Any]],
+        demand: Dict[str, int],
+        now: Optional[datetime] = None
+    ) -> List[str]:
+        """
+        更新候補を優先度順に並べる（同期関数）
+
+        Args:
+            candidates: get_refresh_candidatesの戻り値
+            demand: シンボルごとの要求回数
+            now: 基準時刻（Noneの場合は現在時刻）
+
+        Returns:
+            更新する銘柄のシンボルのリスト
+        """
+        now = now or datetime.now()
+        expiry = timedelta(minutes=settings.CACHE_EXPIRY_MINUTES)
+        lead_seconds = self.lead_minutes * 60
+
+        prioritized = []
+        for candidate in candidates:
+            symbol = candidate["symbol"]
+            last_api_fetch = candidate["last_api_fetch"]
+            if last_api_fetch is None:
+                remaining = 0.0
+            else:
+                remaining = (last_api_fetch + expiry - now).total_seconds()
+            if remaining > lead_seconds:
+                continue
+
+            weight = 1 + demand.get(symbol, 0) + candidate.get("watch_count", 0)
+            # 期限前は残り時間を縮め、期限切れは超過時間を伸ばして評価する
+            urgency = remaining / weight if remaining > 0 else remaining * weight
+            prioritized.append((urgency, symbol))
+
+        prioritized.sort()
+        return [symbol for _, symbol in prioritized]
+
+    async def _refresh(self, symbol: str) -> None:
+        try:
+            if await yahoo_finance_service.refresh_symbol(symbol, self.history_period):
+                self.refreshed += 1
+            else:
+                self.failed += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error refreshing {symbol}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        スケジューラの統計情報を取得
+        """
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "refresh_interval": self.refresh_interval,
+            "refreshed": self.refreshed,
+            "failed": self.failed
+        }
+
+
+# スケジューラインスタンス
+refresh_scheduler = RefreshScheduler()
@@ -0,0 +1,119 @@
+"""
+スコアリングサービス - 財務健全性スコアを複数銘柄まとめてベクトル演算で計算する
+"""
+from typing import Dict, Any, List
+from datetime import datetime
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# スコア計算に使用する指標（_format_stock_dataのキー）
+SCORE_INPUT_COLUMNS = ["debt_to_equity", "roe", "current_ratio", "pe_ratio", "profit_margin"]
+
+# 詳細スコアの列（出力順）
+DETAILED_SCORE_COLUMNS = ["debt_score", "roe_score", "liquidity_score", "pe_score", "profit_score"]
+
+
+class FinancialScoringService:
+    """財務健全性スコアを計算するサービス"""
+
+    def score_frame(self, metrics: pd.DataFrame) -> pd.DataFrame:
+        """
+        指標のテーブルから各スコアと総合スコアを一括計算
+
+        欠損値（NaN）の指標はスコアもNaNとなり、総合スコアの平均から除外される。
+        全ての指標が欠損している銘柄の総合スコアは0とする。
+
+        Args:
+            metrics: SCORE_INPUT_COLUMNSを列に持つDataFrame（行は銘柄）
+
+        Returns:
+            DETAILED_SCORE_COLUMNSとoverall_scoreを列に持つDataFrame（インデックスは入力と同じ）
+        """
+        metrics = metrics.reindex(columns=SCORE_INPUT_COLUMNS)
+        values = {
+            column: pd.to_numeric(metrics[column], errors="coerce").to_numpy(dtype=float)
+            for column in SCORE_INPUT_COLUMNS
+        }
+
+        scores = pd.DataFrame(index=metrics.index)
+
+        # 負債比率スコア（低いほど良い）
+        scores["debt_score"] = np.maximum(0, 10 - (values["debt_to_equity"] / 100 * 10))
+
+        # ROEスコア（高いほど良い）
+        scores["roe_score"] = np.minimum(10, values["roe"] * 100)
+
+        # 流動比率スコア（2.0が理想）
+        scores["liquidity_score"] = np.maximum(0, 10 - np.abs(values["current_ratio"] - 2.0) * 2)
+
+        # PERスコア（適正レンジ10-20）
+        pe_ratio = values["pe_ratio"]
+        scores["pe_score"] = np.select(
+            [np.isnan(pe_ratio), (pe_ratio >= 10) & (pe_ratio <= 20), pe_ratio < 10],
+            [np.nan, 10.0, 8.0],
+            default=np.maximum(0, 10 - (pe_ratio - 20) / 5)
+        )
+
+        # 利益率スコア
+        scores["profit_score"] = np.minimum(10, values["profit_margin"] * 100)
+
+        # 総合スコア計算（欠損を除いた平均、全て欠損の場合は0）
+        detailed = scores[DETAILED_SCORE_COLUMNS].to_numpy()
+        valid_counts = (~np.isnan(detailed)).sum(axis=1)
+        totals = np.nansum(detailed, axis=1)
+        overall = np.divide(
+            totals,
+            valid_counts,
+            out=np.zeros_like(totals),
+            where=valid_counts > 0
+        )
+        scores["overall_score"] = np.round(overall, 2)
+
+        return scores
+
+    def score_stock_infos(self, stock_infos: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        整形済みの株式情報のリストから財務スコアを一括計算
+
+        Args:
+            stock_infos: _format_stock_dataで整形済みの株式情報のリスト
+
+        Returns:
+            シンボルをキーとした財務スコアの辞書（calculate_financial_scoreと同じ形式）
+        """
+        if not stock_infos:
+            return {}
+
+        symbols = [stock_info["symbol"].upper() for stock_info in stock_infos]
+        metrics = pd.DataFrame.from_records(
+            [{column: stock_info.get(column) for column in SCORE_INPUT_COLUMNS} for stock_info in stock_infos],
+            index=symbols,
+            columns=SCORE_INPUT_COLUMNS
+        )
+        scores = self.score_frame(metrics)
+
+        detailed = scores[DETAILED_SCORE_COLUMNS].to_numpy()
+        overall = scores["overall_score"].to_numpy()
+        last_updated = datetime.now().isoformat()
+
+        results = {}
+        for row, symbol in enumerate(symbols):
+            results[symbol] = {
+                "symbol": symbol,
+                "overall_score": float(overall[row]),
+                "detailed_scores": {
+                    name: float(detailed[row, column])
+                    for column, name in enumerate(DETAILED_SCORE_COLUMNS)
+                    if not np.isnan(detailed[row, column])
+                },
+                "last_updated": last_updated
+            }
+        return results
+
+
+# サービスインスタンス
+financial_scoring_service = FinancialScoringService()
@@ -0,0 +1,336 @@
+"""
+スクリーニングサービス - 複数銘柄の取得・スコア計算・条件判定を並行実行する
+"""
+from typing import Optional, Dict, Any
+from datetime import datetime
+import time
+import uuid
+import logging
+
+from app.config import settings
+from app.schemas.stock import (
+    ScreeningCriteria,
+    ScreeningRequest,
+    ScreeningResponse,
+    ScreeningResult,
+    StoredScreeningResponse,
+    UniverseScreeningRequest,
+    UniverseScreeningResponse
+)
+from app.services.yahoo_finance_service import yahoo_finance_service
+from app.services.trend_metrics_service import trend_metrics_service
+from app.services.peer_aggregate_service import peer_aggregate_service
+from app.repositories.stock_repository import stock_repository
+from app.repositories.screening_repository import screening_repository
+
+logger = logging.getLogger(__name__)
+
+
+class ScreeningService:
+    """複数銘柄のスクリーニングを行うサービス"""
+
+    def __init__(self, concurrency: int = settings.SCREENING_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+
+    async def screen(self, request: ScreeningRequest) -> ScreeningResponse:
+        """
+        スクリーニングを実行
+
+        各銘柄の情報は一度だけ取得し、同時取得数をconcurrencyで制限して並行処理する。
+        結果はスコアの降順、同点の場合はリクエスト内の順序で並べる。
+
+        Args:
+            request: スクリーニングリクエスト
+
+        Returns:
+            スクリーニングレスポンス
+        """
+        start_time = time.time()
+        request_id = str(uuid.uuid4())
+
+        # 重複シンボルは一度だけ処理する（順序は維持）
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in request.symbols))
+
+        # 銘柄情報をまとめて取得（キャッシュ・DB・データソースの順に参照）
+        stock_infos, _ = await yahoo_finance_service.get_stock_info_batch(
+            symbols,
+            concurrency=self.concurrency
+        )
+
+        # 取得済みの情報を再利用して全銘柄のスコアを一括計算
+        scores = yahoo_finance_service.calculate_financial_scores(list(stock_infos.values()))
+
+        # 傾向指標の条件がある場合のみ、保存済みの指標をまとめて取得
+        trends: Dict[str, Dict[str, Any]] = {}
+        if self.has_trend_criteria(request):
+            trends = await trend_metrics_service.get_trend_metrics_many(list(stock_infos.keys()))
+
+        # 業種内比較の条件がある場合のみ、保存済みの中央値を参照する
+        has_peer_criteria = self.has_peer_criteria(request)
+
+        screened = []
+        for index, symbol in enumerate(symbols):
+            stock_info = stock_infos.get(symbol)
+            if not stock_info:
+                continue
+            peers = peer_aggregate_service.peer_medians(stock_info, request.peer_group) if has_peer_criteria else None
+            result = self._screen_symbol(symbol, stock_info, scores.get(symbol), request, trends.get(symbol), peers)
+            if result is not None:
+                screened.append((index, result))
+
+        screened.sort(key=lambda item: (-item[1].score, item[0]))
+        results = [result for _, result in screened]
+
+        passed_count = sum(1 for result in results if result.meets_criteria)
+        execution_time = time.time() - start_time
+
+        # 実行結果を保存（保存に失敗してもレスポンスは返す）
+        try:
+            await screening_repository.save_run(
+                request_id,
+                request,
+                stock_infos,
+                [
+                    {
+                        "symbol": result.symbol,
+                        "overall_score": result.score,
+                        "detailed_scores": scores.get(result.symbol, {}).get("detailed_scores", {}),
+                        "meets_criteria": result.meets_criteria
+                    }
+                    for result in results
+                ],
+                len(request.symbols),
+                passed_count,
+                execution_time
+            )
+        except Exception as e:
+            logger.error(f"Error saving screening results {request_id}: {str(e)}")
+
+        return ScreeningResponse(
+            request_id=request_id,
+            total_symbols=len(request.symbols),
+            passed_symbols=passed_count,
+            results=results,
+            execution_time=execution_time,
+            last_updated=datetime.now().isoformat()
+        )
+
+    async def get_stored_results(
+        self,
+        request_id: str,
+        cursor: Optional[int] = None,
+        limit: int = 50
+    ) -> Optional[StoredScreeningResponse]:
+        """
+        保存済みのスクリーニング結果をページ単位で取得
+
+        Args:
+            request_id: スクリーニングのリクエストID
+            cursor: 前ページのnext_cursor（Noneの場合は先頭から）
+            limit: 1ページあたりの件数
+
+        Returns:
+            スクリーニング結果のページ、存在しない場合はNone
+        """
+        screening_session = await screening_repository.get_session(request_id)
+        if screening_session is None:
+            return None
+
+        # 次ページの有無を判定するため1件多く取得する
+        rows = await screening_repository.get_results_page(
+            screening_session["id"],
+            cursor,
+            limit + 1
+        )
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+
+        created_at = screening_session["created_at"]
+        return StoredScreeningResponse(
+            request_id=request_id,
+            criteria=screening_session["criteria"],
+            total_symbols=screening_session["total_symbols"] or 0,
+            passed_symbols=screening_session["passed_symbols"] or 0,
+            execution_time=screening_session["execution_time"] or 0,
+            created_at=created_at.isoformat() if created_at else None,
+            results=[
+                ScreeningResult(**{key: value for key, value in row.items() if key != "id"})
+                for row in rows
+            ],
+            limit=limit,
+            next_cursor=rows[-1]["id"] if has_next else None
+        )
+
+    async def screen_universe(self, request: UniverseScreeningRequest) -> UniverseScreeningResponse:
+        """
+        保存済みの全銘柄を対象にスクリーニングを実行
+
+        条件はSQLで評価し、データソースへの問い合わせは行わない。
+        結果は保存時に計算した財務スコアの降順でページ分割して返す。
+
+        Args:
+            request: スクリーニングリクエスト
+
+        Returns:
+            スクリーニングレスポンス
+        """
+        start_time = time.time()
+        offset = (request.page - 1) * request.page_size
+
+        stock_infos, total = await stock_repository.screen(
+            request,
+            offset,
+            request.page_size
+        )
+
+        results = [
+            ScreeningResult(
+                symbol=stock_info["symbol"],
+                name=stock_info.get("name", "N/A"),
+                score=stock_info.get("overall_score") or 0,
+                market_cap=stock_info.get("market_cap"),
+                pe_ratio=stock_info.get("pe_ratio"),
+                roe=stock_info.get("roe"),
+                debt_to_equity=stock_info.get("debt_to_equity"),
+                current_ratio=stock_info.get("current_ratio"),
+                meets_criteria=True
+            )
+            for stock_info in stock_infos
+        ]
+
+        return UniverseScreeningResponse(
+            request_id=str(uuid.uuid4()),
+            total_matches=total,
+            page=request.page,
+            page_size=request.page_size,
+            total_pages=(total + request.page_size - 1) // request.page_size,
+            results=results,
+            execution_time=time.time() - start_time,
+            last_updated=datetime.now().isoformat()
+        )
+
+    def _screen_symbol(
+        self,
+        symbol: str,
+        stock_info: Dict[str, Any],
+        score_data: Optional[Dict[str, Any]],
+        request: ScreeningRequest,
+        trend: Optional[Dict[str, Any]] = None,
+        peers: Optional[Dict[str, float]] = None
+    ) -> Optional[ScreeningResult]:
+        """
+        1銘柄分のスクリーニング（処理失敗時はNone）
+        """
+        try:
+            return ScreeningResult(
+                symbol=symbol,
+                name=stock_info.get("name", "N/A"),
+                score=score_data.get("overall_score", 0) if score_data else 0,
+                market_cap=stock_info.get("market_cap"),
+                pe_ratio=stock_info.get("pe_ratio"),
+                roe=stock_info.get("roe"),
+                debt_to_equity=stock_info.get("debt_to_equity"),
+                current_ratio=stock_info.get("current_ratio"),
+                meets_criteria=self.meets_criteria(request, stock_info, trend, peers)
+            )
+
+        except Exception as e:
+            logger.error(f"Error screening stock {symbol}: {str(e)}")
+            return None
+
+    @staticmethod
+    def has_trend_criteria(request: ScreeningCriteria) -> bool:
+        """
+        傾向指標の条件が指定されているかどうか
+        """
+        return any(
+            value is not None
+            for value in (
+                request.min_revenue_cagr,
+                request.min_eps_cagr,
+                request.min_fcf_consistency,
+                request.max_operating_margin_volatility
+            )
+        )
+
+    @staticmethod
+    def has_peer_criteria(request: ScreeningCriteria) -> bool:
+        """
+        業種内比較の条件が指定されているかどうか
+        """
+        return any(
+            value is not None
+            for value in (
+                request.max_pe_to_peer_median,
+                request.max_pb_to_peer_median,
+                request.min_roe_to_peer_median
+            )
+        )
+
+    @staticmethod
+    def meets_criteria(
+        request: ScreeningCriteria,
+        stock_info: Dict[str, Any],
+        trend: Optional[Dict[str, Any]] = None,
+        peers: Optional[Dict[str, float]] = None
+    ) -> bool:
+        """
+        スクリーニング条件をチェック（値が欠損している指標は判定対象外）
+        """
+        if request.min_market_cap and stock_info.get("market_cap"):
+            if stock_info["market_cap"] < request.min_market_cap:
+                return False
+
+        if request.max_pe_ratio and stock_info.get("pe_ratio"):
+            if stock_info["pe_ratio"] > request.max_pe_ratio:
+                return False
+
+        if request.min_roe and stock_info.get("roe"):
+            if stock_info["roe"] < request.min_roe:
+                return False
+
+        if request.max_debt_to_equity and stock_info.get("debt_to_equity"):
+            if stock_info["debt_to_equity"] > request.max_debt_to_equity:
+                return False
+
+        if request.min_current_ratio and stock_info.get("current_ratio"):
+            if stock_info["current_ratio"] < request.min_current_ratio:
+                return False
+
+        # 傾向指標（未計算の銘柄・指標は判定対象外）
+        trend = trend or {}
+        if request.min_revenue_cagr is not None and trend.get("revenue_cagr") is not None:
+            if trend["revenue_cagr"] < request.min_revenue_cagr:
+                return False
+
+        if request.min_eps_cagr is not None and trend.get("eps_cagr") is not None:
+            if trend["eps_cagr"] < request.min_eps_cagr:
+                return False
+
+        if request.min_fcf_consistency is not None and trend.get("fcf_consistency") is not None:
+            if trend["fcf_consistency"] < request.min_fcf_consistency:
+                return False
+
+        if request.max_operating_margin_volatility is not None and trend.get("operating_margin_volatility") is not None:
+            if trend["operating_margin_volatility"] > request.max_operating_margin_volatility:
+                return False
+
+        # 同じセクター・業種の中央値に対する倍率（値が欠損・中央値が未集計の指標は判定対象外）
+        peers = peers or {}
+        relative_bounds = [
+            ("pe_ratio", request.max_pe_to_peer_median, False),
+            ("pb_ratio", request.max_pb_to_peer_median, False),
+            ("roe", request.min_roe_to_peer_median, True),
+        ]
+        for metric, bound, is_lower in relative_bounds:
+            if bound is None:
+                continue
+            relative = peer_aggregate_service.relative(stock_info.get(metric), peers.get(metric))
+            if relative is not None and (relative < bound if is_lower else relative > bound):
+                return False
+
+        return True
+
+
+# サービスインスタンス
+screening_service = ScreeningService()
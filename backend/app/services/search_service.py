@@ -0,0 +1,236 @@
+"""
+銘柄検索サービス - シンボル・銘柄名のプレフィックス/n-gramインデックスによるメモリ内検索
+"""
+from typing import Dict, Any, List, Set, Iterable, Tuple
+from collections import Counter
+import heapq
+import re
+import unicodedata
+import logging
+
+from app.repositories.stock_repository import stock_repository
+
+logger = logging.getLogger(__name__)
+
+# プレフィックスインデックスに登録する最大文字数（それより長いクエリは登録済みの範囲で絞ってから照合する）
+MAX_PREFIX_LENGTH = 12
+
+# 検索結果を保持するクエリ数の上限（短いクエリは候補が多いため結果を再利用する）
+MAX_MEMO_ENTRIES = 1024
+
+# あいまい一致とみなすn-gramの一致率の下限
+FUZZY_THRESHOLD = 0.5
+
+# 関連度（一致の種類ごとの基準値）
+RELEVANCE_EXACT_SYMBOL = 1.0
+RELEVANCE_SYMBOL_PREFIX = 0.9
+RELEVANCE_NAME_PREFIX = 0.8
+RELEVANCE_SUBSTRING = 0.6
+RELEVANCE_FUZZY = 0.5
+
+_TOKEN_PATTERN = re.compile(r"[\w]+")
+
+
+def normalize(text: str) -> str:
+    """
+    検索用に文字列を正規化（全角英数の半角化・カタカナ表記の統一・小文字化）
+    """
+    return unicodedata.normalize("NFKC", text or "").lower().strip()
+
+
+def ngrams(text: str, size: int) -> Set[str]:
+    """
+    文字列のn-gramの集合（sizeより短い文字列はそのものを1つのn-gramとする）
+    """
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class SymbolSearchIndex:
+    """シンボル・銘柄名のメモリ内検索インデックス（イベントループ上でのみ更新する）"""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._normalized: Dict[str, Tuple[str, str]] = {}
+        self._symbol_prefixes: Dict[str, Set[str]] = {}
+        self._name_prefixes: Dict[str, Set[str]] = {}
+        self._grams: Dict[int, Dict[str, Set[str]]] = {2: {}, 3: {}}
+        self._memo: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def rebuild(self) -> int:
+        """
+        stocksテーブルからインデックスを作り直す
+
+        Returns:
+            登録した銘柄数
+        """
+        entries = await stock_repository.get_search_entries()
+        fresh = SymbolSearchIndex()
+        fresh.upsert_many(entries)
+
+        # 作成済みのインデックスに差し替える
+        self._entries = fresh._entries
+        self._normalized = fresh._normalized
+        self._symbol_prefixes = fresh._symbol_prefixes
+        self._name_prefixes = fresh._name_prefixes
+        self._grams = fresh._grams
+        self._memo = {}
+        return len(self._entries)
+
+    def upsert_many(self, stock_infos: Iterable[Dict[str, Any]]) -> None:
+        """
+        銘柄をインデックスに追加・更新（名前が変わった銘柄は古い名前の登録を外す）
+
+        Args:
+            stock_infos: symbol, name（sector）を含む辞書のリスト
+        """
+        for stock_info in stock_infos:
+            symbol = stock_info["symbol"].upper()
+            name = stock_info.get("name") or ""
+            if name == "N/A":
+                name = ""
+
+            current = self._entries.get(symbol)
+            if current is not None:
+                if current["name"] == name and current["sector"] == stock_info.get("sector"):
+                    continue
+                self.remove(symbol)
+
+            entry = {"symbol": symbol, "name": name, "sector": stock_info.get("sector")}
+            self._memo.clear()
+            self._entries[symbol] = entry
+            self._normalized[symbol] = (normalize(symbol), normalize(name))
+            for key, index in self._keys(entry):
+                index.setdefault(key, set()).add(symbol)
+
+    def remove(self, symbol: str) -> None:
+        """
+        銘柄をインデックスから削除
+        """
+        entry = self._entries.pop(symbol.upper(), None)
+        if entry is None:
+            return
+        self._normalized.pop(entry["symbol"], None)
+        self._memo.clear()
+        for key, index in self._keys(entry):
+            symbols = index.get(key)
+            if symbols is not None:
+                symbols.discard(entry["symbol"])
+                if not symbols:
+                    del index[key]
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        シンボル・銘柄名を検索して関連度順に返す
+
+        シンボルの完全一致・前方一致、銘柄名（単語）の前方一致、部分一致、
+        n-gramの一致率によるあいまい一致の順に関連度を付ける。
+
+        Args:
+            query: 検索クエリ
+            limit: 結果数の上限
+
+        Returns:
+            symbol, name, sector, relevanceを含む辞書のリスト
+        """
+        text = normalize(query)
+        if not text:
+            return []
+
+        memo_key = (text, limit)
+        if memo_key in self._memo:
+            return [dict(result) for result in self._memo[memo_key]]
+
+        scores: Dict[str, float] = {}
+        prefix = text[:MAX_PREFIX_LENGTH]
+        # 登録済みの長さを超えるクエリのみ、前方一致を照合し直す
+        verify = len(text) > MAX_PREFIX_LENGTH
+
+        for symbol in self._symbol_prefixes.get(prefix, ()):
+            normalized_symbol = self._normalized[symbol][0]
+            if verify and not normalized_symbol.startswith(text):
+                continue
+            if normalized_symbol == text or normalized_symbol.split(".")[0] == text:
+                scores[symbol] = RELEVANCE_EXACT_SYMBOL
+            else:
+                # 短いシンボルほど入力に近いものとして優先する
+                scores[symbol] = RELEVANCE_SYMBOL_PREFIX + 0.05 * len(text) / len(normalized_symbol)
+
+        for symbol in self._name_prefixes.get(prefix, ()):
+            name = self._normalized[symbol][1]
+            if verify and not (
+                name.startswith(text) or any(token.startswith(text) for token in _TOKEN_PATTERN.findall(name))
+            ):
+                continue
+            self._raise(scores, symbol, RELEVANCE_NAME_PREFIX + 0.05 * len(text) / max(len(name), 1))
+
+        # n-gramによる部分一致・あいまい一致
+        size = 3 if len(text) >= 3 else 2
+        query_grams = ngrams(text, size)
+        hits: Counter = Counter()
+        for gram in query_grams:
+            hits.update(self._grams[size].get(gram, ()))
+
+        # 短いクエリで1つのn-gramだけが偶然一致したものは除外する
+        min_hits = min(2, len(query_grams))
+        for symbol, count in hits.items():
+            ratio = count / len(query_grams)
+            if ratio < FUZZY_THRESHOLD or count < min_hits:
+                continue
+            if symbol in scores and scores[symbol] >= RELEVANCE_SUBSTRING:
+                continue
+            normalized_symbol, name = self._normalized[symbol]
+            if text in normalized_symbol or text in name:
+                self._raise(scores, symbol, RELEVANCE_SUBSTRING)
+            else:
+                self._raise(scores, symbol, RELEVANCE_FUZZY * ratio)
+
+        ranked = heapq.nsmallest(
+            limit,
+            scores.items(),
+            key=lambda item: (-item[1], len(self._entries[item[0]]["name"]), item[0])
+        )
+        results = [
+            {**self._entries[symbol], "relevance": round(relevance, 4)}
+            for symbol, relevance in ranked
+        ]
+
+        if len(self._memo) >= MAX_MEMO_ENTRIES:
+            self._memo.clear()
+        self._memo[memo_key] = results
+        return [dict(result) for result in results]
+
+    @staticmethod
+    def _raise(scores: Dict[str, float], symbol: str, relevance: float) -> None:
+        if relevance > scores.get(symbol, 0.0):
+            scores[symbol] = relevance
+
+    def _keys(self, entry: Dict[str, Any]) -> Iterable[Tuple[str, Dict[str, Set[str]]]]:
+        """
+        銘柄をインデックスに登録するキーと、登録先のインデックスの組
+        """
+        symbol = normalize(entry["symbol"])
+        for length in range(1, min(len(symbol), MAX_PREFIX_LENGTH) + 1):
+            yield symbol[:length], self._symbol_prefixes
+
+        # 銘柄名は全体と単語ごとの前方一致（日本語名は空白が無いため全体で一致させる）
+        name = normalize(entry["name"])
+        name_prefixes = set()
+        for word in [name] + _TOKEN_PATTERN.findall(name):
+            for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1):
+                name_prefixes.add(word[:length])
+        for key in name_prefixes:
+            yield key, self._name_prefixes
+
+        text = f"{symbol} {name}"
+        for size, index in self._grams.items():
+            for gram in ngrams(text, size):
+                yield gram, index
+
+
+# インデックスインスタンス
+symbol_search_index = SymbolSearchIndex()
@@ -0,0 +1,207 @@
+"""
+株価配信サービス - 株式情報の更新を購読中の接続（Server-Sent Events）へ差分として配信する
+"""
+from typing import Optional, Dict, Any, List, Set, AsyncIterator
+import asyncio
+import json
+import logging
+
+from app.config import settings
+from app.services.yahoo_finance_service import yahoo_finance_service
+
+logger = logging.getLogger(__name__)
+
+# 配信する株式情報の項目
+QUOTE_FIELDS = [
+    "name", "current_price", "market_cap", "pe_ratio", "dividend_yield",
+    "volume", "fifty_two_week_high", "fifty_two_week_low", "last_updated"
+]
+
+
+class QuoteSubscription:
+    """
+    1接続分の購読
+
+    未送信の更新は銘柄ごとに最新の差分へまとめるため、送信の遅い接続でも
+    キューが伸び続けることはない。
+    """
+
+    def __init__(self, symbols: List[str]):
+        self.symbols = symbols
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, symbol: str, delta: Dict[str, Any]) -> None:
+        self._pending.setdefault(symbol, {}).update(delta)
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> Dict[str, Dict[str, Any]]:
+        """
+        未送信の差分を取り出す（timeout秒以内に更新が無い場合は空の辞書）
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return {}
+        self._ready.clear()
+        pending, self._pending = self._pending, {}
+        return pending
+
+
+class QuoteBroadcaster:
+    """
+    株式情報の更新を購読中の全接続へ配信するブローカー（イベントループ上でのみ動作する）
+
+    データソースへの問い合わせは行わず、定期更新・個別取得によるstocksテーブルへの
+    書き込みを受けて配信する。同じ銘柄の購読者は1回の取得結果と差分を共有する。
+    """
+
+    def __init__(
+        self,
+        heartbeat_seconds: float = settings.STREAM_HEARTBEAT_SECONDS,
+        max_symbols: int = settings.STREAM_MAX_SYMBOLS
+    ):
+        self.heartbeat_seconds = max(1.0, heartbeat_seconds)
+        self.max_symbols = max(1, max_symbols)
+        self._subscribers: Dict[str, Set[QuoteSubscription]] = {}
+        self._last_quotes: Dict[str, Dict[str, Any]] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+
+        # 統計情報
+        self.published = 0
+
+    @property
+    def subscriber_counts(self) -> Dict[str, int]:
+        """
+        銘柄ごとの購読数（定期更新の優先度付けに使う）
+        """
+        return {symbol: len(subscriptions) for symbol, subscriptions in self._subscribers.items()}
+
+    def subscribe(self, symbols: List[str]) -> QuoteSubscription:
+        """
+        銘柄の更新を購読
+        """
+        subscription = QuoteSubscription(symbols)
+        for symbol in symbols:
+            self._subscribers.setdefault(symbol, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: QuoteSubscription) -> None:
+        """
+        購読を解除（購読者がいなくなった銘柄は配信済みの値も破棄する）
+        """
+        for symbol in subscription.symbols:
+            subscriptions = self._subscribers.get(symbol)
+            if subscriptions is None:
+                continue
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[symbol]
+                self._last_quotes.pop(symbol, None)
+
+    def publish(self, stock_infos: List[Dict[str, Any]]) -> None:
+        """
+        更新された株式情報のうち、前回配信から変わった項目を購読者へ配信
+
+        stock_write_queueの書き込み完了時に呼び出す。
+
+        Args:
+            stock_infos: 書き込んだ株式情報のリスト
+        """
+        for stock_info in stock_infos:
+            symbol = stock_info["symbol"].upper()
+            subscriptions = self._subscribers.get(symbol)
+            if not subscriptions:
+                continue
+
+            quote = self._quote(stock_info)
+            last = self._last_quotes.get(symbol, {})
+            delta = {field: value for field, value in quote.items() if last.get(field) != value}
+            self._last_quotes[symbol] = quote
+            if not delta:
+                continue
+
+            # 差分は全購読者で共有する
+            for subscription in subscriptions:
+                subscription.push(symbol, delta)
+            self.published += 1
+
+    async def stream(self, symbols: List[str]) -> AsyncIterator[str]:
+        """
+        購読した銘柄の株式情報をServer-Sent Eventsの形式で返し続ける
+
+        最初に各銘柄の現在値（snapshot）を送り、以降は更新された項目のみ（quote）を送る。
+        更新が無い間は一定間隔でコメント行を送り、接続を維持する。
+
+        Args:
+            symbols: 株式ティッカーシンボルのリスト
+
+        Yields:
+            Server-Sent Eventsのメッセージ
+        """
+        subscription = self.subscribe(symbols)
+        try:
+            quotes = await asyncio.gather(*(self._snapshot(symbol) for symbol in symbols))
+            for symbol, quote in zip(symbols, quotes):
+                if quote:
+                    yield self._event("snapshot", {"symbol": symbol, **quote})
+                else:
+                    yield self._event("error", {"symbol": symbol, "error": f"株式 '{symbol}' の情報が見つかりません"})
+
+            while True:
+                batch = await subscription.next_batch(self.heartbeat_seconds)
+                if not batch:
+                    yield ": keep-alive\n\n"
+                    continue
+                for symbol, delta in batch.items():
+                    yield self._event("quote", {"symbol": symbol, **delta})
+        finally:
+            self.unsubscribe(subscription)
+
+    async def _snapshot(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        銘柄の現在値を取得（配信中の銘柄は配信済みの値を使い、同時に購読を始めた接続は取得を共有する）
+        """
+        quote = self._last_quotes.get(symbol)
+        if quote is not None:
+            return quote
+
+        task = self._loading.get(symbol)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(yahoo_finance_service.get_stock_info(symbol))
+            self._loading[symbol] = task
+            task.add_done_callback(lambda _: self._loading.pop(symbol, None))
+
+        stock_info = await asyncio.shield(task)
+        if not stock_info:
+            return None
+        # 取得中に配信された値があればそちらを優先する
+        if symbol in self._subscribers:
+            return self._last_quotes.setdefault(symbol, self._quote(stock_info))
+        return self._quote(stock_info)
+
+    @staticmethod
+    def _quote(stock_info: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: stock_info.get(field) for field in QUOTE_FIELDS}
+
+    @staticmethod
+    def _event(event: str, data: Dict[str, Any]) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ブローカーの統計情報を取得
+        """
+        return {
+            "symbols": len(self._subscribers),
+            "subscriptions": len({
+                subscription
+                for subscriptions in self._subscribers.values()
+                for subscription in subscriptions
+            }),
+            "published": self.published
+        }
+
+
+# ブローカーインスタンス
+quote_broadcaster = QuoteBroadcaster()
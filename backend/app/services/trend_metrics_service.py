@@ -0,0 +1,314 @@
+"""
+傾向指標サービス - 保存済みの財務諸表の履歴から複数年の成長性・安定性の指標を計算する
+"""
+from typing import Optional, Dict, Any, List, Iterable
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.services.cache_service import TTLCache
+from app.repositories.trend_repository import trend_repository, TREND_METRIC_FIELDS
+from app.repositories.snapshot_repository import snapshot_repository, SNAPSHOT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# 指標の計算に使う勘定科目（先に書いた勘定科目を優先。モックデータの表記も含む）
+LINE_ITEM_CONCEPTS = {
+    "revenue": ("financials", ["Total Revenue", "Operating Revenue", "Revenue"]),
+    "eps": ("financials", ["Diluted EPS", "Basic EPS", "EPS"]),
+    "net_income": ("financials", ["Net Income", "Net Income Common Stockholders", "NetIncome"]),
+    "operating_income": ("financials", ["Operating Income", "OperatingIncome"]),
+    "free_cash_flow": ("cashflow", ["Free Cash Flow", "FreeCashFlow"]),
+    "equity": ("balance_sheet", ["Stockholders Equity", "Common Stock Equity", "StockholdersEquity"]),
+    "current_assets": ("balance_sheet", ["Current Assets", "Total Current Assets", "CurrentAssets"]),
+    "current_liabilities": ("balance_sheet", ["Current Liabilities", "Total Current Liabilities", "CurrentLiabilities"]),
+    "total_debt": ("balance_sheet", ["Total Debt", "TotalDebt"]),
+    "shares": ("balance_sheet", ["Ordinary Shares Number", "Share Issued", "SharesOutstanding"]),
+}
+
+
+class TrendMetricsService:
+    """財務諸表の履歴から傾向指標を計算・保存するサービス"""
+
+    def __init__(self):
+        # 銘柄ごとの計算済み指標（再計算した銘柄は無効化する）
+        self.cache = TTLCache(
+            ttl_seconds=settings.CACHE_EXPIRY_MINUTES * 60,
+            max_entries=settings.CACHE_MAX_ENTRIES
+        )
+
+    async def get_trend_metrics(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        銘柄の傾向指標を取得
+
+        Args:
+            symbol: 株式ティッカーシンボル
+
+        Returns:
+            傾向指標の辞書、未計算の場合はNone
+        """
+        symbol = symbol.upper()
+
+        async def load() -> Optional[Dict[str, Any]]:
+            stored = await trend_repository.get_many([symbol])
+            return stored.get(symbol)
+
+        return await self.cache.get_or_fetch(symbol, load)
+
+    async def get_trend_metrics_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数銘柄の傾向指標をまとめて取得（キャッシュに無い銘柄は1回のクエリで取得）
+
+        Args:
+            symbols: 株式ティッカーシンボルのリスト
+
+        Returns:
+            シンボルをキーとした傾向指標の辞書
+        """
+        results = {}
+        missing = []
+        for symbol in dict.fromkeys(symbol.upper() for symbol in symbols):
+            cached = self.cache.get(symbol)
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+
+        if missing:
+            stored = await trend_repository.get_many(missing)
+            for symbol, metrics in stored.items():
+                self.cache.set(symbol, metrics)
+                results[symbol] = metrics
+        return results
+
+    async def refresh_changed(self, symbols: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        財務諸表が前回の計算以降に変わった銘柄の指標を再計算し、キャッシュを無効化
+
+        Args:
+            symbols: 対象の株式ティッカーシンボル（Noneの場合は全銘柄）
+
+        Returns:
+            再計算した銘柄のシンボルのリスト
+        """
+        symbols = list(symbols) if symbols is not None else None
+        recomputed = await self.recompute_changed(symbols)
+        for symbol in recomputed:
+            self.cache.invalidate(symbol)
+        return recomputed
+
+    async def recompute_changed(self, symbols: Optional[List[str]] = None) -> List[str]:
+        """
+        財務諸表が変わった銘柄の指標だけを計算して保存（計算はスレッドプールで実行する）
+
+        Args:
+            symbols: 対象の株式ティッカーシンボル（Noneの場合は全銘柄）
+
+        Returns:
+            再計算した銘柄のシンボルのリスト
+        """
+        changed = await trend_repository.get_changed(symbols)
+        if not changed:
+            return []
+
+        items = pd.DataFrame(
+            await trend_repository.get_items(changed.keys()),
+            columns=["stock_id", "statement", "line_item", "period_end", "value"]
+        )
+        metrics = (await asyncio.to_thread(self.compute_frame, items)).reindex(list(changed.keys()))
+
+        rows = []
+        for stock_id, values in zip(metrics.index, metrics.to_dict("records")):
+            row = {"stock_id": int(stock_id), "source_signature": changed[stock_id][1]}
+            for field in TREND_METRIC_FIELDS:
+                value = values.get(field)
+                row[field] = None if value is None or not np.isfinite(value) else float(value)
+            row["periods"] = int(row["periods"]) if row["periods"] is not None else 0
+            rows.append(row)
+
+        await trend_repository.upsert_many(rows)
+        logger.debug(f"Recomputed trend metrics for {len(rows)} stocks")
+
+        # バックテスト用に決算期ごとの指標をスナップショットとして保存
+        try:
+            snapshots = await asyncio.to_thread(self.compute_snapshots, items)
+            await snapshot_repository.upsert_statement_snapshots(snapshots)
+        except Exception as e:
+            logger.error(f"Error saving statement snapshots: {str(e)}")
+        return [symbol for symbol, _ in changed.values()]
+
+    def compute_frame(self, items: pd.DataFrame) -> pd.DataFrame:
+        """
+        財務諸表の明細（縦持ち）から銘柄ごとの傾向指標を一括計算
+
+        Args:
+            items: stock_id, statement, line_item, period_end, valueを列に持つDataFrame
+
+        Returns:
+            TREND_METRIC_FIELDSを列に持つDataFrame（インデックスはstock_id）
+        """
+        wide = self._wide_frame(items)
+        if wide is None:
+            return pd.DataFrame(columns=TREND_METRIC_FIELDS, index=pd.Index([], name="stock_id"))
+
+        # 比率の計算（分母が正の場合のみ）
+        revenue = wide["revenue"].where(wide["revenue"] > 0)
+        equity = wide["equity"].where(wide["equity"] > 0)
+        wide["operating_margin"] = wide["operating_income"] / revenue
+        wide["net_margin"] = wide["net_income"] / revenue
+        wide["fcf_margin"] = wide["free_cash_flow"] / revenue
+        wide["roe"] = wide["net_income"] / equity
+        wide["years"] = (
+            wide["period_end"] - wide.groupby("stock_id")["period_end"].transform("min")
+        ).dt.days / 365.25
+
+        grouped = wide.groupby("stock_id")
+        metrics = pd.DataFrame(index=grouped.size().index)
+        metrics["periods"] = grouped.size()
+
+        # 成長性
+        metrics["revenue_cagr"] = self._cagr(wide, "revenue")
+        metrics["eps_cagr"] = self._cagr(wide, "eps")
+        revenue_change = wide.dropna(subset=["revenue"]).groupby("stock_id")["revenue"].diff().dropna()
+        metrics["revenue_growth_consistency"] = (
+            (revenue_change > 0).groupby(wide.loc[revenue_change.index, "stock_id"]).mean()
+        )
+
+        # 収益性の安定度（2期以上ある場合のみ）
+        metrics["operating_margin_mean"] = grouped["operating_margin"].mean()
+        metrics["operating_margin_volatility"] = self._volatility(grouped, "operating_margin")
+        metrics["net_margin_volatility"] = self._volatility(grouped, "net_margin")
+
+        # キャッシュフロー
+        fcf = wide.dropna(subset=["free_cash_flow"])
+        metrics["fcf_consistency"] = (fcf["free_cash_flow"] > 0).groupby(fcf["stock_id"]).mean()
+        metrics["fcf_margin_mean"] = grouped["fcf_margin"].mean()
+
+        # ROE
+        metrics["roe_mean"] = grouped["roe"].mean()
+        metrics["roe_trend"] = self._slope(wide, "roe")
+
+        return metrics.reindex(columns=TREND_METRIC_FIELDS)
+
+    def compute_snapshots(
+        self,
+        items: pd.DataFrame,
+        lag_days: int = settings.BACKTEST_REPORTING_LAG_DAYS
+    ) -> List[Dict[str, Any]]:
+        """
+        財務諸表の明細から決算期ごとの指標スナップショットを一括計算
+
+        決算期末から開示までの期間（lag_days）を空けた日付を利用可能になった日とする。
+        株価に依存するPER・時価総額は評価日の株価から計算するため、EPSと発行済株式数を保存する。
+
+        Args:
+            items: stock_id, statement, line_item, period_end, valueを列に持つDataFrame
+            lag_days: 決算期末から開示までの日数
+
+        Returns:
+            stock_id, as_ofとSNAPSHOT_FIELDSを含む辞書のリスト
+        """
+        wide = self._wide_frame(items)
+        if wide is None:
+            return []
+
+        revenue = wide["revenue"].where(wide["revenue"] > 0)
+        equity = wide["equity"].where(wide["equity"] > 0)
+        current_liabilities = wide["current_liabilities"].where(wide["current_liabilities"] > 0)
+
+        snapshots = pd.DataFrame({
+            "stock_id": wide["stock_id"].astype(int),
+            "as_of": (wide["period_end"] + pd.Timedelta(days=lag_days)).dt.date,
+            "eps": wide["eps"],
+            "shares_outstanding": wide["shares"].where(wide["shares"] > 0),
+            "roe": wide["net_income"] / equity,
+            "debt_to_equity": wide["total_debt"] / equity * 100,
+            "current_ratio": wide["current_assets"] / current_liabilities,
+            "profit_margin": wide["net_income"] / revenue
+        }).reindex(columns=["stock_id", "as_of"] + SNAPSHOT_FIELDS)
+
+        values = snapshots[SNAPSHOT_FIELDS].astype(float)
+        snapshots[SNAPSHOT_FIELDS] = values.where(np.isfinite(values)).astype(object)
+        snapshots = snapshots[values.notna().any(axis=1)]
+        return snapshots.where(snapshots.notna(), None).to_dict("records")
+
+    @staticmethod
+    def _wide_frame(items: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        財務諸表の明細（縦持ち）を、決算期ごとに1行・指標の元になる勘定科目を列に持つ表に変換
+
+        Returns:
+            stock_id, period_endとLINE_ITEM_CONCEPTSのキーを列に持つDataFrame、該当する明細が無い場合はNone
+        """
+        concepts = list(LINE_ITEM_CONCEPTS.keys())
+        aliases = pd.DataFrame(
+            [
+                (statement, line_item, concept, priority)
+                for concept, (statement, line_items) in LINE_ITEM_CONCEPTS.items()
+                for priority, line_item in enumerate(line_items)
+            ],
+            columns=["statement", "line_item", "concept", "priority"]
+        )
+
+        matched = (
+            items.dropna(subset=["value"])
+            .merge(aliases, on=["statement", "line_item"])
+            .sort_values("priority")
+            .drop_duplicates(["stock_id", "concept", "period_end"])
+        )
+        if matched.empty:
+            return None
+
+        matched["period_end"] = pd.to_datetime(matched["period_end"])
+        return (
+            matched.pivot_table(
+                index=["stock_id", "period_end"],
+                columns="concept",
+                values="value",
+                aggfunc="first"
+            )
+            .reindex(columns=concepts)
+            .sort_index()
+            .reset_index()
+        )
+
+    @staticmethod
+    def _cagr(wide: pd.DataFrame, column: str) -> pd.Series:
+        """
+        最初と最後の決算期の値から年平均成長率を計算（両端が正の値の場合のみ）
+        """
+        valid = wide.dropna(subset=[column]).groupby("stock_id")
+        first = valid[column].first()
+        last = valid[column].last()
+        years = (valid["period_end"].max() - valid["period_end"].min()).dt.days / 365.25
+
+        usable = (first > 0) & (last > 0) & (years > 0)
+        ratio = (last / first).where(usable)
+        return ratio ** (1 / years.where(usable)) - 1
+
+    @staticmethod
+    def _volatility(grouped: Any, column: str) -> pd.Series:
+        """
+        標準偏差（母標準偏差）を計算（2期以上ある場合のみ）
+        """
+        return grouped[column].std(ddof=0).where(grouped[column].count() >= 2)
+
+    @staticmethod
+    def _slope(wide: pd.DataFrame, column: str) -> pd.Series:
+        """
+        経過年数に対する回帰直線の傾きを計算（2期以上ある場合のみ）
+        """
+        valid = wide.dropna(subset=[column])
+        grouped = valid.groupby("stock_id")
+        x = valid["years"] - grouped["years"].transform("mean")
+        y = valid[column] - grouped[column].transform("mean")
+        numerator = (x * y).groupby(valid["stock_id"]).sum()
+        denominator = (x * x).groupby(valid["stock_id"]).sum()
+        return (numerator / denominator.where(denominator > 0)).where(grouped.size() >= 2)
+
+
+# サービスインスタンス
+trend_metrics_service = TrendMetricsService()
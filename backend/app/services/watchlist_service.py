@@ -0,0 +1,181 @@
+"""
+ウォッチリストサービス - ウォッチリストの管理と、登録銘柄の現在値・スコアの一括取得
+"""
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+import time
+import logging
+
+from app.schemas.watchlist import WatchListSnapshotItem, WatchListSnapshotResponse
+from app.services.yahoo_finance_service import yahoo_finance_service
+from app.services.alert_service import price_alert_engine
+from app.repositories.watchlist_repository import watchlist_repository
+
+logger = logging.getLogger(__name__)
+
+
+class WatchListService:
+    """ウォッチリストを扱うサービス"""
+
+    async def list_watchlists(self) -> List[Dict[str, Any]]:
+        """
+        全ウォッチリストを取得
+        """
+        return await watchlist_repository.list_watchlists()
+
+    async def get_watchlist(self, watch_list_id: int) -> Optional[Dict[str, Any]]:
+        """
+        ウォッチリストを登録銘柄とともに取得
+        """
+        return await watchlist_repository.get_watchlist(watch_list_id)
+
+    async def create_watchlist(self, name: str, description: Optional[str] = None) -> Dict[str, Any]:
+        """
+        ウォッチリストを作成
+        """
+        return await watchlist_repository.create_watchlist(name, description)
+
+    async def update_watchlist(self, watch_list_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        ウォッチリストを更新
+        """
+        return await watchlist_repository.update_watchlist(watch_list_id, fields)
+
+    async def delete_watchlist(self, watch_list_id: int) -> bool:
+        """
+        ウォッチリストを削除
+        """
+        deleted = await watchlist_repository.delete_watchlist(watch_list_id)
+        if deleted:
+            await price_alert_engine.rebuild()
+        return deleted
+
+    async def add_item(
+        self,
+        watch_list_id: int,
+        symbol: str,
+        fields: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        ウォッチリストに銘柄を追加
+
+        Args:
+            watch_list_id: ウォッチリストID
+            symbol: 株式ティッカーシンボル
+            fields: アイテムの設定（notes, target_price, stop_loss_price）
+
+        Returns:
+            追加したアイテムの辞書、ウォッチリストが存在しない場合はNone
+
+        Raises:
+            LookupError: 銘柄の情報が見つからない場合
+        """
+        # 存在しない銘柄は登録しない（取得した情報は書き込みキュー経由でstocksテーブルに反映される）
+        if not await yahoo_finance_service.get_stock_info(symbol):
+            raise LookupError(symbol)
+
+        item = await watchlist_repository.add_item(watch_list_id, symbol, fields)
+        if item is not None:
+            await price_alert_engine.reload([item["symbol"]])
+        return item
+
+    async def update_item(
+        self,
+        watch_list_id: int,
+        item_id: int,
+        fields: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        ウォッチリストのアイテムを更新
+        """
+        item = await watchlist_repository.update_item(watch_list_id, item_id, fields)
+        if item is not None:
+            await price_alert_engine.reload([item["symbol"]])
+        return item
+
+    async def remove_item(self, watch_list_id: int, item_id: int) -> bool:
+        """
+        ウォッチリストからアイテムを削除
+        """
+        item = await watchlist_repository.get_item(watch_list_id, item_id)
+        if item is None:
+            return False
+
+        removed = await watchlist_repository.remove_item(watch_list_id, item_id)
+        if removed:
+            await price_alert_engine.reload([item["symbol"]])
+        return removed
+
+    async def snapshot(self, watch_list_id: int) -> Optional[WatchListSnapshotResponse]:
+        """
+        ウォッチリストの全銘柄の現在値・スコア・目標株価との乖離を取得
+
+        アイテムと銘柄は1回の読み込み（一括ロード）で取得し、株式情報は全銘柄まとめて
+        取得してから、スコアを一括計算する。
+
+        Args:
+            watch_list_id: ウォッチリストID
+
+        Returns:
+            スナップショット、ウォッチリストが存在しない場合はNone
+        """
+        start_time = time.time()
+
+        watch_list = await self.get_watchlist(watch_list_id)
+        if watch_list is None:
+            return None
+
+        symbols = [item["symbol"] for item in watch_list["items"]]
+        stock_infos, errors = await yahoo_finance_service.get_stock_info_batch(symbols)
+        scores = yahoo_finance_service.calculate_financial_scores(list(stock_infos.values()))
+
+        items = [
+            self._snapshot_item(item, stock_infos.get(item["symbol"]), scores.get(item["symbol"]), errors)
+            for item in watch_list["items"]
+        ]
+
+        return WatchListSnapshotResponse(
+            id=watch_list["id"],
+            name=watch_list["name"],
+            description=watch_list["description"],
+            items=items,
+            total_items=len(items),
+            execution_time=time.time() - start_time,
+            last_updated=datetime.now().isoformat()
+        )
+
+    @staticmethod
+    def _snapshot_item(
+        item: Dict[str, Any],
+        stock_info: Optional[Dict[str, Any]],
+        score_data: Optional[Dict[str, Any]],
+        errors: Dict[str, str]
+    ) -> WatchListSnapshotItem:
+        """
+        1アイテム分のスナップショットを作成
+        """
+        if not stock_info:
+            return WatchListSnapshotItem(**item, error=errors.get(item["symbol"]))
+
+        current_price = stock_info.get("current_price")
+        target_price = item["target_price"]
+        stop_loss_price = item["stop_loss_price"]
+
+        snapshot = WatchListSnapshotItem(
+            **{**item, "name": stock_info.get("name") or item["name"]},
+            current_price=current_price,
+            score=score_data.get("overall_score") if score_data else None,
+            is_stale=stock_info.get("is_stale", False)
+        )
+        if current_price:
+            if target_price is not None:
+                snapshot.target_distance = target_price - current_price
+                snapshot.target_distance_percent = (target_price - current_price) / current_price
+            if stop_loss_price is not None:
+                snapshot.stop_loss_distance = current_price - stop_loss_price
+                snapshot.stop_loss_distance_percent = (current_price - stop_loss_price) / current_price
+        return snapshot
+
+
+# サービスインスタンス
+watchlist_service = WatchListService()
@@ -1,22 +1,57 @@
 import yfinance as yf
 import pandas as pd
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+import numpy as np
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterable
+from datetime import datetime, timedelta, date
+from functools import partial
+from collections import Counter
 import asyncio
+import re
+import time
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
 from app.config import settings
 from app.services.mock_data_service import mock_data_service
+from app.services.cache_service import TTLCache
+from app.services.rate_limiter import AsyncTokenBucket
+from app.services.metrics_service import metrics
+from app.services.scoring_service import financial_scoring_service
+from app.services.trend_metrics_service import trend_metrics_service
+from app.services.buffett_score_service import buffett_score_service
+from app.services.peer_aggregate_service import peer_aggregate_service
+from app.repositories.stock_repository import stock_repository, stock_write_queue
+from app.repositories.price_repository import price_repository
+from app.repositories.financial_repository import financial_repository, STATEMENTS
 
 logger = logging.getLogger(__name__)
 
+# 履歴データの列（列形式レスポンスの配列名）
+HISTORY_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
 class YahooFinanceService:
     """Yahoo Finance APIを使用した株式データ取得サービス"""
     
     def __init__(self):
         self.rate_limit = settings.YAHOO_API_RATE_LIMIT
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.rate_limiter = AsyncTokenBucket(
+            rate=self.rate_limit,
+            capacity=settings.YAHOO_API_BURST
+        )
+        self.executor = ThreadPoolExecutor(max_workers=settings.YAHOO_MAX_WORKERS)
+        self.cache = TTLCache(
+            ttl_seconds=settings.CACHE_EXPIRY_MINUTES * 60,
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            stale_ttl_seconds=settings.CACHE_STALE_GRACE_MINUTES * 60,
+            age_of=self.data_age_seconds
+        )
+        # シンボルごとのTickerと存在確認結果（イベントループ上でのみ操作する）
+        self.tickers = TTLCache(
+            ttl_seconds=settings.TICKER_REGISTRY_TTL_MINUTES * 60,
+            max_entries=settings.TICKER_REGISTRY_MAX_ENTRIES
+        )
+        # 取得できたシンボルごとの直近の要求回数（定期更新の優先度に使用し、更新周期ごとに半減させる）
+        self.demand: Counter = Counter()
     
     async def get_stock_info(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
@@ -26,7 +61,314 @@ class YahooFinanceService:
             symbol: 株式ティッカーシンボル
             
         Returns:
-            株式情報の辞書、取得失敗時はNone
+            株式情報の辞書（data_age_seconds・is_staleを含む）、取得失敗時はNone
+            
+        有効期限切れでも猶予期間内であれば最後に取得した値を即座に返し、
+        再取得はバックグラウンドで1回だけ行う。
+        """
+        stock_info = await self.cache.get_or_revalidate(
+            ("stock_info", symbol.upper(), None),
+            lambda: self._load_stock_info(symbol, allow_stale=True),
+            lambda: self._load_stock_info(symbol)
+        )
+        if not stock_info:
+            return None
+        self.demand[symbol.upper()] += 1
+        return self._with_data_age(stock_info)
+    
+    async def get_stock_info_batch(
+        self,
+        symbols: List[str],
+        concurrency: int = settings.SCREENING_CONCURRENCY
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """
+        複数銘柄の基本情報をまとめて取得
+        
+        キャッシュに無い銘柄はデータベースを1回のクエリで参照し、
+        それでも不足する銘柄だけを同時取得数を制限してデータソースから取得する。
+        
+        Args:
+            symbols: 株式ティッカーシンボルのリスト
+            concurrency: データソースへの同時取得数
+            
+        Returns:
+            (シンボルをキーとした株式情報の辞書, シンボルをキーとしたエラーメッセージの辞書)
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        results: Dict[str, Dict[str, Any]] = {}
+        
+        # キャッシュから取得（猶予期間内の期限切れの値はバックグラウンドで再取得）
+        missing = []
+        for symbol in symbols:
+            cached = self.cache.get_revalidating(
+                ("stock_info", symbol, None),
+                partial(self._load_stock_info, symbol)
+            )
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+        
+        # データベースからまとめて取得
+        stored: Dict[str, Dict[str, Any]] = {}
+        if missing:
+            try:
+                stored = await stock_repository.get_many(missing)
+            except Exception as e:
+                logger.error(f"Error reading stored stock info: {str(e)}")
+        
+        to_fetch = []
+        for symbol in missing:
+            stock_info = stored.get(symbol)
+            if stock_info and stock_repository.is_fresh(stock_info):
+                self.cache.set(("stock_info", symbol, None), stock_info)
+                results[symbol] = stock_info
+            elif stock_info and self._within_grace(stock_info):
+                self.cache.set(("stock_info", symbol, None), stock_info)
+                self.cache.revalidate(
+                    ("stock_info", symbol, None),
+                    partial(self._load_stock_info, symbol)
+                )
+                results[symbol] = stock_info
+            else:
+                to_fetch.append(symbol)
+        
+        # 残りをデータソースから並行取得
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def fetch_one(symbol: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.cache.get_or_fetch(
+                    ("stock_info", symbol, None),
+                    lambda: self._refresh_stock_info(symbol, stored.get(symbol))
+                )
+        
+        fetched = await asyncio.gather(*(fetch_one(symbol) for symbol in to_fetch))
+        for symbol, stock_info in zip(to_fetch, fetched):
+            if stock_info:
+                results[symbol] = stock_info
+        
+        # リクエスト順に並べ直し、取得できなかった銘柄をエラーとして返す
+        ordered = {
+            symbol: self._with_data_age(results[symbol])
+            for symbol in symbols if symbol in results
+        }
+        errors = {
+            symbol: f"株式 '{symbol}' の情報が見つかりません"
+            for symbol in symbols if symbol not in results
+        }
+        self.demand.update(ordered.keys())
+        return ordered, errors
+    
+    async def get_financial_data(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        株式の財務データを取得
+        
+        Args:
+            symbol: 株式ティッカーシンボル
+            
+        Returns:
+            財務データの辞書、取得失敗時はNone
+        """
+        financial_data = await self.cache.get_or_fetch(
+            ("financial_data", symbol.upper(), None),
+            lambda: self._load_financial_data(symbol)
+        )
+        if financial_data:
+            self.demand[symbol.upper()] += 1
+        return financial_data
+    
+    async def get_financial_line_item(
+        self,
+        line_item: str,
+        statement: Optional[str] = None,
+        period_end: Optional[date] = None,
+        latest: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        保存済みの財務諸表から勘定科目の値を全銘柄横断で取得（データソースには問い合わせない）
+        
+        Args:
+            line_item: 勘定科目（例: Free Cash Flow）
+            statement: 財務諸表の種類（financials, balance_sheet, cashflow）
+            period_end: 決算期末日
+            latest: Trueの場合は銘柄ごとに最新の決算期のみ
+            
+        Returns:
+            symbol, statement, period_end, valueを含む辞書のリスト
+        """
+        return await financial_repository.get_line_item(
+            line_item,
+            statement,
+            period_end,
+            latest
+        )
+    
+    async def get_historical_data(
+        self, 
+        symbol: str, 
+        period: str = "1y",
+        columnar: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        株式の履歴データを取得
+        
+        Args:
+            symbol: 株式ティッカーシンボル
+            period: 取得期間 (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
+            columnar: Trueの場合は列ごとの配列（Date/Open/High/Low/Close/Volume）で返す
+            
+        Returns:
+            履歴データの辞書、取得失敗時はNone
+        """
+        # キャッシュには列形式で保持する
+        historical_data = await self.cache.get_or_fetch(
+            ("historical_data", symbol.upper(), period),
+            lambda: self._fetch_historical_data(symbol, period)
+        )
+        if historical_data is None:
+            return None
+        self.demand[symbol.upper()] += 1
+        if columnar:
+            return historical_data
+        
+        return {**historical_data, "data": self.columns_to_records(historical_data["data"])}
+    
+    def decay_demand(self, stored_symbols: Iterable[str]) -> None:
+        """
+        要求回数を半減させ、保存済みでない・0になったシンボルを除く（定期更新の周期ごとに呼び出す）
+        
+        Args:
+            stored_symbols: 保存済みの銘柄のシンボル
+        """
+        stored_symbols = set(stored_symbols)
+        self.demand = Counter({
+            symbol: count // 2
+            for symbol, count in self.demand.items()
+            if symbol in stored_symbols and count // 2 > 0
+        })
+    
+    async def refresh_symbol(self, symbol: str, history_period: str = "1y") -> bool:
+        """
+        株式情報・財務データ・履歴データをデータソースから取得し直してキャッシュを更新
+        
+        定期更新用のため、キャッシュの有効期限に関わらず取得する（要求回数には数えない）。
+        
+        Args:
+            symbol: 株式ティッカーシンボル
+            history_period: 更新する履歴データの期間
+            
+        Returns:
+            株式情報を取得できた場合はTrue
+        """
+        symbol = symbol.upper()
+        
+        stock_info = await self._fetch_stock_info(symbol)
+        if stock_info:
+            stock_write_queue.enqueue(stock_info)
+            self.cache.set(("stock_info", symbol, None), stock_info)
+        
+        # 財務諸表は保存済みの明細が更新間隔を過ぎている場合のみ取得し直す
+        financial_data = await self._load_financial_data(symbol)
+        if financial_data:
+            self.cache.set(("financial_data", symbol, None), financial_data)
+        
+        # 株価ストアへの差分追記を兼ねる
+        historical_data = await self._fetch_historical_data(symbol, history_period)
+        if historical_data:
+            self.cache.set(("historical_data", symbol, history_period), historical_data)
+        
+        return stock_info is not None
+    
+    async def calculate_financial_score(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        財務健全性スコアを計算
+        
+        Args:
+            symbol: 株式ティッカーシンボル
+            
+        Returns:
+            財務スコアの辞書、取得失敗時はNone
+        """
+        try:
+            stock_info = await self.get_stock_info(symbol)
+            if not stock_info:
+                return None
+            
+            score_data = self.calculate_financial_scores([stock_info]).get(symbol.upper())
+            if score_data:
+                # スコアの元になった株式情報の鮮度を引き継ぐ
+                score_data["data_age_seconds"] = stock_info["data_age_seconds"]
+                score_data["is_stale"] = stock_info["is_stale"]
+            return score_data
+            
+        except Exception as e:
+            logger.error(f"Error calculating financial score for {symbol}: {str(e)}")
+            return None
+    
+    def calculate_financial_scores(
+        self,
+        stock_infos: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        取得済みの株式情報から財務健全性スコアを一括計算（同期関数）
+        
+        Args:
+            stock_infos: _format_stock_dataで整形済みの株式情報のリスト
+            
+        Returns:
+            シンボルをキーとした財務スコアの辞書
+        """
+        return financial_scoring_service.score_stock_infos(stock_infos)
+    
+    async def _load_stock_info(
+        self,
+        symbol: str,
+        allow_stale: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        株式の基本情報をデータベース優先で取得
+        
+        保存済みの情報が有効期限内であればそれを返し、期限切れ・未保存の場合は
+        データソースから取得して書き込みキューに追加する。
+        allow_stale=Trueの場合は猶予期間内の期限切れの保存データもそのまま返す。
+        """
+        try:
+            stored = await stock_repository.get_by_symbol(symbol)
+        except Exception as e:
+            logger.error(f"Error reading stored stock info for {symbol}: {str(e)}")
+            stored = None
+        
+        if stored and stock_repository.is_fresh(stored):
+            return stored
+        if stored and allow_stale and self._within_grace(stored):
+            return stored
+        
+        return await self._refresh_stock_info(symbol, stored)
+    
+    async def _refresh_stock_info(
+        self,
+        symbol: str,
+        stored: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        株式の基本情報をデータソースから取得して書き込みキューに追加
+        
+        取得できない場合は期限切れの保存データ（stored）で代替する。
+        """
+        stock_info = await self._fetch_stock_info(symbol)
+        if stock_info:
+            stock_write_queue.enqueue(stock_info)
+            return stock_info
+        
+        # データソースから取得できない場合は期限切れの保存データで代替する
+        if stored:
+            logger.warning(f"Serving expired stored stock info for {symbol}")
+        return stored
+    
+    async def _fetch_stock_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        株式の基本情報をデータソースから取得（キャッシュを経由しない）
         """
         try:
             # まずモックデータを試す（開発環境用）
@@ -34,19 +376,22 @@ class YahooFinanceService:
             if mock_info:
                 return self._format_stock_data(symbol, mock_info)
             
-            # Yahoo Finance APIを使用
-            loop = asyncio.get_event_loop()
-            stock = await loop.run_in_executor(
-                self.executor,
-                self._get_stock_data,
-                symbol
-            )
-            
-            if stock is None:
+            # 存在しないことが確認済みのシンボルはAPIを呼び出さない
+            if self._is_known_invalid(symbol):
                 return None
             
-            # 基本情報の取得
-            info = stock.info
+            # Yahoo Finance APIを使用（infoの取得とシンボルの存在確認を1回の呼び出しで行う）
+            # yfinanceはinfoをTickerインスタンス内に保持するため、最新値の取得には新しいTickerを使う
+            stock = yf.Ticker(symbol)
+            info, not_found = await self._call_upstream(self._get_validated_info, stock, method="info")
+            if info is not None:
+                self._register_ticker(symbol, stock, valid=True)
+            elif not_found:
+                # 存在しないことが確定した場合のみ記録する（一時的な取得失敗では記録しない）
+                self._register_ticker(symbol, None, valid=False)
+            
+            if info is None:
+                return None
             
             return self._format_stock_data(symbol, info)
             
@@ -54,104 +399,164 @@ class YahooFinanceService:
             logger.error(f"Error fetching stock info for {symbol}: {str(e)}")
             return None
     
-    async def get_financial_data(self, symbol: str) -> Optional[Dict[str, Any]]:
+    async def _load_financial_data(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
-        株式の財務データを取得
+        株式の財務データをデータベース優先で取得
+        
+        保存済みの明細が更新間隔内であればそれを組み立てて返し、古い・未保存の場合は
+        データソースから取得して明細を更新する。
+        """
+        try:
+            stored = await financial_repository.get_statements(symbol)
+        except Exception as e:
+            logger.error(f"Error reading stored financial data for {symbol}: {str(e)}")
+            stored = None
+        
+        if stored and self._is_financial_store_fresh(stored):
+            return self._strip_fetched_at(stored)
+        
+        refreshed = await self._refresh_financial_data(symbol)
+        if refreshed:
+            return refreshed
+        
+        # データソースから取得できない場合は古い保存データで代替する
+        if stored:
+            logger.warning(f"Serving expired stored financial data for {symbol}")
+            return self._strip_fetched_at(stored)
+        return None
+    
+    async def _refresh_financial_data(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        財務諸表をデータソースから取得して明細を更新し、保存済みの明細から組み立て直す
+        """
+        items = await self._fetch_financial_data(symbol)
+        if not items:
+            return None
+        
+        try:
+            await financial_repository.upsert_items(symbol, items)
+            # 明細が変わった場合のみ傾向指標を再計算する
+            if await trend_metrics_service.refresh_changed([symbol]):
+                peer_aggregate_service.mark_symbols([symbol])
+                buffett_score_service.schedule_refresh()
+            stored = await financial_repository.get_statements(symbol)
+            return self._strip_fetched_at(stored) if stored else None
+        except Exception as e:
+            logger.error(f"Error storing financial data for {symbol}: {str(e)}")
+            return None
+    
+    async def _fetch_financial_data(self, symbol: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        株式の財務諸表をデータソースから明細（縦持ち）で取得（キャッシュ・データベースを経由しない）
         
-        Args:
-            symbol: 株式ティッカーシンボル
-            
         Returns:
-            財務データの辞書、取得失敗時はNone
+            statement, line_item, period_end, valueを含む辞書のリスト、取得失敗時はNone
         """
         try:
             # まずモックデータを試す（開発環境用）
             mock_data = mock_data_service.get_financial_data(symbol)
             if mock_data:
-                return mock_data
-                
-            loop = asyncio.get_event_loop()
-            stock = await loop.run_in_executor(
-                self.executor,
-                self._get_stock_data,
-                symbol
-            )
+                # モックは{決算期: {勘定科目: 値}}の形式のため、データソースと同じ向きに転置する
+                items = []
+                for statement in STATEMENTS:
+                    items.extend(self._statement_to_items(statement, pd.DataFrame(mock_data[statement])))
+                return items
             
-            if stock is None:
+            if self._is_known_invalid(symbol):
                 return None
             
-            # 財務データの取得
-            financials = stock.financials
-            balance_sheet = stock.balance_sheet
-            cashflow = stock.cashflow
+            # 財務諸表もTickerインスタンス内に保持されるため、新しいTickerで取得する
+            # （infoによる存在確認は行わない）
+            stock = yf.Ticker(symbol)
             
-            # データが存在しない場合はNoneを返す
-            if financials.empty and balance_sheet.empty and cashflow.empty:
-                return None
+            # 財務データの取得（3つの財務諸表でそれぞれAPIを呼び出す）
+            financials, balance_sheet, cashflow = await self._call_upstream(
+                self._get_financial_statements,
+                stock,
+                tokens=3,
+                method="financials"
+            )
             
-            financial_data = {
-                "symbol": symbol.upper(),
-                "financials": self._dataframe_to_dict(financials),
-                "balance_sheet": self._dataframe_to_dict(balance_sheet),
-                "cashflow": self._dataframe_to_dict(cashflow),
-                "last_updated": datetime.now().isoformat()
-            }
+            items = []
+            for statement, df in zip(STATEMENTS, (financials, balance_sheet, cashflow)):
+                items.extend(self._statement_to_items(statement, df))
             
-            return financial_data
+            # データが存在しない場合はNoneを返す
+            return items or None
             
         except Exception as e:
             logger.error(f"Error fetching financial data for {symbol}: {str(e)}")
             return None
     
-    async def get_historical_data(
+    async def _fetch_historical_data(
         self, 
         symbol: str, 
         period: str = "1y"
     ) -> Optional[Dict[str, Any]]:
         """
-        株式の履歴データを取得
+        株式の履歴データをローカルの株価ストアから取得（キャッシュを経由しない）
         
-        Args:
-            symbol: 株式ティッカーシンボル
-            period: 取得期間 (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
-            
-        Returns:
-            履歴データの辞書、取得失敗時はNone
+        保存範囲が要求期間に足りない場合は要求期間全体を、保存済みの範囲で足りる場合は
+        最終取得から一定時間経過していれば最終日以降の差分だけをデータソースから取得して追記する。
         """
         try:
-            # まずモックデータを試す（開発環境用）
-            mock_data = mock_data_service.get_historical_data(symbol, period)
-            if mock_data:
-                return mock_data
-                
-            loop = asyncio.get_event_loop()
-            stock = await loop.run_in_executor(
-                self.executor,
-                self._get_stock_data,
-                symbol
+            symbol = symbol.upper()
+            start = self._period_start(period)
+            coverage = await price_repository.get_coverage(symbol)
+            
+            covered = coverage is not None and (
+                coverage["is_full"]
+                or (start is not None and coverage["covered_from"] is not None
+                    and coverage["covered_from"] <= start)
             )
             
-            if stock is None:
-                return None
-            
-            # 履歴データの取得
-            history = stock.history(period=period)
-            
-            if history.empty:
+            if not covered:
+                # 要求期間全体を取得
+                bars, _ = await self._fetch_price_bars(symbol, period=period)
+                if bars is None and coverage is None:
+                    return None
+                if bars is not None:
+                    await price_repository.upsert_bars(
+                        symbol,
+                        bars,
+                        start,
+                        period == "max"
+                    )
+            elif self._is_price_store_stale(coverage):
+                # 最終日以降の差分のみを取得（最終日の足は確定値で上書きする）
+                bars, last_action = await self._fetch_price_bars(symbol, start=coverage["last_date"])
+                if last_action is not None and last_action > coverage["last_date"]:
+                    # 分割・配当で過去の調整済み株価が変わったため、保存済みの範囲全体を取得し直して置き換える
+                    logger.info(f"Refetching price history for {symbol} after corporate action on {last_action}")
+                    if coverage["is_full"] or coverage["covered_from"] is None:
+                        bars, _ = await self._fetch_price_bars(symbol, period="max")
+                    else:
+                        bars, _ = await self._fetch_price_bars(symbol, start=coverage["covered_from"])
+                    if bars is not None:
+                        await price_repository.upsert_bars(
+                            symbol,
+                            bars,
+                            coverage["covered_from"],
+                            coverage["is_full"],
+                            replace=True
+                        )
+                elif bars is not None:
+                    await price_repository.upsert_bars(symbol, bars, None)
+            
+            # 日数指定の期間（5dなど）は営業日ベースの件数、それ以外（ytdを含む）は開始日で切り出す
+            limit = int(period[:-1]) if re.fullmatch(r"\d+d", period) else None
+            columns = await price_repository.get_bars(
+                symbol,
+                None if limit else start,
+                limit
+            )
+            if not columns["Date"]:
                 return None
             
-            # データフレームを辞書に変換
-            history_dict = history.to_dict('records')
-            
-            # 日付をISO形式に変換
-            for record in history_dict:
-                if 'Date' in record:
-                    record['Date'] = record['Date'].isoformat()
-            
             return {
-                "symbol": symbol.upper(),
+                "symbol": symbol,
                 "period": period,
-                "data": history_dict,
+                "data": columns,
                 "last_updated": datetime.now().isoformat()
             }
             
@@ -159,90 +564,248 @@ class YahooFinanceService:
             logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
             return None
     
-    async def calculate_financial_score(self, symbol: str) -> Optional[Dict[str, Any]]:
+    async def _fetch_price_bars(
+        self,
+        symbol: str,
+        period: Optional[str] = None,
+        start: Optional[date] = None
+    ) -> Tuple[Optional[Dict[str, List[Any]]], Optional[date]]:
         """
-        財務健全性スコアを計算
+        日足の株価履歴をデータソースから列形式で取得
+        
+        株価は分割・配当で調整済みのため、取得範囲内の最新の分割・配当の日付も返す
+        （それより前の保存済みの株価は調整の基準が古くなっている）。
         
         Args:
             symbol: 株式ティッカーシンボル
+            period: 取得期間（startを指定しない場合）
+            start: この日付以降を取得
             
         Returns:
-            財務スコアの辞書、取得失敗時はNone
+            (列形式の株価履歴（取得失敗時はNone）, 取得範囲内の最新の分割・配当の日付（無い場合はNone）)
         """
-        try:
-            stock_info = await self.get_stock_info(symbol)
-            if not stock_info:
-                return None
-            
-            # 各指標のスコア計算（0-10のスケール）
-            scores = {}
-            
-            # 負債比率スコア（低いほど良い）
-            debt_equity = stock_info.get("debt_to_equity")
-            if debt_equity is not None:
-                scores["debt_score"] = max(0, 10 - (debt_equity / 100 * 10))
-            
-            # ROEスコア（高いほど良い）
-            roe = stock_info.get("roe")
-            if roe is not None:
-                scores["roe_score"] = min(10, roe * 100)
-            
-            # 流動比率スコア（2.0が理想）
-            current_ratio = stock_info.get("current_ratio")
-            if current_ratio is not None:
-                scores["liquidity_score"] = max(0, 10 - abs(current_ratio - 2.0) * 2)
-            
-            # PERスコア（適正レンジ10-20）
-            pe_ratio = stock_info.get("pe_ratio")
-            if pe_ratio is not None:
-                if 10 <= pe_ratio <= 20:
-                    scores["pe_score"] = 10
-                elif pe_ratio < 10:
-                    scores["pe_score"] = 8
-                else:
-                    scores["pe_score"] = max(0, 10 - (pe_ratio - 20) / 5)
-            
-            # 利益率スコア
-            profit_margin = stock_info.get("profit_margin")
-            if profit_margin is not None:
-                scores["profit_score"] = min(10, profit_margin * 100)
-            
-            # 総合スコア計算
-            valid_scores = [score for score in scores.values() if score is not None]
-            overall_score = sum(valid_scores) / len(valid_scores) if valid_scores else 0
+        # まずモックデータを試す（開発環境用）
+        mock_data = mock_data_service.get_historical_data(symbol, period or "1y", start=start)
+        if mock_data:
+            return mock_data["data"], None
+        
+        if self._is_known_invalid(symbol):
+            return None, None
+        
+        # 登録済みのTickerを再利用する（infoによる存在確認は行わない）
+        stock = self._get_ticker(symbol)
+        
+        # 履歴データの取得
+        if start is not None:
+            fetch = partial(stock.history, start=start.isoformat())
+        else:
+            fetch = partial(stock.history, period=period)
+        history = await self._call_upstream(fetch, method="history")
+        
+        if history.empty:
+            # 空の履歴は一時的な取得失敗や差分が無い場合にも返るため、無効とは記録しない
+            return None, None
+        
+        self._register_ticker(symbol, stock, valid=True)
+        
+        return self._history_to_columns(history), self._last_action_date(history)
+    
+    @staticmethod
+    def _period_start(period: str, today: Optional[date] = None) -> Optional[date]:
+        """
+        取得期間の開始日を計算（maxの場合はNone）
+        """
+        today = today or date.today()
+        if period == "max":
+            return None
+        if period == "ytd":
+            return date(today.year, 1, 1)
+        
+        amount = int(period.rstrip("dmoy"))
+        if period.endswith("mo"):
+            offset = pd.DateOffset(months=amount)
+        elif period.endswith("y"):
+            offset = pd.DateOffset(years=amount)
+        else:
+            # 日数指定は営業日ベースのため、休日を挟んでも足りるよう余裕を持たせる
+            offset = pd.DateOffset(days=amount * 2 + 4)
+        return (pd.Timestamp(today) - offset).date()
+    
+    @staticmethod
+    def _is_price_store_stale(coverage: Dict[str, Any]) -> bool:
+        """
+        保存済みの株価履歴の差分取得が必要かどうか
+        """
+        last_fetched_at = coverage.get("last_fetched_at")
+        if last_fetched_at is None:
+            return True
+        return datetime.now() - last_fetched_at > timedelta(minutes=settings.PRICE_STORE_REFRESH_MINUTES)
+    
+    async def _call_upstream(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        tokens: int = 1,
+        method: str = "other"
+    ) -> Any:
+        """
+        レート制限を通してから、スレッドプールでAPI呼び出しを実行
+        
+        レート制限の待ち時間・スレッドの空き待ち時間・実行時間をmethodごとに記録する。
+        
+        Args:
+            func: 実行する同期関数
+            *args: 関数の引数
+            tokens: 消費するトークン数（関数内で行われるAPI呼び出し回数）
+            method: メトリクスに記録する呼び出しの種類
             
-            return {
-                "symbol": symbol.upper(),
-                "overall_score": round(overall_score, 2),
-                "detailed_scores": scores,
-                "last_updated": datetime.now().isoformat()
-            }
+        Returns:
+            関数の戻り値
             
-        except Exception as e:
-            logger.error(f"Error calculating financial score for {symbol}: {str(e)}")
+        Raises:
+            RateLimitTimeoutError: 待機期限内にトークンを取得できない場合
+        """
+        try:
+            waited = await self.rate_limiter.acquire(tokens, timeout=settings.YAHOO_API_QUEUE_TIMEOUT)
+        except Exception:
+            metrics.upstream_calls.inc(method, "rate_limited")
+            raise
+        metrics.upstream_rate_limit_wait.observe(waited, method)
+        
+        submitted = time.perf_counter()
+        
+        def timed() -> Any:
+            started = time.perf_counter()
+            metrics.executor_queue_wait.observe(started - submitted, method)
+            try:
+                return func(*args)
+            finally:
+                metrics.upstream_duration.observe(time.perf_counter() - started, method)
+        
+        loop = asyncio.get_event_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, timed)
+        except Exception:
+            metrics.upstream_calls.inc(method, "error")
+            raise
+        metrics.upstream_calls.inc(method, "success")
+        return result
+    
+    def executor_queue_depth(self) -> int:
+        """
+        スレッドの空きを待っているAPI呼び出しの数
+        """
+        return self.executor._work_queue.qsize()
+    
+    def _get_financial_statements(
+        self,
+        stock: yf.Ticker
+    ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        損益計算書・貸借対照表・キャッシュフロー計算書を取得（同期関数）
+        """
+        return stock.financials, stock.balance_sheet, stock.cashflow
+    
+    def _get_ticker(self, symbol: str) -> yf.Ticker:
+        """
+        登録済みのTickerを取得し、未登録の場合は新しく作成して登録
+        """
+        entry = self.tickers.get(symbol.upper())
+        if entry is not None and entry["ticker"] is not None:
+            return entry["ticker"]
+        
+        stock = yf.Ticker(symbol)
+        self._register_ticker(symbol, stock, valid=self._ticker_validity(symbol))
+        return stock
+    
+    def _register_ticker(self, symbol: str, stock: Optional[yf.Ticker], valid: Optional[bool]) -> None:
+        """
+        Tickerとシンボルの存在確認結果を登録
+        """
+        self.tickers.set(symbol.upper(), {"ticker": stock, "valid": valid, "checked_at": time.monotonic()})
+    
+    def _ticker_validity(self, symbol: str) -> Optional[bool]:
+        """
+        シンボルの存在確認結果を取得（未確認の場合はNone）
+        
+        存在しないという結果はTICKER_INVALID_TTL_MINUTESを過ぎると未確認として扱う。
+        """
+        entry = self.tickers.get(symbol.upper())
+        if entry is None:
+            return None
+        if entry["valid"] is False and (
+            time.monotonic() - entry["checked_at"] > settings.TICKER_INVALID_TTL_MINUTES * 60
+        ):
             return None
+        return entry["valid"]
     
-    def _get_stock_data(self, symbol: str) -> Optional[yf.Ticker]:
+    def _is_known_invalid(self, symbol: str) -> bool:
         """
-        yfinanceを使用して株式データを取得（同期関数）
+        存在しないことが確認済みのシンボルかどうか
         """
-        try:
-            stock = yf.Ticker(symbol)
-            # データの存在確認 - infoが空辞書や不正な場合をチェック
-            info = stock.info
-            if not info or len(info) < 5:  # 最小限のフィールドが存在するかチェック
-                logger.warning(f"Insufficient data for symbol {symbol}")
-                return None
+        return self._ticker_validity(symbol) is False
+    
+    def _get_validated_info(self, stock: yf.Ticker) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        yfinanceを使用して株式情報を取得し、シンボルの存在を確認（同期関数）
+        
+        Returns:
+            (株式情報（不十分な場合はNone）, シンボルが存在しないことが確定したかどうか)
+        """
+        symbol = stock.ticker
+        
+        # データの存在確認 - infoが空辞書や不正な場合をチェック
+        info = stock.info
+        # 銘柄の種類・シンボルのどちらも無い場合のみ、存在しないシンボルと判定する
+        not_found = not info or (not info.get('quoteType') and not info.get('symbol'))
+        if not info or len(info) < 5:  # 最小限のフィールドが存在するかチェック
+            logger.warning(f"Insufficient data for symbol {symbol}")
+            return None, not_found
+        
+        # シンボルが実際に存在するかの確認
+        if info.get('regularMarketPrice') is None and info.get('currentPrice') is None:
+            logger.warning(f"No price data found for symbol {symbol}")
+            return None, not_found
             
-            # シンボルが実際に存在するかの確認
-            if info.get('regularMarketPrice') is None and info.get('currentPrice') is None:
-                logger.warning(f"No price data found for symbol {symbol}")
-                return None
-                
-            return stock
-        except Exception as e:
-            logger.error(f"Error creating ticker for {symbol}: {str(e)}")
-            return None
+        return info, False
+    
+    @staticmethod
+    def data_age_seconds(data: Dict[str, Any]) -> float:
+        """
+        取得済みデータのlast_updatedからの経過秒数（last_updatedが無い場合は0）
+        """
+        last_updated = data.get("last_updated") if isinstance(data, dict) else None
+        if not last_updated:
+            return 0.0
+        try:
+            updated_at = datetime.fromisoformat(last_updated)
+        except ValueError:
+            return 0.0
+        if updated_at.tzinfo is not None:
+            updated_at = updated_at.astimezone().replace(tzinfo=None)
+        return max(0.0, (datetime.now() - updated_at).total_seconds())
+    
+    def _within_grace(self, stock_info: Dict[str, Any]) -> bool:
+        """
+        有効期限切れ後の猶予期間内（期限切れの値として返してよい）かどうか
+        
+        データソースから一度も取得していない保存データ（財務諸表の保存時に追加された行等）は対象外とする。
+        """
+        if "last_api_fetch" in stock_info and stock_info["last_api_fetch"] is None:
+            return False
+        hard_limit = (settings.CACHE_EXPIRY_MINUTES + settings.CACHE_STALE_GRACE_MINUTES) * 60
+        return self.data_age_seconds(stock_info) <= hard_limit
+    
+    def _with_data_age(self, stock_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        株式情報に経過秒数と期限切れかどうかを付与したコピーを返す（キャッシュ上の値は変更しない）
+        """
+        age = self.data_age_seconds(stock_info)
+        return {
+            **stock_info,
+            "data_age_seconds": round(age, 1),
+            "is_stale": age > settings.CACHE_EXPIRY_MINUTES * 60
+        }
     
     def _format_stock_data(self, symbol: str, info: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -279,25 +842,92 @@ class YahooFinanceService:
             "last_updated": datetime.now().isoformat()
         }
     
-    def _dataframe_to_dict(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _history_to_columns(self, history: pd.DataFrame) -> Dict[str, List[Any]]:
+        """
+        履歴データのDataFrameを列ごとの配列に変換（NaNはNoneに置き換える）
+        """
+        # 日足のため日付のみを保持する（取引所の現地日付）
+        columns: Dict[str, List[Any]] = {
+            "Date": [day.isoformat() for day in history.index.date]
+        }
+        for column in HISTORY_COLUMNS[1:]:
+            if column not in history:
+                columns[column] = [None] * len(history)
+                continue
+            values = history[column].to_numpy(dtype=float)
+            missing = np.isnan(values)
+            if missing.any():
+                columns[column] = np.where(missing, None, values).tolist()
+            elif column == "Volume":
+                columns[column] = values.astype(np.int64).tolist()
+            else:
+                columns[column] = values.tolist()
+        return columns
+    
+    @staticmethod
+    def _last_action_date(history: pd.DataFrame) -> Optional[date]:
+        """
+        履歴データに含まれる最新の分割・配当の日付（無い場合はNone）
         """
-        DataFrameを辞書に変換
+        actions = [history[column] for column in ("Dividends", "Stock Splits") if column in history]
+        if not actions:
+            return None
+        has_action = (pd.concat(actions, axis=1).fillna(0) != 0).any(axis=1).to_numpy()
+        if not has_action.any():
+            return None
+        return history.index[has_action][-1].date()
+    
+    @staticmethod
+    def columns_to_records(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """
+        列ごとの配列を1行ずつの辞書のリストに変換
+        """
+        names = list(columns.keys())
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+    
+    @staticmethod
+    def _statement_to_items(statement: str, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        財務諸表のDataFrame（行: 勘定科目、列: 決算期）を明細のリストに変換
+        
+        値・決算期が欠損しているセルは除外する。
         """
         try:
-            if df.empty:
-                return {}
-            
-            # インデックスを文字列に変換
-            df_copy = df.copy()
-            df_copy.index = df_copy.index.astype(str)
-            
-            # 列名を文字列に変換
-            df_copy.columns = df_copy.columns.astype(str)
-            
-            return df_copy.to_dict()
+            if df is None or df.empty:
+                return []
+            
+            values = df.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+            periods = pd.to_datetime(pd.Index(df.columns).astype(str), errors="coerce")
+            rows, cols = np.nonzero(~np.isnan(values) & ~np.asarray(periods.isna())[np.newaxis, :])
+            
+            line_items = [str(line_item) for line_item in df.index]
+            period_ends = [period.date() if not pd.isna(period) else None for period in periods]
+            return [
+                {
+                    "statement": statement,
+                    "line_item": line_items[row],
+                    "period_end": period_ends[col],
+                    "value": float(values[row, col])
+                }
+                for row, col in zip(rows.tolist(), cols.tolist())
+            ]
         except Exception as e:
-            logger.error(f"Error converting dataframe to dict: {str(e)}")
-            return {}
+            logger.error(f"Error converting {statement} to line items: {str(e)}")
+            return []
+    
+    @staticmethod
+    def _is_financial_store_fresh(stored: Dict[str, Any]) -> bool:
+        """
+        保存済みの財務諸表が更新間隔内かどうか
+        """
+        fetched_at = stored.get("fetched_at")
+        if fetched_at is None:
+            return False
+        return datetime.now() - fetched_at <= timedelta(hours=settings.FINANCIAL_STORE_REFRESH_HOURS)
+    
+    @staticmethod
+    def _strip_fetched_at(stored: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in stored.items() if key != "fetched_at"}
 
 # サービスインスタンス
 yahoo_finance_service = YahooFinanceService()
\ No newline at end of file
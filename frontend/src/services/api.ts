@@ -1,12 +1,31 @@
 import axios, { AxiosInstance, AxiosResponse } from 'axios';
 import {
   StockInfo,
+  BatchStockInfo,
   FinancialData,
+  FinancialLineItem,
   HistoricalData,
+  HistoricalColumnarData,
   FinancialScore,
+  TrendMetrics,
+  TechnicalIndicators,
+  BatchTechnicalIndicators,
+  BuffettScore,
+  BuffettShortlist,
+  PeerGroupList,
+  RelativeMetrics,
   ScreeningRequest,
   ScreeningResponse,
   SearchResult,
+  WatchList,
+  WatchListItem,
+  WatchListItemInput,
+  WatchListSnapshot,
+  PriceAlert,
+  PriceAlertList,
+  QuoteUpdate,
+  BacktestRequest,
+  BacktestJob,
   ApiError
 } from '../types/stock';
 
@@ -70,6 +89,31 @@ export class StockAPIService {
     }
   }
 
+  /**
+   * 勘定科目の値を全銘柄横断で取得
+   */
+  static async getFinancialLineItem(
+    lineItem: string,
+    options: { statement?: string; periodEnd?: string; latest?: boolean } = {}
+  ): Promise<FinancialLineItem> {
+    try {
+      const response = await apiClient.get<FinancialLineItem>(
+        `/stocks/financial-items/${encodeURIComponent(lineItem)}`,
+        {
+          params: {
+            statement: options.statement,
+            period_end: options.periodEnd,
+            latest: options.latest,
+          }
+        }
+      );
+      return response.data;
+    } catch (error) {
+      console.error(`Error fetching financial line item ${lineItem}:`, error);
+      throw error;
+    }
+  }
+
   /**
    * 株式の履歴データを取得
    */
@@ -85,6 +129,21 @@ export class StockAPIService {
     }
   }
 
+  /**
+   * 株式の履歴データを列形式で取得（長期間のチャート向け）
+   */
+  static async getHistoricalDataColumnar(symbol: string, period: string = '1y'): Promise<HistoricalColumnarData> {
+    try {
+      const response = await apiClient.get<HistoricalColumnarData>(`/stocks/history/${symbol}`, {
+        params: { period, format: 'columnar' }
+      });
+      return response.data;
+    } catch (error) {
+      console.error(`Error fetching historical data for ${symbol}:`, error);
+      throw error;
+    }
+  }
+
   /**
    * 株式の財務スコアを取得
    */
@@ -98,6 +157,119 @@ export class StockAPIService {
     }
   }
 
+  /**
+   * 株式の複数年の傾向指標を取得
+   */
+  static async getTrendMetrics(symbol: string): Promise<TrendMetrics> {
+    try {
+      const response = await apiClient.get<TrendMetrics>(`/stocks/trends/${symbol}`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error fetching trend metrics for ${symbol}:`, error);
+      throw error;
+    }
+  }
+
+  /**
+   * 株式のテクニカル指標を取得
+   * @param indicators 指標と期間（例: ['sma:50', 'rsi:14']）。省略時は既定の指標
+   */
+  static async getIndicators(symbol: string, indicators?: string[]): Promise<TechnicalIndicators> {
+    try {
+      const response = await apiClient.get<TechnicalIndicators>(`/stocks/indicators/${symbol}`, {
+        params: indicators?.length ? { indicators: indicators.join(',') } : undefined
+      });
+      return response.data;
+    } catch (error) {
+      console.error(`Error fetching indicators for ${symbol}:`, error);
+      throw error;
+    }
+  }
+
+  /**
+   * 複数銘柄のテクニカル指標を一括取得
+   */
+  static async getBatchIndicators(symbols: string[], indicators?: string[]): Promise<BatchTechnicalIndicators> {
+    try {
+      const response = await apiClient.get<BatchTechnicalIndicators>('/stocks/indicators', {
+        params: {
+          symbols: symbols.join(','),
+          ...(indicators?.length ? { indicators: indicators.join(',') } : {})
+        }
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching batch indicators:', error);
+      throw error;
+    }
+  }
+
+  /**
+   * バフェット式7観点の事前スコアの高い順に調査候補を取得
+   */
+  static async getBuffettShortlist(params: {
+    min_score?: number;
+    min_coverage?: number;
+    sector?: string;
+    page?: number;
+    page_size?: number;
+  } = {}): Promise<BuffettShortlist> {
+    try {
+      const response = await apiClient.get<BuffettShortlist>('/stocks/buffett-scores', { params });
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching Buffett shortlist:', error);
+      throw error;
+    }
+  }
+
+  /**
+   * 銘柄のバフェット式7観点の事前スコアを取得
+   */
+  static async getBuffettScore(symbol: string): Promise<BuffettScore> {
+    try {
+      const response = await apiClient.get<BuffettScore>(`/stocks/buffett-scores/${symbol}`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error fetching Buffett pre-score for ${symbol}:`, error);
+      throw error;
+    }
+  }
+
+  /**
+   * セクター・業種ごとの指標の分布を取得
+   */
+  static async getPeerAggregates(params: {
+    group_type?: 'sector' | 'industry';
+    group_name?: string;
+  } = {}): Promise<PeerGroupList> {
+    try {
+      const response = await apiClient.get<PeerGroupList>('/stocks/peer-aggregates', { params });
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching peer aggregates:', error);
+      throw error;
+    }
+  }
+
+  /**
+   * 銘柄の指標を同じセクター・業種の分布と比較
+   */
+  static async getRelativeMetrics(
+    symbol: string,
+    peerGroup: 'sector' | 'industry' = 'sector'
+  ): Promise<RelativeMetrics> {
+    try {
+      const response = await apiClient.get<RelativeMetrics>(`/stocks/peers/${symbol}`, {
+        params: { peer_group: peerGroup }
+      });
+      return response.data;
+    } catch (error) {
+      console.error(`Error fetching relative metrics for ${symbol}:`, error);
+      throw error;
+    }
+  }
+
   /**
    * 株式スクリーニングを実行
    */
@@ -111,6 +283,32 @@ export class StockAPIService {
     }
   }
 
+  /**
+   * スクリーニング条件のバックテストを実行待ちに追加
+   */
+  static async runBacktest(request: BacktestRequest): Promise<BacktestJob> {
+    try {
+      const response = await apiClient.post<BacktestJob>('/backtests', request);
+      return response.data;
+    } catch (error) {
+      console.error('Error submitting backtest:', error);
+      throw error;
+    }
+  }
+
+  /**
+   * バックテストの実行状況・結果を取得
+   */
+  static async getBacktest(jobId: string): Promise<BacktestJob> {
+    try {
+      const response = await apiClient.get<BacktestJob>(`/backtests/${jobId}`);
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching backtest:', error);
+      throw error;
+    }
+  }
+
   /**
    * 株式を検索
    */
@@ -126,6 +324,151 @@ export class StockAPIService {
     }
   }
 
+  /**
+   * 株価の更新を購読（Server-Sent Events）
+   *
+   * 戻り値の関数を呼ぶと購読を終了する。
+   */
+  static streamQuotes(
+    symbols: string[],
+    onUpdate: (update: QuoteUpdate, isSnapshot: boolean) => void,
+    onError?: (event: Event) => void
+  ): () => void {
+    const url = `${BASE_URL}/stocks/stream?symbols=${encodeURIComponent(symbols.join(','))}`;
+    const source = new EventSource(url);
+
+    source.addEventListener('snapshot', (event) => {
+      onUpdate(JSON.parse((event as MessageEvent).data), true);
+    });
+    source.addEventListener('quote', (event) => {
+      onUpdate(JSON.parse((event as MessageEvent).data), false);
+    });
+    source.onerror = (event) => {
+      console.error('Quote stream error:', event);
+      onError?.(event);
+    };
+
+    return () => source.close();
+  }
+
+  /**
+   * ウォッチリストの一覧を取得
+   */
+  static async getWatchLists(): Promise<WatchList[]> {
+    try {
+      const response = await apiClient.get<WatchList[]>('/watchlists');
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching watchlists:', error);
+      throw error;
+    }
+  }
+
+  /**
+   * ウォッチリストを作成
+   */
+  static async createWatchList(name: string, description?: string): Promise<WatchList> {
+    try {
+      const response = await apiClient.post<WatchList>('/watchlists', { name, description });
+      return response.data;
+    } catch (error) {
+      console.error('Error creating watchlist:', error);
+      throw error;
+    }
+  }
+
+  /**
+   * ウォッチリストを削除
+   */
+  static async deleteWatchList(watchListId: number): Promise<void> {
+    try {
+      await apiClient.delete(`/watchlists/${watchListId}`);
+    } catch (error) {
+      console.error(`Error deleting watchlist ${watchListId}:`, error);
+      throw error;
+    }
+  }
+
+  /**
+   * ウォッチリストに銘柄を追加（登録済みの場合は設定を更新）
+   */
+  static async addWatchListItem(
+    watchListId: number,
+    symbol: string,
+    input: WatchListItemInput = {}
+  ): Promise<WatchListItem> {
+    try {
+      const response = await apiClient.post<WatchListItem>(`/watchlists/${watchListId}/items`, {
+        symbol,
+        ...input
+      });
+      return response.data;
+    } catch (error) {
+      console.error(`Error adding ${symbol} to watchlist ${watchListId}:`, error);
+      throw error;
+    }
+  }
+
+  /**
+   * ウォッチリストから銘柄を削除
+   */
+  static async removeWatchListItem(watchListId: number, itemId: number): Promise<void> {
+    try {
+      await apiClient.delete(`/watchlists/${watchListId}/items/${itemId}`);
+    } catch (error) {
+      console.error(`Error removing item ${itemId} from watchlist ${watchListId}:`, error);
+      throw error;
+    }
+  }
+
+  /**
+   * ウォッチリストの全銘柄の現在値・スコアを一括取得
+   */
+  static async getWatchListSnapshot(watchListId: number): Promise<WatchListSnapshot> {
+    try {
+      const response = await apiClient.get<WatchListSnapshot>(`/watchlists/${watchListId}/snapshot`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error fetching watchlist snapshot ${watchListId}:`, error);
+      throw error;
+    }
+  }
+
+  /**
+   * 目標株価・損切り株価への到達アラートを取得
+   */
+  static async getPriceAlerts(
+    options: { watchListId?: number; unacknowledgedOnly?: boolean; cursor?: number; limit?: number } = {}
+  ): Promise<PriceAlertList> {
+    try {
+      const response = await apiClient.get<PriceAlertList>('/alerts', {
+        params: {
+          watch_list_id: options.watchListId,
+          unacknowledged_only: options.unacknowledgedOnly,
+          cursor: options.cursor,
+          limit: options.limit,
+        }
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching price alerts:', error);
+      throw error;
+    }
+  }
+
+  /**
+   * アラートを確認済みにする
+   */
+  static async acknowledgePriceAlert(alertId: number): Promise<PriceAlert> {
+    try {
+      const response = await apiClient.post<PriceAlert>(`/alerts/${alertId}/acknowledge`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error acknowledging price alert ${alertId}:`, error);
+      throw error;
+    }
+  }
+
   /**
    * APIヘルスチェック
    */
@@ -144,12 +487,14 @@ export class StockAPIService {
    */
   static async getBatchStockInfo(symbols: string[]): Promise<StockInfo[]> {
     try {
-      const promises = symbols.map(symbol => this.getStockInfo(symbol));
-      const results = await Promise.allSettled(promises);
+      const response = await apiClient.get<BatchStockInfo>('/stocks/info', {
+        params: { symbols: symbols.join(',') }
+      });
       
-      return results
-        .filter((result): result is PromiseFulfilledResult<StockInfo> => result.status === 'fulfilled')
-        .map(result => result.value);
+      // 取得できた銘柄のみをリクエスト順で返す
+      return symbols
+        .map(symbol => response.data.results[symbol.toUpperCase()])
+        .filter((info): info is StockInfo => info !== undefined);
     } catch (error) {
       console.error('Error fetching batch stock info:', error);
       throw error;
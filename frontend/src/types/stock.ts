@@ -30,6 +30,14 @@ export interface StockInfo {
   last_updated: string;
 }
 
+// 複数銘柄の基本情報の型定義
+export interface BatchStockInfo {
+  results: Record<string, StockInfo>;
+  errors: Record<string, string>;
+  total_symbols: number;
+  last_updated: string;
+}
+
 // 財務データの型定義
 export interface FinancialData {
   symbol: string;
@@ -39,6 +47,24 @@ export interface FinancialData {
   last_updated: string;
 }
 
+// 勘定科目の全銘柄横断取得の型定義
+export interface FinancialLineItemValue {
+  symbol: string;
+  statement: string;
+  period_end: string;
+  value?: number;
+}
+
+export interface FinancialLineItem {
+  line_item: string;
+  statement?: string;
+  period_end?: string;
+  latest: boolean;
+  total: number;
+  results: FinancialLineItemValue[];
+  last_updated: string;
+}
+
 // 履歴データの型定義
 export interface HistoricalData {
   symbol: string;
@@ -54,6 +80,21 @@ export interface HistoricalData {
   last_updated: string;
 }
 
+// 履歴データ（列形式）の型定義
+export interface HistoricalColumnarData {
+  symbol: string;
+  period: string;
+  data: {
+    Date: string[];
+    Open: Array<number | null>;
+    High: Array<number | null>;
+    Low: Array<number | null>;
+    Close: Array<number | null>;
+    Volume: Array<number | null>;
+  };
+  last_updated: string;
+}
+
 // 財務スコアの型定義
 export interface FinancialScore {
   symbol: string;
@@ -76,6 +117,111 @@ export interface ScreeningRequest {
   min_roe?: number;
   max_debt_to_equity?: number;
   min_current_ratio?: number;
+  min_revenue_cagr?: number;
+  min_eps_cagr?: number;
+  min_fcf_consistency?: number;
+  max_operating_margin_volatility?: number;
+  peer_group?: 'sector' | 'industry';
+  max_pe_to_peer_median?: number;
+  max_pb_to_peer_median?: number;
+  min_roe_to_peer_median?: number;
+}
+
+// 複数年の傾向指標の型定義
+export interface TrendMetrics {
+  symbol: string;
+  periods: number;
+  revenue_cagr?: number;
+  eps_cagr?: number;
+  revenue_growth_consistency?: number;
+  operating_margin_mean?: number;
+  operating_margin_volatility?: number;
+  net_margin_volatility?: number;
+  fcf_consistency?: number;
+  fcf_margin_mean?: number;
+  roe_mean?: number;
+  roe_trend?: number;
+  last_updated: string;
+}
+
+// テクニカル指標の型定義（キーは「指標名_期間」。例: sma_50, rsi_14）
+export interface TechnicalIndicators {
+  symbol: string;
+  as_of: string;
+  close?: number;
+  indicators: Record<string, number | null>;
+  last_updated: string;
+}
+
+export interface BatchTechnicalIndicators {
+  results: Record<string, TechnicalIndicators>;
+  errors: Record<string, string>;
+  total_symbols: number;
+  last_updated: string;
+}
+
+// バフェット式7観点の事前スコアの型定義
+export interface BuffettViewpointScore {
+  label: string;
+  weight: number;
+  score?: number;
+  grade?: 'A' | 'B' | 'C';
+}
+
+export interface BuffettScore {
+  symbol: string;
+  name: string;
+  sector?: string;
+  industry?: string;
+  pre_score?: number;
+  coverage: number;
+  verdict?: string;
+  viewpoints: Record<string, BuffettViewpointScore>;
+  last_updated: string;
+}
+
+export interface BuffettShortlist {
+  total: number;
+  page: number;
+  page_size: number;
+  total_pages: number;
+  results: BuffettScore[];
+  last_updated: string;
+}
+
+// セクター・業種内の指標の分布の型定義
+export interface PeerMetricStats {
+  count: number;
+  q1?: number;
+  median?: number;
+  q3?: number;
+}
+
+export interface PeerGroup {
+  group_type: 'sector' | 'industry';
+  group_name: string;
+  metrics: Record<string, PeerMetricStats>;
+}
+
+export interface PeerGroupList {
+  group_type: 'sector' | 'industry';
+  total: number;
+  results: PeerGroup[];
+  last_updated: string;
+}
+
+// 銘柄の指標と同じセクター・業種の分布との比較の型定義
+export interface RelativeMetric extends PeerMetricStats {
+  value?: number;
+  relative_to_median?: number;
+}
+
+export interface RelativeMetrics {
+  symbol: string;
+  peer_group: 'sector' | 'industry';
+  group_name?: string;
+  metrics: Record<string, RelativeMetric>;
+  last_updated: string;
 }
 
 // スクリーニング結果の型定義
@@ -101,6 +247,59 @@ export interface ScreeningResponse {
   last_updated: string;
 }
 
+// バックテストリクエストの型定義
+export interface BacktestRequest extends Omit<ScreeningRequest, 'symbols'> {
+  symbols?: string[];
+  start_date: string;
+  end_date?: string;
+  rebalance?: 'weekly' | 'monthly' | 'quarterly';
+  top_n?: number;
+  min_score?: number;
+}
+
+export interface BacktestPeriod {
+  rebalance_date: string;
+  portfolio_return: number;
+  benchmark_return?: number;
+  holdings: number;
+  top_holdings: string[];
+}
+
+export interface BacktestSummary {
+  periods: number;
+  cumulative_return?: number;
+  cagr?: number;
+  volatility?: number;
+  sharpe_ratio?: number;
+  max_drawdown?: number;
+  benchmark_cumulative_return?: number;
+  benchmark_cagr?: number;
+  hit_rate?: number;
+  average_holdings?: number;
+  turnover?: number;
+}
+
+export interface BacktestResult {
+  start_date: string;
+  end_date: string;
+  rebalance: string;
+  symbols_evaluated: number;
+  summary: BacktestSummary;
+  periods: BacktestPeriod[];
+  execution_time: number;
+}
+
+// バックテストの実行状況の型定義
+export interface BacktestJob {
+  job_id: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  submitted_at: string;
+  started_at?: string;
+  completed_at?: string;
+  error?: string;
+  result?: BacktestResult;
+}
+
 // API エラーレスポンスの型定義
 export interface ApiError {
   error: string;
@@ -129,14 +328,87 @@ export interface WatchListItem {
   change?: number;
   change_percent?: number;
   target_price?: number;
+  stop_loss_price?: number;
   notes?: string;
   added_at: string;
 }
 
+export interface WatchList {
+  id: number;
+  name: string;
+  description?: string;
+  item_count: number;
+  created_at?: string;
+  updated_at?: string;
+  items?: WatchListItem[];
+}
+
+export interface WatchListItemInput {
+  notes?: string;
+  target_price?: number;
+  stop_loss_price?: number;
+}
+
+export interface WatchListSnapshotItem extends WatchListItem {
+  score?: number;
+  target_distance?: number;
+  target_distance_percent?: number;
+  stop_loss_distance?: number;
+  stop_loss_distance_percent?: number;
+  is_stale: boolean;
+  error?: string;
+}
+
+export interface WatchListSnapshot {
+  id: number;
+  name: string;
+  description?: string;
+  items: WatchListSnapshotItem[];
+  total_items: number;
+  execution_time: number;
+  last_updated: string;
+}
+
+// 配信される株価（snapshotは全項目、quoteは変わった項目のみ）
+export interface QuoteUpdate {
+  symbol: string;
+  name?: string;
+  current_price?: number;
+  market_cap?: number;
+  pe_ratio?: number;
+  dividend_yield?: number;
+  volume?: number;
+  fifty_two_week_high?: number;
+  fifty_two_week_low?: number;
+  last_updated?: string;
+}
+
+// 価格アラートの型定義
+export interface PriceAlert {
+  id: number;
+  watch_list_id: number;
+  watch_list_item_id: number;
+  symbol: string;
+  name: string;
+  alert_type: 'target' | 'stop_loss';
+  threshold: number;
+  price: number;
+  previous_price?: number;
+  acknowledged: boolean;
+  triggered_at?: string;
+}
+
+export interface PriceAlertList {
+  alerts: PriceAlert[];
+  limit: number;
+  next_cursor?: number;
+}
+
 // 検索結果の型定義
 export interface SearchResult {
   symbol: string;
   name: string;
+  sector?: string;
   relevance: number;
 }
 